@@ -0,0 +1,106 @@
+import pickle
+
+import redis
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+_connection_pools = {}
+
+
+class RedisCache(BaseCache):
+    """redis-py 로 구현한 django cache backend. Django 3.2 에는 Redis cache backend 가 없다.
+
+    int 는 INCR 로 올릴 수 있도록 그대로 저장하고, 그 밖의 값은 pickle 로 저장한다.
+    django cache 는 thread 마다 backend 를 만들므로 connection pool 은 LOCATION 별로 공유한다.
+    """
+
+    def __init__(self, server, params):
+        super().__init__(params)
+        if server not in _connection_pools:
+            _connection_pools[server] = redis.ConnectionPool.from_url(server)
+        self._client = redis.Redis(connection_pool=_connection_pools[server])
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._make_key(key, version)
+        timeout = self._timeout(timeout)
+        if timeout == 0:
+            return False
+        return bool(self._client.set(key, self._dumps(value), ex=timeout, nx=True))
+
+    def get(self, key, default=None, version=None):
+        value = self._client.get(self._make_key(key, version))
+        return default if value is None else self._loads(value)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._make_key(key, version)
+        timeout = self._timeout(timeout)
+        if timeout == 0:
+            self._client.delete(key)
+        else:
+            self._client.set(key, self._dumps(value), ex=timeout)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._make_key(key, version)
+        timeout = self._timeout(timeout)
+        if timeout is None:
+            return bool(self._client.persist(key)) or bool(self._client.exists(key))
+        return bool(self._client.expire(key, timeout))
+
+    def delete(self, key, version=None):
+        return bool(self._client.delete(self._make_key(key, version)))
+
+    def has_key(self, key, version=None):
+        return bool(self._client.exists(self._make_key(key, version)))
+
+    def incr(self, key, delta=1, version=None):
+        key = self._make_key(key, version)
+        if not self._client.exists(key):
+            raise ValueError(f"Key '{key}' not found")
+        return self._client.incr(key, delta)
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        if not keys:
+            return {}
+        values = self._client.mget([self._make_key(key, version) for key in keys])
+        return {key: self._loads(value) for key, value in zip(keys, values) if value is not None}
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        pipeline = self._client.pipeline()
+        for key, value in data.items():
+            key = self._make_key(key, version)
+            if timeout == 0:
+                pipeline.delete(key)
+            else:
+                pipeline.set(key, self._dumps(value), ex=timeout)
+        pipeline.execute()
+        return []
+
+    def delete_many(self, keys, version=None):
+        keys = [self._make_key(key, version) for key in keys]
+        if keys:
+            self._client.delete(*keys)
+
+    def clear(self):
+        self._client.flushdb()
+
+    def _make_key(self, key, version):
+        key = self.make_key(key, version=version)
+        self.validate_key(key)
+        return key
+
+    def _timeout(self, timeout):
+        if timeout == DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        return None if timeout is None else max(0, int(timeout))
+
+    def _dumps(self, value):
+        if type(value) is int:
+            return value
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def _loads(self, value):
+        try:
+            return int(value)
+        except ValueError:
+            return pickle.loads(value)
@@ -0,0 +1,136 @@
+import base64
+import zlib
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Case, Value, When
+from django.db.models.functions import Length
+from django.db.models.query_utils import DeferredAttribute
+
+# 저장 형식: 평문은 그대로, 그 밖의 값은 MARKER 다음 한 글자로 형식을 표시한다.
+# text column 에 그대로 넣을 수 있도록 압축한 byte 는 base64 로 저장한다.
+MARKER = "\x01"
+ZLIB_FORMAT = "z"
+ESCAPED_FORMAT = "t"
+
+
+class StoredText(str):
+    """DB 에 저장된 형식 그대로의 값. attribute 로 처음 읽을 때 복원하고, 저장할 때는 그대로 쓴다."""
+
+    def decode(self):
+        return decode_text(self)
+
+
+def encode_text(value, compress=True):
+    if value is None:
+        return None
+    if compress:
+        data = value.encode()
+        if len(data) >= settings.CTRLF_TEXT_COMPRESSION["MIN_LENGTH"]:
+            compressed = MARKER + ZLIB_FORMAT + base64.b64encode(zlib.compress(data, 9)).decode("ascii")
+            if len(compressed) < len(data):
+                return compressed
+    if value.startswith(MARKER):
+        return MARKER + ESCAPED_FORMAT + value
+    return value
+
+
+def decode_text(value):
+    if value is None or not value.startswith(MARKER):
+        return value
+    text_format, payload = value[1:2], value[2:]
+    if text_format == ZLIB_FORMAT:
+        return zlib.decompress(base64.b64decode(payload)).decode()
+    if text_format == ESCAPED_FORMAT:
+        return payload
+    raise ValueError(f"알 수 없는 압축 형식입니다: {text_format!r}")
+
+
+class CompressedTextDescriptor(DeferredAttribute):
+    # __set__ 이 있어야 instance.__dict__ 보다 먼저 __get__ 이 불려 저장된 형식을 복원할 수 있다.
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+    def __get__(self, instance, cls=None):
+        value = super().__get__(instance, cls)
+        if isinstance(value, StoredText):
+            value = instance.__dict__[self.field.attname] = value.decode()
+        return value
+
+
+class CompressedTextField(models.TextField):
+    """MIN_LENGTH 이상인 값을 zlib 으로 압축해 저장하는 TextField. 읽을 때는 평문 str 을 돌려준다.
+
+    compress_on_save=False 면 저장할 때 평문을 그대로 두고 compress_column 으로 나중에 압축한다.
+    저장된 값으로 비교하므로 압축된 row 는 content="..." 같은 lookup 에 걸리지 않는다.
+    values()/values_list() 는 model 을 거치지 않아 StoredText 를 그대로 돌려준다.
+    """
+
+    descriptor_class = CompressedTextDescriptor
+
+    def __init__(self, *args, compress_on_save=True, **kwargs):
+        self.compress_on_save = compress_on_save
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if not self.compress_on_save:
+            kwargs["compress_on_save"] = False
+        return name, path, args, kwargs
+
+    def from_db_value(self, value, expression, connection):
+        if value is not None and value.startswith(MARKER):
+            return StoredText(value)
+        return value
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if isinstance(value, StoredText):
+            return str(value)
+        return encode_text(value, compress=self.compress_on_save)
+
+
+def compress_column(queryset, field_name, compress=True, chunk_size=500):
+    """queryset 의 row 를 chunk 단위로 다시 저장하고 (바꾼 row 수, 변환 전 byte, 변환 후 byte) 를 돌려준다.
+
+    compress=False 면 압축을 풀어 평문으로 되돌린다. 이미 변환된 row 는 읽지 않는다.
+    """
+    field = queryset.model._meta.get_field(field_name)
+    if compress:
+        # utf-8 은 한 글자가 4 byte 이하이므로 MIN_LENGTH / 4 글자보다 짧은 값은 압축 대상이 아니다.
+        queryset = (
+            queryset.annotate(stored_length=Length(field_name))
+            .filter(stored_length__gte=settings.CTRLF_TEXT_COMPRESSION["MIN_LENGTH"] // 4)
+            .exclude(**{f"{field_name}__startswith": MARKER + ZLIB_FORMAT})
+        )
+    else:
+        queryset = queryset.filter(**{f"{field_name}__startswith": MARKER + ZLIB_FORMAT})
+    last_pk = None
+    row_count = before_size = after_size = 0
+    while True:
+        chunk_queryset = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(chunk_queryset.order_by("pk").only("pk", field_name)[:chunk_size])
+        if not rows:
+            return row_count, before_size, after_size
+        # bulk_update 는 attribute 를 읽어 압축을 풀어 버리므로 저장 형식 그대로 CASE 로 UPDATE 한다.
+        converted_values = {}
+        for row in rows:
+            stored = row.__dict__[field.attname]
+            if stored is None:
+                continue
+            converted = encode_text(decode_text(stored), compress=compress)
+            before_size += len(stored.encode())
+            after_size += len(converted.encode())
+            if converted != stored:
+                converted_values[row.pk] = StoredText(converted)
+        if converted_values:
+            queryset.model._base_manager.filter(pk__in=converted_values).update(
+                **{
+                    field_name: Case(
+                        *(When(pk=pk, then=Value(value, output_field=field)) for pk, value in converted_values.items()),
+                        output_field=field,
+                    )
+                }
+            )
+        row_count += len(converted_values)
+        last_pk = rows[-1].pk
@@ -1,6 +1,7 @@
 import os
 
 from celery import Celery
+from celery.schedules import crontab
 from config.settings.base import PLATFORM_ENV
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", PLATFORM_ENV)
@@ -12,6 +13,29 @@ app.conf.broker_url = "redis://localhost:6379/0"
 
 app.autodiscover_tasks()
 
+app.conf.beat_schedule = {
+    "reconcile-issue-counters": {
+        "task": "ctrlfbe.tasks.reconcile_issue_counters",
+        "schedule": crontab(minute=0),
+    },
+    "cleanup-orphaned-issues": {
+        "task": "ctrlfbe.tasks.cleanup_orphaned_issues",
+        "schedule": crontab(hour=4, minute=30),
+    },
+    "cleanup-orphaned-page-bodies": {
+        "task": "ctrlfbe.tasks.cleanup_orphaned_page_bodies",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    "compress-text-columns": {
+        "task": "ctrlfbe.tasks.compress_text_columns",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    "rebuild-search-index": {
+        "task": "ctrlfbe.tasks.rebuild_search_index",
+        "schedule": crontab(hour=5, minute=0),
+    },
+}
+
 
 @app.task
 def add(x, y):
@@ -137,17 +137,33 @@ CORS_ALLOW_HEADERS = (
     "authorization",
     "content-type",
     "dnt",
+    "if-modified-since",
+    "if-none-match",
     "origin",
     "user-agent",
     "x-csrftoken",
     "x-requested-with",
 )
 
+CORS_EXPOSE_HEADERS = ("etag", "last-modified")
+
 CORS_ORIGIN_ALLOW_ALL = True
 
+# JSON 응답과 request body 는 orjson 으로 처리한다. JSON_BACKEND=stdlib 이면 DRF 기본 JSONRenderer/JSONParser 로 되돌린다.
+JSON_BACKEND = env.str("JSON_BACKEND", default="orjson")
+
 REST_FRAMEWORK = {
     "EXCEPTION_HANDLER": "common.exceptions.custom_exception_handler",
     "DEFAULT_AUTHENTICATION_CLASSES": [],
+    "DEFAULT_RENDERER_CLASSES": [
+        "common.renderers.ORJSONRenderer" if JSON_BACKEND == "orjson" else "rest_framework.renderers.JSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "common.parsers.ORJSONParser" if JSON_BACKEND == "orjson" else "rest_framework.parsers.JSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
 
 JWT_AUTH = {
@@ -156,6 +172,46 @@ JWT_AUTH = {
     "JWT_REFRESH_EXPIRATION_DELTA": timedelta(days=30),
 }
 
+# JWT 인증 user cache. SHARED_CACHE_ALIAS 에 CACHES alias 를 지정하면 process 간 공유 cache 를 함께 사용한다.
+CTRLF_AUTH_USER_CACHE = {
+    "MAX_SIZE": env.int("AUTH_USER_CACHE_MAX_SIZE", default=1024),
+    "TTL": env.int("AUTH_USER_CACHE_TTL", default=60),
+    "SHARED_CACHE_ALIAS": env.str("AUTH_USER_CACHE_ALIAS", default=""),
+}
+
+# 검색 색인 segment 를 저장하는 디렉터리. 같은 서버의 worker 들은 이 디렉터리의 segment 를 memory-map 으로 공유한다.
+# BACKEND 를 "database" 로 두면 app 색인 대신 DB full-text 색인(MySQL ngram, SQLite FTS5)으로 Page 를 검색한다.
+CTRLF_SEARCH_INDEX = {
+    "BACKEND": env.str("SEARCH_BACKEND", default="index"),
+    "DIR": env.str("SEARCH_INDEX_DIR", default=str(BASE_DIR.parent / "search_index")),
+    "MAX_SEGMENTS": env.int("SEARCH_INDEX_MAX_SEGMENTS", default=16),
+}
+
+# PageHistory 본문 저장 방식. "delta" 면 PREVIOUS 가 된 버전을 직전 버전에 대한 delta 로 바꿔 저장하고,
+# SNAPSHOT_INTERVAL 버전마다 전체 본문을 남겨 복원할 때 읽는 버전 수를 제한한다. 바꾼 뒤에는 compact_page_history 를 실행한다.
+CTRLF_PAGE_HISTORY_STORAGE = {
+    "MODE": env.str("PAGE_HISTORY_STORAGE", default="full"),
+    "SNAPSHOT_INTERVAL": env.int("PAGE_HISTORY_SNAPSHOT_INTERVAL", default=10),
+}
+
+# MIN_LENGTH byte 이상인 CompressedTextField 값(Issue.reason, PREVIOUS 버전만 가리키는 PageBody.content)을 zlib 으로 압축한다.
+CTRLF_TEXT_COMPRESSION = {
+    "MIN_LENGTH": env.int("TEXT_COMPRESSION_MIN_LENGTH", default=512),
+}
+
+# 로컬은 process 안의 locmem cache 를 쓰고, production 은 Celery broker 와 같은 Redis 서버를 쓴다.
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "ctrlf"},
+}
+
+# Note/Topic/Page 조회 응답 cache. key 에 Note.generation 을 넣으므로 TTL 은 지난 generation 의 응답을 비우는 용도다.
+# hit/miss 수는 response_cache_stats command 로 확인한다.
+CTRLF_RESPONSE_CACHE = {
+    "ENABLED": env.bool("RESPONSE_CACHE_ENABLED", default=True),
+    "ALIAS": env.str("RESPONSE_CACHE_ALIAS", default="default"),
+    "TTL": env.int("RESPONSE_CACHE_TTL", default=600),
+}
+
 SWAGGER_SETTINGS = {"SECURITY_DEFINITIONS": {"Bearer": {"type": "apiKey", "name": "Authorization", "in": "header"}}}
 
 S3_BUCKET_NAME = env.str("S3_BUCKET_NAME", default="")
@@ -12,3 +12,14 @@ DATABASES = {
         "PORT": os.environ.get("RDS_PORT", ""),  # noqa: F405
     }
 }
+
+# Celery broker(redis://localhost:6379/0) 와 같은 Redis 서버를 쓰되, cache 를 비워도 queue 가 지워지지 않도록 DB 를 나눈다.
+CACHES = {
+    "default": {
+        "BACKEND": "common.cache.RedisCache",
+        "LOCATION": os.environ.get("REDIS_CACHE_URL", "redis://localhost:6379/1"),  # noqa: F405
+    }
+}
+
+# uwsgi worker 들이 삭제되거나 비활성화된 user 를 함께 버리도록 JWT user cache 도 Redis 를 공유한다.
+CTRLF_AUTH_USER_CACHE["SHARED_CACHE_ALIAS"] = env.str("AUTH_USER_CACHE_ALIAS", default="default")  # noqa: F405
@@ -6,9 +6,14 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": "mydatabase",
+        # 동시성 테스트에서 thread 간 lock 대기가 가능하도록 shared-cache 메모리 DB 대신 파일 DB를 사용한다.
+        "TEST": {"NAME": "test_mydatabase.sqlite3"},
     }
 }
 
+# 테스트끼리 같은 id 를 다시 쓰므로 응답 cache 는 cache 테스트에서만 켠다.
+CTRLF_RESPONSE_CACHE = {**CTRLF_RESPONSE_CACHE, "ENABLED": False}  # noqa: F405
+
 env = environ.Env()
 S3_BUCKET_NAME = env.str("S3_BUCKET_NAME", default="")
 S3_BUCKET_BASE_DIR = env.str("S3_BUCKET_BASE_DIR", default="")
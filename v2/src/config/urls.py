@@ -28,5 +28,6 @@ urlpatterns = [
     path("api/pages/", include("ctrlfbe.page_urls"), name="pages"),
     path("api/issues/", include("ctrlfbe.issue_urls"), name="issues"),
     path("api/actions/", include("ctrlfbe.action_urls"), name="actions"),
+    path("api/search/", include("ctrlfbe.search_urls"), name="search"),
     path("api/health-check/", HealthCheckView.as_view()),
 ]
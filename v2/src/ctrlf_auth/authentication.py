@@ -1,9 +1,12 @@
 import jwt
+from ctrlf_auth.cache import user_cache
 from ctrlf_auth.models import CtrlfUser
 from rest_framework.authentication import BaseAuthentication, get_authorization_header
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_jwt.settings import api_settings
 
+AUTH_COUNT_HEADER = "X-Ctrlf-Auth-Count"
+
 
 class CtrlfAuthentication(BaseAuthentication):
     def _decode_token(self, token) -> dict:
@@ -14,17 +17,26 @@ class CtrlfAuthentication(BaseAuthentication):
         )
 
     def authenticate(self, request):
+        request.ctrlf_auth_count = getattr(request, "ctrlf_auth_count", 0) + 1
         try:
             auth_key, raw_token = get_authorization_header(request).split()
         except ValueError:
             raise AuthenticationFailed("인증이 유효하지 않습니다.")
 
+        user = user_cache.get(raw_token)
+        if user is not None:
+            return user, raw_token
+
         try:
             payload = self._decode_token(raw_token)
         except jwt.DecodeError:
             raise AuthenticationFailed("인증이 유효하지 않습니다.")
 
-        return CtrlfUser.objects.get(email=payload["email"]), raw_token
+        # user 를 읽는 사이 invalidate 되면 이전 user 가 새 version 으로 캐시되지 않도록 version 을 먼저 읽는다.
+        version = user_cache.version(payload["user_id"])
+        user = CtrlfUser.objects.get(email=payload["email"])
+        user_cache.set(raw_token, user, payload.get("exp"), version)
+        return user, raw_token
 
     def authenticate_header(self, request):
         return "Bearer realm='api'"
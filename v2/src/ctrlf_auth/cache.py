@@ -0,0 +1,126 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+SHARED_TOKEN_KEY = "ctrlf_auth:token:{}"
+SHARED_USER_KEY = "ctrlf_auth:user:{}"
+SHARED_USER_VERSION_KEY = "ctrlf_auth:user_version:{}"
+
+
+class UserCache:
+    """JWT 로 인증한 CtrlfUser 를 token hash 기준으로 캐시한다.
+
+    process 안의 LRU 를 먼저 보고, CTRLF_AUTH_USER_CACHE["SHARED_CACHE_ALIAS"] 가 있으면 django cache 를 함께 사용한다.
+    entry 의 만료 시간은 TTL 과 token 의 exp 중 빠른 쪽이다.
+    shared cache 를 쓰면 invalidate 가 user 의 version 을 바꾸고, LRU hit 때마다 version 을 shared cache 와 비교하므로
+    다른 process 의 LRU 도 삭제되거나 비활성화된 user 를 바로 버린다.
+    set 에는 user 를 DB 에서 읽기 전에 version() 으로 읽은 값을 넘긴다. 그 사이 invalidate 되었으면 entry 는 바로 버려진다.
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, raw_token):
+        token_hash = self._hash(raw_token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(token_hash)
+            if entry is not None and entry[1] <= now:
+                del self._entries[token_hash]
+                entry = None
+
+        shared_cache = self._shared_cache()
+        if entry is not None:
+            user, _, version = entry
+            if self._user_version(shared_cache, user.id) == version:
+                with self._lock:
+                    if token_hash in self._entries:
+                        self._entries.move_to_end(token_hash)
+                return user
+            with self._lock:
+                self._entries.pop(token_hash, None)
+
+        if shared_cache is None:
+            return None
+        token_entry = shared_cache.get(SHARED_TOKEN_KEY.format(token_hash))
+        if token_entry is None:
+            return None
+        user_id, expires_at = token_entry
+        version = self._user_version(shared_cache, user_id)
+        user_entry = shared_cache.get(SHARED_USER_KEY.format(user_id))
+        if user_entry is None or user_entry[1] != version or expires_at <= now:
+            return None
+        user = user_entry[0]
+        self._set_local(token_hash, user, expires_at, version)
+        return user
+
+    def version(self, user_id):
+        return self._user_version(self._shared_cache(), user_id)
+
+    def set(self, raw_token, user, exp=None, version=None):
+        now = time.time()
+        expires_at = now + self._config()["TTL"]
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        if expires_at <= now:
+            return
+
+        token_hash = self._hash(raw_token)
+        shared_cache = self._shared_cache()
+        self._set_local(token_hash, user, expires_at, version)
+
+        if shared_cache is not None:
+            timeout = int(expires_at - now) + 1
+            shared_cache.set(SHARED_TOKEN_KEY.format(token_hash), (user.id, expires_at), timeout)
+            shared_cache.set(SHARED_USER_KEY.format(user.id), (user, version), timeout)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            for token_hash in [key for key, (user, _, _) in self._entries.items() if user.id == user_id]:
+                del self._entries[token_hash]
+
+        shared_cache = self._shared_cache()
+        if shared_cache is not None:
+            # version 은 LRU entry 가 살아있는 TTL 동안만 유지되면 충분하다.
+            shared_cache.set(SHARED_USER_VERSION_KEY.format(user_id), uuid.uuid4().hex, self._config()["TTL"] + 1)
+            shared_cache.delete(SHARED_USER_KEY.format(user_id))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _set_local(self, token_hash, user, expires_at, version):
+        with self._lock:
+            self._entries[token_hash] = (user, expires_at, version)
+            self._entries.move_to_end(token_hash)
+            while len(self._entries) > self._config()["MAX_SIZE"]:
+                self._entries.popitem(last=False)
+
+    def _hash(self, raw_token):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode("utf-8")
+        return hashlib.sha256(raw_token).hexdigest()
+
+    def _config(self):
+        return settings.CTRLF_AUTH_USER_CACHE
+
+    def _user_version(self, shared_cache, user_id):
+        if shared_cache is None:
+            return None
+        return shared_cache.get(SHARED_USER_VERSION_KEY.format(user_id))
+
+    def _shared_cache(self):
+        alias = self._config()["SHARED_CACHE_ALIAS"]
+        return caches[alias] if alias else None
+
+
+user_cache = UserCache()
@@ -1,6 +1,9 @@
 from common.models import CommonTimestamp
+from ctrlf_auth.cache import user_cache
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 
 class CtrlfUserManager(BaseUserManager):
@@ -50,5 +53,11 @@ class CtrlfUser(AbstractBaseUser):
         return self.is_admin
 
 
+@receiver([post_save, post_delete], sender=CtrlfUser)
+def invalidate_user_cache(sender, instance, **kwargs):
+    # password 재설정, 탈퇴, is_active 변경 시 캐시된 user 를 더 이상 쓰지 않는다.
+    user_cache.invalidate(instance.id)
+
+
 class EmailAuthCode(CommonTimestamp):
     code = models.CharField(max_length=8, help_text="이메일 인증용 코드")
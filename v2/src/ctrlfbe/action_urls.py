@@ -1,6 +1,14 @@
 from django.urls import path
 
-from .views import ImageUploadView, IssueApproveView, IssueCloseView, IssueDeleteView
+from .views import (
+    ImageUploadView,
+    IssueApproveView,
+    IssueBulkApproveView,
+    IssueBulkCloseView,
+    IssueBulkDeleteView,
+    IssueCloseView,
+    IssueDeleteView,
+)
 
 app_name = "actions"
 
@@ -8,5 +16,8 @@ urlpatterns = [
     path("issue-approve/", IssueApproveView.as_view(), name="issue_approve"),
     path("issue-delete/", IssueDeleteView.as_view(), name="issue_delete"),
     path("issue-close/", IssueCloseView.as_view(), name="issue_close"),
+    path("issue-approve/bulk/", IssueBulkApproveView.as_view(), name="issue_bulk_approve"),
+    path("issue-delete/bulk/", IssueBulkDeleteView.as_view(), name="issue_bulk_delete"),
+    path("issue-close/bulk/", IssueBulkCloseView.as_view(), name="issue_bulk_close"),
     path("images/", ImageUploadView.as_view(), name="upload_images"),
 ]
@@ -1,4 +1,4 @@
-from ctrlfbe.models import Issue, Note, Page, PageHistory, Topic
+from ctrlfbe.models import Issue, IssueCounter, Note, Page, PageBody, PageHistory, Topic
 from django.contrib import admin
 
 admin.site.register(Note)
@@ -6,3 +6,5 @@ admin.site.register(Topic)
 admin.site.register(Page)
 admin.site.register(Issue)
 admin.site.register(PageHistory)
+admin.site.register(PageBody)
+admin.site.register(IssueCounter)
@@ -1,12 +1,6 @@
 from rest_framework.request import Request
 
-from .models import (
-    CtrlfActionType,
-    CtrlfContentType,
-    CtrlfIssueStatus,
-    PageHistory,
-    PageVersionType,
-)
+from .models import CtrlfActionType, CtrlfContentType, CtrlfIssueStatus, PageVersionType
 
 
 class BaseData:
@@ -94,12 +88,11 @@ class PageData(BaseData):
     def build_update_data(self, page):
         issue_data = super().build_update_data()
         issue_data["related_model_type"] = CtrlfContentType.PAGE
-        version_count = PageHistory.objects.filter(page=page).count()
         page_history_data = {
             "page": page.id,
             "title": self.request.data["new_title"],
             "content": self.request.data["new_content"],
-            "version_no": version_count + 1,
+            "version_no": page.next_version_no(),
             "version_type": PageVersionType.UPDATE,
         }
         return {"model_data": page_history_data, "issue_data": issue_data}
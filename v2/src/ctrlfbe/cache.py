@@ -0,0 +1,117 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import F
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import CtrlfContentType, Issue, Note, PageHistory, Topic
+
+RESPONSE_KEY = "ctrlfbe:response:{}:{}:{}"
+NOTE_LIST_GENERATION_KEY = "ctrlfbe:response:generation:notes"
+STATS_KEY = "ctrlfbe:response:stats:{}"
+CACHE_STATUS_HEADER = "X-Response-Cache"
+
+
+class ResponseCache:
+    """Note/Topic/Page 조회 응답을 Note.generation 을 넣은 key 로 CTRLF_RESPONSE_CACHE["ALIAS"] 에 캐시한다.
+
+    생성/승인/삭제는 같은 transaction 안에서 Note.generation 을 올리므로, 이전 응답은 지우지 않고 TTL 로 사라진다.
+    Note 목록은 특정 note 에 속하지 않으므로 cache 에 둔 전역 generation 을 commit 뒤에 올린다.
+    """
+
+    def get_or_set(self, note_id, generation, request, build_response):
+        if not self._config()["ENABLED"]:
+            return build_response()
+        return self._get_or_set(f"note:{note_id}", generation, request, build_response)
+
+    def get_or_set_note_list(self, request, build_response):
+        if not self._config()["ENABLED"]:
+            return build_response()
+        return self._get_or_set("notes", self._note_list_generation(), request, build_response)
+
+    def bump(self, ctrlf_content):
+        """ctrlf_content 가 속한 Note 의 generation 을 올린다. 호출한 transaction 이 commit 되어야 반영된다."""
+        if isinstance(ctrlf_content, PageHistory):
+            ctrlf_content = ctrlf_content.page
+        if isinstance(ctrlf_content, Note):
+            note_id = ctrlf_content.id
+            transaction.on_commit(self._bump_note_list)
+        elif isinstance(ctrlf_content, Topic):
+            note_id = ctrlf_content.note_id
+        else:
+            note_id = ctrlf_content.topic.note_id
+        Note.objects.filter(id=note_id).update(generation=F("generation") + 1)
+
+    def bump_issues(self, issues):
+        # Page Detail 은 PageHistory 의 issue_id 를 내려주므로 Page 이슈가 지워지면 응답이 바뀐다.
+        page_issues = [issue for issue in issues if issue.related_model_type == CtrlfContentType.PAGE]
+        for ctrlf_content in Issue.get_ctrlf_contents(page_issues).values():
+            if ctrlf_content is not None:
+                self.bump(ctrlf_content)
+
+    def stats(self):
+        cache = self._cache()
+        hits = cache.get(STATS_KEY.format("hits"), 0)
+        misses = cache.get(STATS_KEY.format("misses"), 0)
+        return {"hits": hits, "misses": misses}
+
+    def reset_stats(self):
+        self._cache().delete_many([STATS_KEY.format("hits"), STATS_KEY.format("misses")])
+
+    def _get_or_set(self, scope, generation, request, build_response):
+        cache = self._cache()
+        path_hash = hashlib.sha1(request.get_full_path().encode("utf-8")).hexdigest()
+        key = RESPONSE_KEY.format(scope, generation, path_hash)
+        data = cache.get(key)
+        if data is not None:
+            self._count("hits")
+            response = Response(data=data, status=status.HTTP_200_OK)
+            response[CACHE_STATUS_HEADER] = "HIT"
+            return response
+
+        self._count("misses")
+        response = build_response()
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, self._config()["TTL"])
+        response[CACHE_STATUS_HEADER] = "MISS"
+        return response
+
+    def _note_list_generation(self):
+        cache = self._cache()
+        generation = cache.get(NOTE_LIST_GENERATION_KEY)
+        if generation is None:
+            # key 가 지워졌으면 이전에 쓰던 번호와 겹치지 않도록 현재 시각에서 다시 시작한다.
+            cache.add(NOTE_LIST_GENERATION_KEY, time.time_ns(), None)
+            generation = cache.get(NOTE_LIST_GENERATION_KEY)
+        return generation
+
+    def _bump_note_list(self):
+        if not self._config()["ENABLED"]:
+            return
+        try:
+            self._cache().incr(NOTE_LIST_GENERATION_KEY)
+        except ValueError:
+            # key 가 없으면 다음 조회에서 새 번호로 시작한다.
+            pass
+
+    def _count(self, name):
+        cache = self._cache()
+        key = STATS_KEY.format(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, None):
+                cache.incr(key)
+
+    def _config(self):
+        return settings.CTRLF_RESPONSE_CACHE
+
+    def _cache(self):
+        return caches[self._config()["ALIAS"]]
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,106 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import status
+
+from .models import Note, PageHistory, PageVersionType, Topic
+
+# PREVIOUS 버전은 다시 바뀌지 않으므로 다시 검증하지 않고, 그 밖의 응답은 매번 ETag 로 다시 검증한다.
+IMMUTABLE_CACHE_CONTROL = "max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# 목록을 가진 부모 model 별로 (note id, note generation) 을 읽는 lookup
+PARENT_LOOKUPS = {
+    Note: ("id", "generation"),
+    Topic: ("note_id", "note__generation"),
+}
+
+
+class ContentState:
+    """조회 응답의 ETag/Last-Modified 와 응답 cache 에 쓸 note generation.
+
+    content 를 읽기 전에 id, generation, updated_at 만 한 번 조회해서 만들고, 바뀌지 않았으면 304 로 답한다.
+    ETag 에는 Note.generation 을 함께 넣어 updated_at 이 바뀌지 않는 변경(이슈 삭제 등)도 반영한다.
+    그런 변경이 생길 수 있는 Page 버전은 Last-Modified 를 보내지 않아 If-Modified-Since 만으로 304 가 나가지 않게 한다.
+    """
+
+    def __init__(self, note_id, generation, etag_parts, updated_at=None, immutable=False):
+        self.note_id = note_id
+        self.generation = generation
+        etag_source = ":".join(str(part) for part in (*etag_parts, generation))
+        self.etag = f'"{hashlib.sha1(etag_source.encode("utf-8")).hexdigest()}"'
+        self.last_modified = int(updated_at.timestamp()) if updated_at is not None else None
+        self.immutable = immutable
+
+    @classmethod
+    def of_note(cls, note_id):
+        row = Note.objects.filter(id=note_id, is_deleted=False).values_list("generation", "updated_at").first()
+        if row is None:
+            return None
+        generation, updated_at = row
+        return cls(note_id, generation, ("note", note_id, updated_at.isoformat()), updated_at)
+
+    @classmethod
+    def of_note_tree(cls, note_id):
+        # tree 는 하위 Topic/Page 승인처럼 Note.updated_at 이 바뀌지 않는 변경도 담으므로 Last-Modified 없이 ETag 로만 검증한다.
+        row = Note.objects.filter(id=note_id, is_deleted=False).values_list("generation", "updated_at").first()
+        if row is None:
+            return None
+        generation, updated_at = row
+        return cls(note_id, generation, ("tree", note_id, updated_at.isoformat()))
+
+    @classmethod
+    def of_topic(cls, topic_id):
+        row = (
+            Topic.objects.filter(id=topic_id, is_deleted=False)
+            .values_list("note_id", "note__generation", "updated_at")
+            .first()
+        )
+        if row is None:
+            return None
+        note_id, generation, updated_at = row
+        return cls(note_id, generation, ("topic", topic_id, updated_at.isoformat()), updated_at)
+
+    @classmethod
+    def of_page_version(cls, page_id, version_no):
+        row = (
+            PageHistory.objects.filter(page_id=page_id, version_no=version_no, page__topic__is_deleted=False)
+            .values_list("page__topic__note_id", "page__topic__note__generation", "updated_at", "version_type")
+            .first()
+        )
+        if row is None:
+            return None
+        note_id, generation, updated_at, version_type = row
+        # CURRENT 와 수정 대기 버전은 이슈 삭제처럼 updated_at 을 바꾸지 않고 응답이 바뀔 수 있다.
+        immutable = version_type == PageVersionType.PREVIOUS
+        return cls(
+            note_id,
+            generation,
+            ("page", page_id, version_no, updated_at.isoformat()),
+            updated_at if immutable else None,
+            immutable=immutable,
+        )
+
+    @classmethod
+    def of_children(cls, parent_model, parent_id, request):
+        row = (
+            parent_model.objects.filter(id=parent_id, is_deleted=False)
+            .values_list(*PARENT_LOOKUPS[parent_model])
+            .first()
+        )
+        if row is None:
+            return None
+        note_id, generation = row
+        return cls(note_id, generation, ("children", request.get_full_path()))
+
+    def not_modified_response(self, request):
+        return get_conditional_response(request, etag=self.etag, last_modified=self.last_modified)
+
+    def set_headers(self, response):
+        if response.status_code not in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            return
+        response["ETag"] = self.etag
+        if self.last_modified is not None:
+            response["Last-Modified"] = http_date(self.last_modified)
+        response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if self.immutable else REVALIDATE_CACHE_CONTROL
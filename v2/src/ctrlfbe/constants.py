@@ -1,9 +1,16 @@
 MAX_PRINTABLE_NOTE_COUNT = 30
+MAX_BULK_ISSUE_COUNT = 500
+BULK_ISSUE_CHUNK_SIZE = 100
+CASCADE_DELETE_CHUNK_SIZE = 500
+MAX_SEARCH_QUERY_LENGTH = 100
 ERR_NOTE_NOT_FOUND = "노트를 찾을 수 없습니다."
 ERR_TOPIC_NOT_FOUND = "토픽을 찾을 수 없습니다."
 ERR_PAGE_NOT_FOUND = "페이지를 찾을 수 없습니다."
 ERR_PAGE_VERSION_NOT_FOUND = "버전 정보를 찾을 수 없습니다."
 ERR_UNEXPECTED = "알 수 없는 에러가 발생 하였습니다."
+ERR_INVALID_CURSOR = "cursor가 유효하지 않습니다."
+ERR_ISSUE_NOT_FOUND = "이슈 ID를 찾을 수 없습니다."
+ERR_ISSUE_CONTENT_NOT_FOUND = "이슈 대상 컨텐츠를 찾을 수 없습니다."
 
 ERR_NOT_FOUND_MSG_MAP = {
     "note": ERR_NOTE_NOT_FOUND,
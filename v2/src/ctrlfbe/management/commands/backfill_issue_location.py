@@ -0,0 +1,46 @@
+from ctrlfbe.models import CtrlfContentType, Issue, Note, PageHistory, Topic
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+LOCATION_FIELDS = ["note_id", "topic_id", "page_id", "version_no"]
+
+
+class Command(BaseCommand):
+    help = "Issue의 note_id, topic_id, page_id, version_no 를 chunk 단위로 채웁니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        last_id = 0
+        updated_count = 0
+        while True:
+            issues = list(Issue.objects.filter(id__gt=last_id, note_id__isnull=True).order_by("id")[:chunk_size])
+            if not issues:
+                break
+            updated_count += self._backfill(issues)
+            last_id = issues[-1].id
+
+        self.stdout.write(f"{updated_count}개의 Issue 위치 정보를 채웠습니다.")
+
+    def _backfill(self, issues):
+        related_model_map = {
+            CtrlfContentType.NOTE: Note.objects.in_bulk(self._related_ids(issues, CtrlfContentType.NOTE)),
+            CtrlfContentType.TOPIC: Topic.objects.in_bulk(self._related_ids(issues, CtrlfContentType.TOPIC)),
+            CtrlfContentType.PAGE: PageHistory.objects.select_related("page__topic").in_bulk(
+                self._related_ids(issues, CtrlfContentType.PAGE)
+            ),
+        }
+        for issue in issues:
+            related_model = related_model_map[issue.related_model_type].get(issue.related_model_id)
+            if related_model is not None:
+                issue.set_location(related_model)
+
+        located_issues = [issue for issue in issues if issue.note_id is not None]
+        with transaction.atomic():
+            Issue.objects.bulk_update(located_issues, LOCATION_FIELDS)
+        return len(located_issues)
+
+    def _related_ids(self, issues, content_type):
+        return [issue.related_model_id for issue in issues if issue.related_model_type == content_type]
@@ -0,0 +1,91 @@
+import json
+import time
+from io import BytesIO
+
+from common.parsers import ORJSONParser
+from common.renderers import ORJSONRenderer
+from ctrlfbe.constants import MAX_PRINTABLE_NOTE_COUNT
+from ctrlfbe.models import (
+    CtrlfActionType,
+    CtrlfContentType,
+    CtrlfIssueStatus,
+    Issue,
+    PageVersionType,
+)
+from ctrlfbe.serializers import IssueListSerializer
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+PARAGRAPH = "## 장고 배포 가이드\ngunicorn 과 nginx 로 장고 서버를 배포하는 방법을 정리합니다. `python manage.py migrate` 를 먼저 실행합니다.\n"
+
+
+class Command(BaseCommand):
+    help = "Issue List 와 Page Detail 응답을 stdlib JSONRenderer/JSONParser 와 orjson 으로 직렬화/파싱하는 시간을 비교합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--issues", type=int, default=MAX_PRINTABLE_NOTE_COUNT, help="Issue List 응답의 issue 수")
+        parser.add_argument("--content-kb", type=int, default=20, help="Page Detail 응답 본문의 크기(KB)")
+        parser.add_argument("--repeat", type=int, default=1000, help="payload 마다 반복할 횟수")
+
+    def handle(self, *args, **options):
+        if options["issues"] < 1 or options["content_kb"] < 1 or options["repeat"] < 1:
+            raise CommandError("--issues, --content-kb, --repeat 는 1 이상이어야 합니다.")
+
+        payloads = {
+            "issue list": self._issue_list_payload(options["issues"]),
+            "page detail": self._page_detail_payload(options["content_kb"]),
+        }
+        for name, payload in payloads.items():
+            stdlib_body = JSONRenderer().render(payload)
+            orjson_body = ORJSONRenderer().render(payload)
+            if json.loads(stdlib_body) != json.loads(orjson_body):
+                raise CommandError(f"{name}: orjson 과 stdlib 의 JSON 이 다릅니다.")
+
+            repeat = options["repeat"]
+            render_stdlib = self._measure(lambda: JSONRenderer().render(payload), repeat)
+            render_orjson = self._measure(lambda: ORJSONRenderer().render(payload), repeat)
+            parse_stdlib = self._measure(lambda: JSONParser().parse(BytesIO(stdlib_body)), repeat)
+            parse_orjson = self._measure(lambda: ORJSONParser().parse(BytesIO(stdlib_body)), repeat)
+            self.stdout.write(
+                f"{name}: {len(stdlib_body) / 1024:.1f}KB, "
+                f"render stdlib: {render_stdlib:.1f}us, orjson: {render_orjson:.1f}us "
+                f"({render_stdlib / render_orjson:.1f}x), "
+                f"parse stdlib: {parse_stdlib:.1f}us, orjson: {parse_orjson:.1f}us "
+                f"({parse_stdlib / parse_orjson:.1f}x)"
+            )
+
+    def _measure(self, func, repeat):
+        started_at = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - started_at) / repeat * 1_000_000
+
+    def _issue_list_payload(self, issue_count):
+        issues = [
+            Issue(
+                id=issue_id,
+                title=f"장고 배포 가이드 {issue_id} 수정",
+                reason="오타를 고치고 nginx 설정 예시를 추가했습니다.",
+                status=CtrlfIssueStatus.REQUESTED,
+                related_model_type=CtrlfContentType.PAGE,
+                action=CtrlfActionType.UPDATE,
+            )
+            for issue_id in range(1, issue_count + 1)
+        ]
+        return {"next_cursor": "MzA", "has_more": True, "issues": IssueListSerializer(issues, many=True).data}
+
+    def _page_detail_payload(self, content_kb):
+        paragraph_size = len(PARAGRAPH.encode())
+        content = PARAGRAPH * (content_kb * 1024 // paragraph_size + 1)
+        return {
+            "id": 1,
+            "topic": 1,
+            "owners": [1, 2],
+            "issue_id": 1,
+            "title": "장고 배포 가이드",
+            "content": content,
+            "is_approved": True,
+            "version_no": 3,
+            "version_type": PageVersionType.CURRENT,
+        }
@@ -0,0 +1,76 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from ctrlf_auth.models import CtrlfUser
+from ctrlfbe.models import Note, Page, PageHistory, PageVersionType, Topic
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class Command(BaseCommand):
+    help = "Page 수정 승인(Page.process_update)을 여러 thread 에서 동시에 실행해 처리량과 승인당 query 수를 측정합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--pages", type=int, default=200, help="승인할 Page 수")
+        parser.add_argument("--threads", type=int, default=8, help="동시에 승인하는 thread 수")
+
+    def handle(self, *args, **options):
+        page_count, thread_count = options["pages"], options["threads"]
+        if page_count < 1 or thread_count < 1:
+            raise CommandError("--pages 와 --threads 는 1 이상이어야 합니다.")
+
+        owner = CtrlfUser.objects.create_user(email=f"benchmark-{uuid.uuid4().hex}@ctrlf.local")
+        note = Note.objects.create(title="benchmark note")
+        try:
+            page_ids = self._make_pages(note, owner, page_count)
+            chunks = [page_ids[i::thread_count] for i in range(thread_count)]
+
+            started_at = time.perf_counter()
+            if thread_count == 1:
+                query_counts = [self._approve(chunks[0])]
+            else:
+                with ThreadPoolExecutor(max_workers=thread_count) as executor:
+                    query_counts = list(executor.map(self._approve_in_thread, chunks))
+            elapsed = time.perf_counter() - started_at
+        finally:
+            note.delete()
+            owner.delete()
+
+        self.stdout.write(
+            f"approvals: {page_count}, threads: {thread_count}, elapsed: {elapsed:.3f}s, "
+            f"approvals/s: {page_count / elapsed:.1f}, queries/approval: {sum(query_counts) / page_count:.2f}"
+        )
+
+    def _make_pages(self, note, owner, page_count):
+        topic = Topic.objects.create(note=note, title="benchmark topic")
+        page_ids = []
+        for i in range(page_count):
+            page = Page.objects.create(topic=topic, last_version_no=2)
+            PageHistory.objects.create(
+                owner=owner, page=page, title=f"page {i}", content="v1", version_type=PageVersionType.CURRENT
+            )
+            PageHistory.objects.create(
+                owner=owner,
+                page=page,
+                title=f"page {i}",
+                content="v2",
+                version_no=2,
+                version_type=PageVersionType.UPDATE,
+            )
+            page_ids.append(page.id)
+        return page_ids
+
+    def _approve(self, page_ids):
+        pages = list(Page.objects.select_related("current_history").filter(id__in=page_ids))
+        with CaptureQueriesContext(connection) as captured:
+            for page in pages:
+                page.process_update()
+        return len(captured.captured_queries)
+
+    def _approve_in_thread(self, page_ids):
+        try:
+            return self._approve(page_ids)
+        finally:
+            connection.close()
@@ -0,0 +1,159 @@
+import os
+import random
+import statistics
+import tempfile
+import time
+import uuid
+from itertools import accumulate, islice
+
+from ctrlf_auth.models import CtrlfUser
+from ctrlfbe.constants import MAX_PRINTABLE_NOTE_COUNT
+from ctrlfbe.models import (
+    CtrlfContentType,
+    Note,
+    Page,
+    PageBody,
+    PageHistory,
+    PageVersionType,
+    Topic,
+)
+from ctrlfbe.search.backends import SEARCH_BACKENDS
+from ctrlfbe.search.database import DatabaseSearchBackend
+from ctrlfbe.search.documents import make_document
+from ctrlfbe.search.index import SearchIndex
+from ctrlfbe.tasks import delete_note_cascade
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.backends.base.creation import TEST_DATABASE_PREFIX
+from django.db.models import OuterRef, Subquery
+
+SYLLABLES = "가나다라마바사아자차카타파하고노도로모보소오조초코토포호구누두루무부수우주추쿠투푸후기니디리미비시이지치키티피히개내대래매배새애재채"
+ASCII_WORDS = ["django", "python", "mysql", "redis", "celery", "docker", "api", "http", "json", "sql"]
+INSERT_CHUNK_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = "합성 Page 로 검색 backend 의 색인 시간, 색인 크기, 검색 latency 를 측정합니다. seed 가 같으면 문서와 검색어도 같습니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--docs", type=int, default=1_000_000, help="색인할 합성 Page 수")
+        parser.add_argument("--queries", type=int, default=200, help="측정할 검색 횟수")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--backend",
+            choices=list(SEARCH_BACKENDS),
+            default="index",
+            help="index 는 임시 디렉터리의 app 색인, database 는 DB 에 넣은 Page 의 full-text 색인으로 검색합니다.",
+        )
+        parser.add_argument("--force", action="store_true", help="database backend 를 test DB 가 아닌 DB 에서도 실행합니다.")
+
+    def handle(self, *args, **options):
+        doc_count, query_count = options["docs"], options["queries"]
+        if doc_count < 1 or query_count < 1:
+            raise CommandError("--docs 와 --queries 는 1 이상이어야 합니다.")
+        if options["backend"] == "database" and not options["force"] and not self._is_throwaway_database():
+            raise CommandError("database backend 는 합성 Page 를 DB 에 넣으므로 test DB 에서만 실행합니다. 계속하려면 --force 를 붙이세요.")
+
+        randomizer = random.Random(options["seed"])
+        vocabulary = self._make_vocabulary(randomizer)
+        # 실제 문서처럼 일부 단어가 자주 나오도록 순위에 반비례하는 가중치로 단어를 고른다.
+        cum_weights = list(accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+        pages = self._iter_pages(randomizer, vocabulary, cum_weights, doc_count)
+
+        if options["backend"] == "index":
+            with tempfile.TemporaryDirectory() as directory:
+                search_backend = SearchIndex(directory)
+                build_elapsed = self._timed(
+                    search_backend.rebuild, (make_document(CtrlfContentType.PAGE, *page) for page in pages)
+                )
+                index_size = search_backend.index_size()
+                queries = self._make_queries(randomizer, vocabulary, cum_weights, query_count)
+                latencies = [
+                    self._timed(search_backend.search, query, MAX_PRINTABLE_NOTE_COUNT + 1) for query in queries
+                ]
+        else:
+            search_backend = DatabaseSearchBackend()
+            self._body_hashes = []
+            owner = CtrlfUser.objects.create_user(email=f"benchmark-{uuid.uuid4().hex}@ctrlf.local")
+            note = Note.objects.create(title="benchmark note", is_approved=True)
+            try:
+                topic = Topic.objects.create(note=note, title="benchmark topic", is_approved=True)
+                build_elapsed = self._timed(self._insert_pages, topic, owner, pages)
+                index_size = search_backend.index_size()
+                queries = self._make_queries(randomizer, vocabulary, cum_weights, query_count)
+                latencies = [
+                    self._timed(search_backend.search, query, MAX_PRINTABLE_NOTE_COUNT + 1) for query in queries
+                ]
+            finally:
+                note.process_delete()
+                delete_note_cascade(note.id)
+                self._delete_page_bodies()
+                owner.delete()
+
+        latencies = sorted(latency * 1000 for latency in latencies)
+        self.stdout.write(
+            f"backend: {options['backend']}, docs: {doc_count}, build: {build_elapsed:.1f}s, "
+            f"index: {index_size / 1024 / 1024:.1f}MB, queries: {query_count}, "
+            f"p50: {statistics.median(latencies):.2f}ms, "
+            f"p95: {latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]:.2f}ms, "
+            f"avg: {statistics.mean(latencies):.2f}ms"
+        )
+
+    def _make_vocabulary(self, randomizer):
+        words = {"".join(randomizer.choices(SYLLABLES, k=randomizer.randint(2, 4))) for _ in range(5000)}
+        return sorted(words) + ASCII_WORDS
+
+    def _make_queries(self, randomizer, vocabulary, cum_weights, query_count):
+        return [" ".join(randomizer.choices(vocabulary, cum_weights=cum_weights, k=2)) for _ in range(query_count)]
+
+    def _iter_pages(self, randomizer, vocabulary, cum_weights, doc_count):
+        for page_id in range(1, doc_count + 1):
+            title = " ".join(randomizer.choices(vocabulary, cum_weights=cum_weights, k=3))
+            content = " ".join(randomizer.choices(vocabulary, cum_weights=cum_weights, k=20))
+            yield page_id, title, content, page_id // 1000 + 1, page_id // 50 + 1
+
+    def _is_throwaway_database(self):
+        if connection.vendor == "sqlite" and connection.is_in_memory_db():
+            return True
+        return os.path.basename(str(connection.settings_dict["NAME"])).startswith(TEST_DATABASE_PREFIX)
+
+    def _insert_pages(self, topic, owner, pages):
+        # bulk_create 가 id 를 돌려주지 않는 DB 가 있어서, 벤치마크 전용 topic 에서 아직 current_history 가 없는 Page 를
+        # 이번 chunk 로 찾아 DB 가 정한 id 로 PageHistory 를 잇는다.
+        new_pages = Page.objects.filter(topic=topic, current_history__isnull=True)
+        while True:
+            chunk = list(islice(pages, INSERT_CHUNK_SIZE))
+            if not chunk:
+                return
+            with transaction.atomic():
+                Page.objects.bulk_create(Page(topic=topic) for _ in chunk)
+                page_histories = [
+                    PageHistory(
+                        owner=owner,
+                        page_id=page_id,
+                        title=title,
+                        content=content,
+                        is_approved=True,
+                        version_type=PageVersionType.CURRENT,
+                    )
+                    for page_id, (_, title, content, _, _) in zip(
+                        new_pages.order_by("id").values_list("id", flat=True), chunk
+                    )
+                ]
+                PageBody.store([page_history.body for page_history in page_histories])
+                self._body_hashes += [page_history.body_id for page_history in page_histories]
+                PageHistory.objects.bulk_create(page_histories)
+                new_pages.update(
+                    current_history_id=Subquery(PageHistory.objects.filter(page_id=OuterRef("id")).values("id")[:1])
+                )
+
+    def _delete_page_bodies(self):
+        for start in range(0, len(self._body_hashes), INSERT_CHUNK_SIZE):
+            PageBody.objects.filter(hash__in=self._body_hashes[start : start + INSERT_CHUNK_SIZE]).exclude(
+                hash__in=PageHistory.objects.values("body_id")
+            ).delete()
+
+    def _timed(self, function, *args):
+        started_at = time.perf_counter()
+        function(*args)
+        return time.perf_counter() - started_at
@@ -0,0 +1,10 @@
+from ctrlfbe.search.documents import get_search_index, rebuild_index
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "승인된 Note, Topic, Page 로 검색 색인을 처음부터 다시 만듭니다."
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write(f"{get_search_index().directory} 에 검색 색인을 만들었습니다.")
@@ -0,0 +1,75 @@
+from ctrlfbe.models import Page, PageBody, PageHistory, PageVersionType
+from ctrlfbe.page_delta import apply_delta, make_delta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+
+class Command(BaseCommand):
+    help = (
+        "기존 PageHistory 본문을 CTRLF_PAGE_HISTORY_STORAGE 의 저장 방식으로 바꿉니다. "
+        "delta 면 PREVIOUS 버전을 직전 버전에 대한 delta 로, full 이면 모든 버전을 전체 본문으로 저장합니다."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=100, help="한 transaction 에서 변환할 Page 수")
+
+    def handle(self, *args, **options):
+        storage = settings.CTRLF_PAGE_HISTORY_STORAGE
+        chunk_size = options["chunk_size"]
+        last_id = 0
+        updated_count = 0
+        while True:
+            page_ids = list(
+                Page.objects.filter(id__gt=last_id).order_by("id").values_list("id", flat=True)[:chunk_size]
+            )
+            if not page_ids:
+                break
+            with transaction.atomic():
+                updated_count += self._convert(page_ids, storage["MODE"], storage["SNAPSHOT_INTERVAL"])
+            last_id = page_ids[-1]
+
+        self.stdout.write(f"{updated_count}개의 PageHistory 를 {storage['MODE']} 저장 방식으로 바꿨습니다.")
+
+    def _convert(self, page_ids, mode, snapshot_interval):
+        page_histories = (
+            PageHistory.objects.filter(page_id__in=page_ids)
+            .order_by("page_id", "version_no")
+            .select_related("body")
+            .only("page_id", "version_no", "version_type", "delta_depth", "body", "body__content")
+        )
+        changed = []
+        base = None
+        for page_history in page_histories:
+            if base is not None and base.page_id != page_history.page_id:
+                base = None
+            # 같은 Page 의 버전을 오름차순으로 읽으므로 delta 는 바로 앞 버전의 전체 본문으로 복원된다.
+            content = page_history.content
+            if page_history.delta_depth:
+                if base is None or base.version_no != page_history.version_no - 1:
+                    raise CommandError(
+                        f"page {page_history.page_id} 의 version {page_history.version_no} 은 delta 인데 "
+                        "직전 version 이 없어 본문을 복원할 수 없습니다."
+                    )
+                content = apply_delta(base.full_content, content)
+            content_stored, delta_depth = content, 0
+            if (
+                mode == "delta"
+                and page_history.version_type == PageVersionType.PREVIOUS
+                and base is not None
+                and base.version_no == page_history.version_no - 1
+                and base.delta_depth + 1 < snapshot_interval
+                and not (base.delta_depth == 0 and page_history.has_same_content(base))
+            ):
+                delta = make_delta(base.full_content, content)
+                if len(delta) < len(content):
+                    content_stored, delta_depth = delta, base.delta_depth + 1
+            if (content_stored, delta_depth) != (page_history.content, page_history.delta_depth):
+                page_history.content, page_history.delta_depth = content_stored, delta_depth
+                changed.append(page_history)
+            page_history.full_content = content
+            base = page_history
+
+        PageBody.store([page_history.body for page_history in changed])
+        PageHistory.objects.bulk_update(changed, ["body", "delta_depth"])
+        return len(changed)
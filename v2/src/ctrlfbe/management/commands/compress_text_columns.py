@@ -0,0 +1,17 @@
+from ctrlfbe.tasks import compress_text_columns
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Issue.reason 과 PREVIOUS PageHistory 만 가리키는 PageBody.content 를 압축하고 table 별로 줄어든 저장 공간을 출력합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--decompress", action="store_true", help="압축을 풀어 모든 row 를 평문으로 되돌립니다.")
+
+    def handle(self, *args, **options):
+        results = compress_text_columns(compress=not options["decompress"])
+        for table, (row_count, before_size, after_size) in results.items():
+            self.stdout.write(
+                f"{table}: rows: {row_count}, before: {before_size / 1024:.1f}KB, after: {after_size / 1024:.1f}KB, "
+                f"saved: {(before_size - after_size) / 1024:.1f}KB"
+            )
@@ -0,0 +1,50 @@
+from ctrlfbe.models import (
+    CtrlfActionType,
+    CtrlfContentType,
+    CtrlfIssueStatus,
+    Issue,
+    Page,
+    PageHistory,
+    PageVersionType,
+)
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+SAMPLE_ID = 1
+
+HOT_QUERIES = {
+    "issue_list": lambda: Issue.objects.filter(
+        Q(status=CtrlfIssueStatus.REQUESTED) | Q(status=CtrlfIssueStatus.REJECTED)
+    )[:30],
+    "issue_process_delete": lambda: Issue.objects.filter(
+        action=CtrlfActionType.DELETE, related_model_id=SAMPLE_ID, related_model_type=CtrlfContentType.NOTE
+    ),
+    "issue_page_detail": lambda: Issue.objects.filter(
+        related_model_id=SAMPLE_ID, related_model_type=CtrlfContentType.PAGE
+    )[:1],
+    "page_history_version_no": lambda: PageHistory.objects.filter(page_id=SAMPLE_ID, version_no=SAMPLE_ID)[:1],
+    "page_history_to_update": lambda: PageHistory.objects.filter(
+        page_id=SAMPLE_ID, version_type=PageVersionType.UPDATE
+    )[:1],
+    "page_list": lambda: Page.objects.select_related("current_history").filter(topic_id=SAMPLE_ID),
+}
+
+
+class Command(BaseCommand):
+    help = "자주 실행되는 ORM 쿼리들의 EXPLAIN 결과를 출력합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("names", nargs="*", help=f"출력할 쿼리 이름 (기본값: 전체) {list(HOT_QUERIES)}")
+        parser.add_argument("--format", default=None, help="EXPLAIN 포맷 (예: MySQL 의 json, tree)")
+
+    def handle(self, *args, **options):
+        unknown_names = set(options["names"]) - set(HOT_QUERIES)
+        if unknown_names:
+            raise CommandError(f"알 수 없는 쿼리 이름입니다: {', '.join(sorted(unknown_names))}")
+
+        for name in options["names"] or HOT_QUERIES:
+            queryset = HOT_QUERIES[name]()
+            self.stdout.write(f"== {name}")
+            self.stdout.write(str(queryset.query))
+            self.stdout.write(queryset.explain(format=options["format"]))
+            self.stdout.write("")
@@ -0,0 +1,17 @@
+from ctrlfbe.cache import response_cache
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Note/Topic/Page 조회 응답 cache 의 hit/miss 수와 hit 비율을 출력합니다."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--reset", action="store_true", help="출력한 뒤 hit/miss 수를 0 으로 되돌립니다.")
+
+    def handle(self, *args, **options):
+        stats = response_cache.stats()
+        total = stats["hits"] + stats["misses"]
+        hit_ratio = stats["hits"] / total * 100 if total else 0
+        self.stdout.write(f"hits: {stats['hits']}, misses: {stats['misses']}, hit ratio: {hit_ratio:.1f}%")
+        if options["reset"]:
+            response_cache.reset_stats()
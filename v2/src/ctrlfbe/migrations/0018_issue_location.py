@@ -0,0 +1,33 @@
+# Generated by Django 3.2.5 on 2026-10-18 11:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ctrlfbe", "0017_alter_page_and_pagehistory"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="issue",
+            name="note_id",
+            field=models.IntegerField(help_text="이슈 대상 컨텐츠가 속한 note_id", null=True),
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="page_id",
+            field=models.IntegerField(help_text="이슈 대상 page_id (PAGE)", null=True),
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="topic_id",
+            field=models.IntegerField(help_text="이슈 대상 컨텐츠가 속한 topic_id (TOPIC, PAGE)", null=True),
+        ),
+        migrations.AddField(
+            model_name="issue",
+            name="version_no",
+            field=models.IntegerField(help_text="이슈 대상 page_history의 version_no (PAGE)", null=True),
+        ),
+    ]
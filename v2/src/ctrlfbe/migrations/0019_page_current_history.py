@@ -0,0 +1,34 @@
+# Generated by Django 3.2.5 on 2026-10-18 11:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_current_history(apps, schema_editor):
+    Page = apps.get_model("ctrlfbe", "Page")
+    PageHistory = apps.get_model("ctrlfbe", "PageHistory")
+    current_history = PageHistory.objects.filter(page=OuterRef("pk"), version_type="CURRENT").order_by("-id")
+    Page.objects.update(current_history=Subquery(current_history.values("id")[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ctrlfbe", "0018_issue_location"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="page",
+            name="current_history",
+            field=models.ForeignKey(
+                help_text="CURRENT page_history",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="+",
+                to="ctrlfbe.pagehistory",
+            ),
+        ),
+        migrations.RunPython(backfill_current_history, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 3.2.5 on 2026-10-18 11:21
+
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def renumber_duplicated_version_no(apps, schema_editor):
+    PageHistory = apps.get_model("ctrlfbe", "PageHistory")
+    Issue = apps.get_model("ctrlfbe", "Issue")
+    duplicated_versions = (
+        PageHistory.objects.values("page_id", "version_no").annotate(count=Count("id")).filter(count__gt=1)
+    )
+    for duplicated_version in duplicated_versions:
+        page_id = duplicated_version["page_id"]
+        page_histories = PageHistory.objects.filter(page_id=page_id, version_no=duplicated_version["version_no"])
+        next_version_no = PageHistory.objects.filter(page_id=page_id).aggregate(Max("version_no"))["version_no__max"]
+        for page_history in page_histories.order_by("id")[1:]:
+            next_version_no += 1
+            page_history.version_no = next_version_no
+            page_history.save(update_fields=["version_no"])
+            Issue.objects.filter(related_model_type="PAGE", related_model_id=page_history.id).update(
+                version_no=next_version_no
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ctrlfbe", "0019_page_current_history"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(
+                fields=["related_model_type", "related_model_id", "action"], name="issue_related_model_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="issue",
+            index=models.Index(fields=["status", "id"], name="issue_status_id_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="pagehistory",
+            index=models.Index(fields=["page", "version_type"], name="pagehistory_page_type_idx"),
+        ),
+        migrations.RunPython(renumber_duplicated_version_no, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="pagehistory",
+            constraint=models.UniqueConstraint(fields=("page", "version_no"), name="unique_page_version_no"),
+        ),
+    ]
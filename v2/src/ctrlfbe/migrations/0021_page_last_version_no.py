@@ -0,0 +1,30 @@
+# Generated by Django 3.2.5 on 2026-10-18 11:50
+
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_last_version_no(apps, schema_editor):
+    Page = apps.get_model("ctrlfbe", "Page")
+    PageHistory = apps.get_model("ctrlfbe", "PageHistory")
+    max_version_no = (
+        PageHistory.objects.filter(page=OuterRef("pk")).values("page").annotate(max_version_no=Max("version_no"))
+    )
+    Page.objects.update(last_version_no=Coalesce(Subquery(max_version_no.values("max_version_no")), 1))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ctrlfbe", "0020_hot_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="page",
+            name="last_version_no",
+            field=models.IntegerField(default=1, help_text="마지막으로 발급한 page_history의 version_no"),
+        ),
+        migrations.RunPython(backfill_last_version_no, migrations.RunPython.noop),
+    ]
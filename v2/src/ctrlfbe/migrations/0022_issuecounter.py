@@ -0,0 +1,56 @@
+# Generated by Django 3.2.5 on 2026-10-18 11:28
+
+from django.db import migrations, models
+from django.db.models import Count
+
+ISSUE_STATUSES = ["REQUESTED", "REJECTED", "APPROVED", "CLOSED"]
+CONTENT_TYPES = ["NOTE", "TOPIC", "PAGE"]
+
+
+def seed_issue_counters(apps, schema_editor):
+    Issue = apps.get_model("ctrlfbe", "Issue")
+    IssueCounter = apps.get_model("ctrlfbe", "IssueCounter")
+    actual_counts = {
+        (row["status"], row["related_model_type"]): row["count"]
+        for row in Issue.objects.values("status", "related_model_type").annotate(count=Count("id")).order_by()
+    }
+    IssueCounter.objects.bulk_create(
+        IssueCounter(status=status, related_model_type=related_model_type, count=count)
+        for (status, related_model_type), count in {
+            **{(status, content_type): 0 for status in ISSUE_STATUSES for content_type in CONTENT_TYPES},
+            **actual_counts,
+        }.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ctrlfbe", "0021_page_last_version_no"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IssueCounter",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[("REQUESTED", "요청"), ("REJECTED", "거절"), ("APPROVED", "승인"), ("CLOSED", "닫힘")],
+                        max_length=30,
+                    ),
+                ),
+                (
+                    "related_model_type",
+                    models.CharField(choices=[("NOTE", "노트"), ("TOPIC", "토픽"), ("PAGE", "페이지")], max_length=30),
+                ),
+                ("count", models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="issuecounter",
+            constraint=models.UniqueConstraint(fields=("status", "related_model_type"), name="unique_issue_counter"),
+        ),
+        migrations.RunPython(seed_issue_counters, migrations.RunPython.noop),
+    ]
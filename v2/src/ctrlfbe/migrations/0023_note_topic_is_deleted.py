@@ -0,0 +1,23 @@
+# Generated by Django 3.2.5 on 2026-10-18 11:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ctrlfbe", "0022_issuecounter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="note",
+            name="is_deleted",
+            field=models.BooleanField(default=False, help_text="삭제 승인 후 하위 컨텐츠가 삭제되기 전까지 True"),
+        ),
+        migrations.AddField(
+            model_name="topic",
+            name="is_deleted",
+            field=models.BooleanField(default=False, help_text="삭제 승인 후 하위 컨텐츠가 삭제되기 전까지 True"),
+        ),
+    ]
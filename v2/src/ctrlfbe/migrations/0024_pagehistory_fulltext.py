@@ -0,0 +1,60 @@
+# Generated by Django 3.2.5 on 2026-10-18 12:30
+
+from django.db import migrations
+
+MYSQL_CREATE_SQL = [
+    "ALTER TABLE ctrlfbe_pagehistory ADD FULLTEXT INDEX pagehistory_fulltext_idx (title, content) WITH PARSER ngram",
+]
+MYSQL_DROP_SQL = [
+    "ALTER TABLE ctrlfbe_pagehistory DROP INDEX pagehistory_fulltext_idx",
+]
+
+# external content FTS5 table 이라 본문은 ctrlfbe_pagehistory 에만 저장하고, trigger 로 색인만 맞춘다.
+# SQLite 는 column 을 바꿀 때 table 을 새로 만들며 trigger 도 지우므로, 이후 migration 은 SQLITE_TRIGGER_SQL 을 다시 실행한다.
+SQLITE_TRIGGER_SQL = [
+    "CREATE TRIGGER ctrlfbe_pagehistory_fts_insert AFTER INSERT ON ctrlfbe_pagehistory BEGIN "
+    "INSERT INTO ctrlfbe_pagehistory_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+    "CREATE TRIGGER ctrlfbe_pagehistory_fts_delete AFTER DELETE ON ctrlfbe_pagehistory BEGIN "
+    "INSERT INTO ctrlfbe_pagehistory_fts(ctrlfbe_pagehistory_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); END",
+    "CREATE TRIGGER ctrlfbe_pagehistory_fts_update AFTER UPDATE OF title, content ON ctrlfbe_pagehistory BEGIN "
+    "INSERT INTO ctrlfbe_pagehistory_fts(ctrlfbe_pagehistory_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO ctrlfbe_pagehistory_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+    "INSERT INTO ctrlfbe_pagehistory_fts(ctrlfbe_pagehistory_fts) VALUES ('rebuild')",
+]
+SQLITE_CREATE_SQL = [
+    "CREATE VIRTUAL TABLE ctrlfbe_pagehistory_fts USING fts5("
+    "title, content, content='ctrlfbe_pagehistory', content_rowid='id', tokenize='unicode61')",
+    *SQLITE_TRIGGER_SQL,
+]
+SQLITE_DROP_SQL = [
+    "DROP TRIGGER ctrlfbe_pagehistory_fts_insert",
+    "DROP TRIGGER ctrlfbe_pagehistory_fts_delete",
+    "DROP TRIGGER ctrlfbe_pagehistory_fts_update",
+    "DROP TABLE ctrlfbe_pagehistory_fts",
+]
+
+
+def _execute(schema_editor, statements_by_vendor):
+    for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_fulltext_index(apps, schema_editor):
+    _execute(schema_editor, {"mysql": MYSQL_CREATE_SQL, "sqlite": SQLITE_CREATE_SQL})
+
+
+def drop_fulltext_index(apps, schema_editor):
+    _execute(schema_editor, {"mysql": MYSQL_DROP_SQL, "sqlite": SQLITE_DROP_SQL})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ctrlfbe", "0023_note_topic_is_deleted"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.2.5 on 2026-10-18 13:10
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+fulltext = import_module("ctrlfbe.migrations.0024_pagehistory_fulltext")
+
+
+def restore_fulltext_triggers(apps, schema_editor):
+    # SQLite 는 column 을 추가/삭제할 때 ctrlfbe_pagehistory 를 새로 만들면서 FTS5 trigger 를 지운다.
+    fulltext._execute(schema_editor, {"sqlite": fulltext.SQLITE_TRIGGER_SQL})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ctrlfbe", "0024_pagehistory_fulltext"),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, restore_fulltext_triggers),
+        migrations.AddField(
+            model_name="pagehistory",
+            name="delta_depth",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                editable=False,
+                help_text="0 이면 content 가 전체 본문, n 이면 직전 version 에 대한 delta 이고 n 번 거슬러 가면 전체 본문이 나온다.",
+            ),
+        ),
+        migrations.RunPython(restore_fulltext_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.2.5 on 2026-10-18 14:00
+
+from importlib import import_module
+
+import common.fields
+from django.db import migrations
+
+delta_depth = import_module("ctrlfbe.migrations.0025_pagehistory_delta_depth")
+
+
+def _compress_text_columns(apps, compress):
+    Issue = apps.get_model("ctrlfbe", "Issue")
+    PageHistory = apps.get_model("ctrlfbe", "PageHistory")
+    page_histories = PageHistory.objects.all()
+    if compress:
+        page_histories = page_histories.filter(version_type="PREVIOUS")
+    common.fields.compress_column(page_histories, "content", compress=compress)
+    common.fields.compress_column(Issue.objects.all(), "reason", compress=compress)
+
+
+def compress_text_columns(apps, schema_editor):
+    _compress_text_columns(apps, compress=True)
+
+
+def decompress_text_columns(apps, schema_editor):
+    _compress_text_columns(apps, compress=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ctrlfbe", "0025_pagehistory_delta_depth"),
+    ]
+
+    operations = [
+        migrations.RunPython(migrations.RunPython.noop, delta_depth.restore_fulltext_triggers),
+        migrations.AlterField(
+            model_name="issue",
+            name="reason",
+            field=common.fields.CompressedTextField(default="", help_text="NOTE, TOPIC, PAGE CRUD에 대한 설명"),
+        ),
+        migrations.AlterField(
+            model_name="pagehistory",
+            name="content",
+            field=common.fields.CompressedTextField(compress_on_save=False),
+        ),
+        migrations.RunPython(delta_depth.restore_fulltext_triggers, migrations.RunPython.noop),
+        migrations.RunPython(compress_text_columns, decompress_text_columns),
+    ]
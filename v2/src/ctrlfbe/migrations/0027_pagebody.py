@@ -0,0 +1,161 @@
+# Generated by Django 3.2.5 on 2026-10-18 15:00
+
+import hashlib
+from importlib import import_module
+
+import common.fields
+import django.db.models.deletion
+from django.db import migrations, models
+
+fulltext = import_module("ctrlfbe.migrations.0024_pagehistory_fulltext")
+
+MOVE_CHUNK_SIZE = 1000
+
+MYSQL_CREATE_SQL = [
+    "ALTER TABLE ctrlfbe_pagehistory ADD FULLTEXT INDEX pagehistory_title_fulltext_idx (title) WITH PARSER ngram",
+    "ALTER TABLE ctrlfbe_pagebody ADD FULLTEXT INDEX pagebody_fulltext_idx (content) WITH PARSER ngram",
+]
+MYSQL_DROP_SQL = [
+    "ALTER TABLE ctrlfbe_pagehistory DROP INDEX pagehistory_title_fulltext_idx",
+    "ALTER TABLE ctrlfbe_pagebody DROP INDEX pagebody_fulltext_idx",
+]
+
+# 본문이 ctrlfbe_pagebody 로 옮겨가서 FTS5 table 은 두 table 을 join 한 view 를 external content 로 쓴다.
+# SQLite 는 column 을 바꿀 때 table 을 새로 만들며 trigger 도 지우므로, 이후 migration 은 SQLITE_TRIGGER_SQL 을 다시 실행한다.
+SQLITE_TRIGGER_SQL = [
+    "CREATE TRIGGER ctrlfbe_pagehistory_fts_insert AFTER INSERT ON ctrlfbe_pagehistory BEGIN "
+    "INSERT INTO ctrlfbe_pagehistory_fts(rowid, title, content) "
+    "SELECT new.id, new.title, content FROM ctrlfbe_pagebody WHERE hash = new.content_hash; END",
+    "CREATE TRIGGER ctrlfbe_pagehistory_fts_delete AFTER DELETE ON ctrlfbe_pagehistory BEGIN "
+    "INSERT INTO ctrlfbe_pagehistory_fts(ctrlfbe_pagehistory_fts, rowid, title, content) "
+    "SELECT 'delete', old.id, old.title, content FROM ctrlfbe_pagebody WHERE hash = old.content_hash; END",
+    "CREATE TRIGGER ctrlfbe_pagehistory_fts_update AFTER UPDATE OF title, content_hash ON ctrlfbe_pagehistory BEGIN "
+    "INSERT INTO ctrlfbe_pagehistory_fts(ctrlfbe_pagehistory_fts, rowid, title, content) "
+    "SELECT 'delete', old.id, old.title, content FROM ctrlfbe_pagebody WHERE hash = old.content_hash; "
+    "INSERT INTO ctrlfbe_pagehistory_fts(rowid, title, content) "
+    "SELECT new.id, new.title, content FROM ctrlfbe_pagebody WHERE hash = new.content_hash; END",
+    "CREATE TRIGGER ctrlfbe_pagebody_fts_update AFTER UPDATE OF content ON ctrlfbe_pagebody BEGIN "
+    "INSERT INTO ctrlfbe_pagehistory_fts(ctrlfbe_pagehistory_fts, rowid, title, content) "
+    "SELECT 'delete', id, title, old.content FROM ctrlfbe_pagehistory WHERE content_hash = old.hash; "
+    "INSERT INTO ctrlfbe_pagehistory_fts(rowid, title, content) "
+    "SELECT id, title, new.content FROM ctrlfbe_pagehistory WHERE content_hash = new.hash; END",
+    "INSERT INTO ctrlfbe_pagehistory_fts(ctrlfbe_pagehistory_fts) VALUES ('rebuild')",
+]
+SQLITE_CREATE_SQL = [
+    "CREATE VIEW ctrlfbe_pagehistory_fts_source AS "
+    "SELECT h.id AS id, h.title AS title, b.content AS content "
+    "FROM ctrlfbe_pagehistory h JOIN ctrlfbe_pagebody b ON b.hash = h.content_hash",
+    "CREATE VIRTUAL TABLE ctrlfbe_pagehistory_fts USING fts5("
+    "title, content, content='ctrlfbe_pagehistory_fts_source', content_rowid='id', tokenize='unicode61')",
+    *SQLITE_TRIGGER_SQL,
+]
+SQLITE_DROP_SQL = [
+    "DROP TRIGGER ctrlfbe_pagehistory_fts_insert",
+    "DROP TRIGGER ctrlfbe_pagehistory_fts_delete",
+    "DROP TRIGGER ctrlfbe_pagehistory_fts_update",
+    "DROP TRIGGER ctrlfbe_pagebody_fts_update",
+    "DROP TABLE ctrlfbe_pagehistory_fts",
+    "DROP VIEW ctrlfbe_pagehistory_fts_source",
+]
+
+
+def create_fulltext_index(apps, schema_editor):
+    fulltext._execute(schema_editor, {"mysql": MYSQL_CREATE_SQL, "sqlite": SQLITE_CREATE_SQL})
+
+
+def drop_fulltext_index(apps, schema_editor):
+    fulltext._execute(schema_editor, {"mysql": MYSQL_DROP_SQL, "sqlite": SQLITE_DROP_SQL})
+
+
+def move_content_to_body(apps, schema_editor):
+    PageBody = apps.get_model("ctrlfbe", "PageBody")
+    PageHistory = apps.get_model("ctrlfbe", "PageHistory")
+    last_id = 0
+    while True:
+        page_histories = list(
+            PageHistory.objects.filter(id__gt=last_id).order_by("id").only("id", "content")[:MOVE_CHUNK_SIZE]
+        )
+        if not page_histories:
+            return
+        ids_by_body = {}
+        for page_history in page_histories:
+            body = PageBody(
+                hash=hashlib.sha256(page_history.content.encode()).hexdigest(), content=page_history.content
+            )
+            ids_by_body.setdefault(body.hash, (body, []))[1].append(page_history.id)
+        PageBody.objects.bulk_create([body for body, _ in ids_by_body.values()], ignore_conflicts=True)
+        for body_hash, (_, ids) in ids_by_body.items():
+            PageHistory.objects.filter(id__in=ids).update(body_id=body_hash)
+        last_id = page_histories[-1].id
+
+
+def move_body_to_content(apps, schema_editor):
+    PageHistory = apps.get_model("ctrlfbe", "PageHistory")
+    last_id = 0
+    while True:
+        page_histories = list(
+            PageHistory.objects.filter(id__gt=last_id).order_by("id").select_related("body")[:MOVE_CHUNK_SIZE]
+        )
+        if not page_histories:
+            return
+        for page_history in page_histories:
+            page_history.content = page_history.body.content
+        PageHistory.objects.bulk_update(page_histories, ["content"])
+        last_id = page_histories[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ctrlfbe", "0026_compressed_text_fields"),
+    ]
+
+    operations = [
+        migrations.RunPython(fulltext.drop_fulltext_index, fulltext.create_fulltext_index),
+        migrations.CreateModel(
+            name="PageBody",
+            fields=[
+                (
+                    "hash",
+                    models.CharField(
+                        help_text="content 의 sha256 hex", max_length=64, primary_key=True, serialize=False
+                    ),
+                ),
+                ("content", common.fields.CompressedTextField(compress_on_save=False)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="pagehistory",
+            name="body",
+            field=models.ForeignKey(
+                db_column="content_hash",
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="ctrlfbe.pagebody",
+            ),
+        ),
+        migrations.RunPython(move_content_to_body, move_body_to_content),
+        # 되돌릴 때 content column 을 빈 값으로 다시 만든 뒤 본문을 채울 수 있도록 default 를 준다.
+        migrations.AlterField(
+            model_name="pagehistory",
+            name="content",
+            field=common.fields.CompressedTextField(compress_on_save=False, default=""),
+        ),
+        migrations.RemoveField(
+            model_name="pagehistory",
+            name="content",
+        ),
+        migrations.AlterField(
+            model_name="pagehistory",
+            name="body",
+            field=models.ForeignKey(
+                db_column="content_hash",
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="+",
+                to="ctrlfbe.pagebody",
+            ),
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
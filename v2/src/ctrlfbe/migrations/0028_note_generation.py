@@ -0,0 +1,20 @@
+# Generated by Django 3.2.5 on 2026-10-18 12:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ctrlfbe", "0027_pagebody"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="note",
+            name="generation",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, help_text="Note 와 하위 Topic/Page 조회 응답이 바뀔 때마다 올리는 cache key 번호"
+            ),
+        ),
+    ]
@@ -1,11 +1,17 @@
-from ctrlf_auth.authentication import CtrlfAuthentication
+from ctrlf_auth.authentication import AUTH_COUNT_HEADER, CtrlfAuthentication
+from django.conf import settings
+from rest_framework.views import APIView
 
 
-class CtrlfAuthenticationMixin:
-    def __init__(self):
-        self.auth = CtrlfAuthentication()
+class CtrlfAuthenticationMixin(APIView):
+    authentication_classes = [CtrlfAuthentication]
 
-    def _ctrlf_authentication(self, request):
-        self.authentication_classes = [CtrlfAuthentication]
-        user, _ = self.auth.authenticate(request)
-        return user
+    def perform_authentication(self, request):
+        # 조회 API 는 토큰 없이도 호출할 수 있으므로 request.user 에 처음 접근할 때 한 번만 인증한다.
+        pass
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if settings.DEBUG:
+            response[AUTH_COUNT_HEADER] = str(getattr(request, "ctrlf_auth_count", 0))
+        return response
@@ -1,6 +1,18 @@
+import hashlib
+from typing import Optional
+
+from common.fields import CompressedTextField, compress_column
 from common.models import CommonTimestamp
 from ctrlf_auth.models import CtrlfUser
-from django.db import models, transaction
+from django.conf import settings
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Case, Count, F, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .page_delta import apply_delta, make_delta
 
 
 class CtrlfContentType(models.TextChoices):
@@ -25,6 +37,10 @@ class CtrlfIssueStatus(models.TextChoices):
     def can_be_closed(cls):
         return {cls.REJECTED, cls.REQUESTED}
 
+    @classmethod
+    def can_be_approved(cls):
+        return {cls.REJECTED, cls.REQUESTED}
+
 
 class PageVersionType(models.TextChoices):
     CURRENT = "CURRENT", "최신"
@@ -36,28 +52,35 @@ class Note(CommonTimestamp):
     owners = models.ManyToManyField(CtrlfUser)
     title = models.CharField(max_length=100)
     is_approved = models.BooleanField(default=False)
+    is_deleted = models.BooleanField(default=False, help_text="삭제 승인 후 하위 컨텐츠가 삭제되기 전까지 True")
+    generation = models.PositiveIntegerField(
+        default=0, editable=False, help_text="Note 와 하위 Topic/Page 조회 응답이 바뀔 때마다 올리는 cache key 번호"
+    )
 
     def __str__(self):
         return f"{self.title}"
 
     def exists_owner(self, owner_id):
-        return self.owners.filter(id=owner_id).exists()
+        return any(owner.id == owner_id for owner in self.owners.all())
 
     def process_update(self, title):
         self.title = title
         self.is_approved = True
-        self.save()
+        self.save(update_fields=["title", "is_approved", "updated_at"])
 
     def process_create(self):
-        with transaction.atomic():
-            self.is_approved = True
-            self.save()
+        self.is_approved = True
+        self.save(update_fields=["is_approved", "updated_at"])
 
     def process_delete(self):
-        Issue.objects.filter(
-            action=CtrlfActionType.DELETE, related_model_id=self.id, related_model_type=CtrlfContentType.NOTE
-        ).delete()
-        self.delete()
+        # 하위 컨텐츠와 이슈는 delete_note_cascade task 가 chunk 단위로 삭제한다.
+        with transaction.atomic():
+            Issue.objects.filter(
+                action=CtrlfActionType.DELETE, related_model_id=self.id, related_model_type=CtrlfContentType.NOTE
+            ).delete()
+            Topic.objects.filter(note_id=self.id).update(is_deleted=True, updated_at=timezone.now())
+            self.is_deleted = True
+            self.save(update_fields=["is_deleted", "updated_at"])
 
 
 class Topic(CommonTimestamp):
@@ -65,68 +88,100 @@ class Topic(CommonTimestamp):
     note = models.ForeignKey("Note", on_delete=models.CASCADE)
     title = models.CharField(max_length=100)
     is_approved = models.BooleanField(default=False)
+    is_deleted = models.BooleanField(default=False, help_text="삭제 승인 후 하위 컨텐츠가 삭제되기 전까지 True")
 
     def __str__(self):
         return f"{self.note.title}-{self.title}"
 
+    def exists_owner(self, owner_id):
+        return any(owner.id == owner_id for owner in self.owners.all())
+
     def exists_note_owner(self, owner_id):
-        return self.note.owners.filter(id=owner_id).exists()
+        return self.note.exists_owner(owner_id)
 
     def process_update(self, title):
         self.title = title
         self.is_approved = True
-        self.save()
+        self.save(update_fields=["title", "is_approved", "updated_at"])
 
     def process_create(self):
-        with transaction.atomic():
-            self.is_approved = True
-            self.save()
+        self.is_approved = True
+        self.save(update_fields=["is_approved", "updated_at"])
 
     def process_delete(self):
-        Issue.objects.filter(
-            action=CtrlfActionType.DELETE, related_model_id=self.id, related_model_type=CtrlfContentType.TOPIC
-        ).delete()
-        self.delete()
+        # 하위 컨텐츠와 이슈는 delete_topic_cascade task 가 chunk 단위로 삭제한다.
+        with transaction.atomic():
+            Issue.objects.filter(
+                action=CtrlfActionType.DELETE, related_model_id=self.id, related_model_type=CtrlfContentType.TOPIC
+            ).delete()
+            self.is_deleted = True
+            self.save(update_fields=["is_deleted", "updated_at"])
 
 
 class Page(CommonTimestamp):
     owners = models.ManyToManyField(CtrlfUser)
     topic = models.ForeignKey("Topic", on_delete=models.CASCADE)
+    current_history = models.ForeignKey(
+        "PageHistory", null=True, related_name="+", on_delete=models.SET_NULL, help_text="CURRENT page_history"
+    )
+    last_version_no = models.IntegerField(default=1, help_text="마지막으로 발급한 page_history의 version_no")
+    current_history_id: Optional[int]
 
     def __str__(self):
-        page_history = self.page_history.filter(version_type=PageVersionType.CURRENT).first()
-        if page_history is None:
+        if self.current_history is None:
             return "page_history is None"
-        return f"{self.topic.note.title}-{self.topic.title}-{page_history.title}"
+        return f"{self.topic.note.title}-{self.topic.title}-{self.current_history.title}"
 
-    def exists_topic_owner(self, owner_id):
-        return self.topic.owners.filter(id=owner_id).exists()
+    def exists_owner(self, owner_id):
+        return any(owner.id == owner_id for owner in self.owners.all())
 
-    def process_update(self):
+    def exists_topic_owner(self, owner_id):
+        return self.topic.exists_owner(owner_id)
+
+    def next_version_no(self):
+        # row lock 을 잡으므로 새 PageHistory 생성과 같은 transaction 안에서 호출해야 번호가 비지 않는다.
+        Page.objects.filter(id=self.id).update(last_version_no=F("last_version_no") + 1)
+        self.refresh_from_db(fields=["last_version_no"])
+        return self.last_version_no
+
+    def process_update(self, page_history_id=None):
+        """page_history_id 의 수정 버전을, 없으면 가장 먼저 요청된 수정 버전을 CURRENT 로 승인한다."""
+        update_versions = PageHistory.page_version.to_update(self)
+        if page_history_id is not None:
+            update_versions = update_versions.filter(id=page_history_id)
+        now = timezone.now()
         with transaction.atomic():
-            prev_page_history = PageHistory.page_version.current(self).first()
-            prev_page_history.version_type = PageVersionType.PREVIOUS
-            prev_page_history.save()
-
-            new_page_history = PageHistory.page_version.to_update(self).first()
-            new_page_history.is_approved = True
-            new_page_history.version_type = PageVersionType.CURRENT
-            new_page_history.save()
-
-            self.title = new_page_history.title
-            self.content = new_page_history.content
-            self.is_approved = True
-            self.save()
+            # 승인이 동시에 또는 한 요청 안에서 여러 번 일어나도 CURRENT 가 하나만 남도록, 잠근 Page row 에서
+            # current_history_id 와 승인할 수정 버전을 함께 읽는다.
+            # SQLite 는 select_for_update 를 무시하고 읽기 lock 을 쓰기 lock 으로 올리지 못하므로 먼저 쓰기로 lock 을 잡는다.
+            if connection.vendor == "sqlite":
+                Page.objects.filter(id=self.id).update(updated_at=now)
+            current_history_id, new_page_history_id = (
+                Page.objects.select_for_update()
+                .filter(id=self.id)
+                .annotate(new_page_history_id=Subquery(update_versions.order_by("id").values("id")[:1]))
+                .values_list("current_history_id", "new_page_history_id")
+                .get()
+            )
+            if new_page_history_id is None:
+                raise PageHistory.DoesNotExist("승인할 수정 버전이 없습니다.")
+
+            PageHistory.objects.filter(id__in=[current_history_id, new_page_history_id]).update(
+                version_type=Case(
+                    When(id=new_page_history_id, then=Value(PageVersionType.CURRENT)),
+                    default=Value(PageVersionType.PREVIOUS),
+                ),
+                is_approved=Case(When(id=new_page_history_id, then=Value(True)), default=F("is_approved")),
+                updated_at=now,
+            )
+            Page.objects.filter(id=self.id).update(current_history=new_page_history_id, updated_at=now)
+            if current_history_id is not None and settings.CTRLF_PAGE_HISTORY_STORAGE["MODE"] == "delta":
+                PageHistory.objects.get(id=current_history_id).compact()
+        self.current_history_id = new_page_history_id
 
     def process_create(self):
-        with transaction.atomic():
-            self.is_approved = True
-            self.save()
-
-            page_history = self.page_history.first()
-            if page_history:
-                page_history.is_approved = True
-                page_history.save()
+        page_history_id = self.current_history_id or self.page_history.values_list("id", flat=True).first()
+        PageHistory.objects.filter(id=page_history_id).update(is_approved=True, updated_at=timezone.now())
 
     def process_delete(self):
         Issue.objects.filter(
@@ -135,9 +190,35 @@ class Page(CommonTimestamp):
         self.delete()
 
 
+class PageBody(models.Model):
+    """PageHistory 본문. sha256 으로 주소를 매겨 같은 본문은 한 번만 저장한다."""
+
+    hash = models.CharField(max_length=64, primary_key=True, help_text="content 의 sha256 hex")
+    # CURRENT 와 수정 대기 본문은 DB full-text 색인이 읽으므로 평문으로 두고, PREVIOUS 만 가리킬 때 압축한다.
+    content = CompressedTextField(compress_on_save=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.hash
+
+    @classmethod
+    def for_content(cls, content):
+        return cls(hash=hashlib.sha256(content.encode()).hexdigest(), content=content)
+
+    @classmethod
+    def store(cls, bodies, plain=False):
+        # 이미 있는 본문은 건너뛰므로 동시에 같은 본문을 저장해도 한 row 만 남는다.
+        cls.objects.bulk_create([body for body in bodies if body._state.adding], ignore_conflicts=True)
+        for body in bodies:
+            body._state.adding = False
+        if plain:
+            # PREVIOUS 만 가리킬 때 압축된 본문을 CURRENT 나 수정 대기 버전이 다시 쓰면 full-text 색인이 읽도록 압축을 푼다.
+            compress_column(cls.objects.filter(hash__in=[body.hash for body in bodies]), "content", compress=False)
+
+
 class PageHistoryQuerySet(models.QuerySet):
     def current(self, page):
-        return self.filter(page=page, version_type=PageVersionType.CURRENT)
+        return self.filter(id=page.current_history_id)
 
     def to_update(self, page):
         return self.filter(page=page, version_type=PageVersionType.UPDATE)
@@ -147,22 +228,111 @@ class PageHistory(CommonTimestamp):
     owner = models.ForeignKey(CtrlfUser, on_delete=models.CASCADE)
     page = models.ForeignKey(Page, related_name="page_history", on_delete=models.CASCADE)
     title = models.CharField(max_length=100)
-    content = models.TextField()
+    body = models.ForeignKey(PageBody, related_name="+", db_column="content_hash", on_delete=models.PROTECT)
     is_approved = models.BooleanField(default=False)
     version_no = models.IntegerField(default=1)
     version_type = models.CharField(max_length=30, choices=PageVersionType.choices)
+    delta_depth = models.PositiveSmallIntegerField(
+        default=0,
+        editable=False,
+        help_text="0 이면 content 가 전체 본문, n 이면 직전 version 에 대한 delta 이고 n 번 거슬러 가면 전체 본문이 나온다.",
+    )
     objects = models.Manager()
 
     page_version = PageHistoryQuerySet.as_manager()
 
+    class Meta:
+        indexes = [models.Index(fields=["page", "version_type"], name="pagehistory_page_type_idx")]
+        constraints = [models.UniqueConstraint(fields=["page", "version_no"], name="unique_page_version_no")]
+
     def __str__(self):
         return f"page_id:{self.page_id}-title:{self.title}-version:{self.version_no}"
 
+    @property
+    def content(self):
+        return self.body.content
+
+    @content.setter
+    def content(self, content):
+        self.body = PageBody.for_content(content)
+
+    def has_same_content(self, other):
+        return self.body_id == other.body_id
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            if PageHistory.body.is_cached(self):
+                PageBody.store([self.body], plain=self.version_type != PageVersionType.PREVIOUS)
+            super().save(*args, **kwargs)
+            if self.version_type == PageVersionType.CURRENT:
+                self._point_page_to_self()
+
+    def _point_page_to_self(self):
+        Page.objects.filter(id=self.page_id).exclude(current_history=self).update(current_history=self)
+        if PageHistory.page.is_cached(self):
+            self.page.current_history = self
+
+    def get_content(self):
+        if self.delta_depth == 0:
+            return self.content
+        # delta_depth 만큼의 이전 버전을 한 번에 읽는다. 그 사이에 기준 버전이 다시 delta 로 바뀌었으면 더 거슬러 간다.
+        chain = [self]
+        while all(page_history.delta_depth for page_history in chain):
+            oldest = chain[-1]
+            older = list(
+                PageHistory.objects.filter(
+                    page_id=self.page_id,
+                    version_no__gte=oldest.version_no - oldest.delta_depth,
+                    version_no__lt=oldest.version_no,
+                )
+                .select_related("body")
+                .order_by("-version_no")
+                .only("version_no", "delta_depth", "body", "body__content")
+            )
+            if not older:
+                raise PageHistory.DoesNotExist(f"version {oldest.version_no} 의 이전 버전이 없습니다.")
+            chain += older
+        snapshot_index = next(i for i, page_history in enumerate(chain) if page_history.delta_depth == 0)
+        content = chain[snapshot_index].content
+        for page_history in reversed(chain[:snapshot_index]):
+            content = apply_delta(content, page_history.content)
+        return content
+
+    def compact(self):
+        """PREVIOUS 가 된 버전을 직전 버전에 대한 delta 로 바꾼다. SNAPSHOT_INTERVAL 마다 전체 본문을 남긴다."""
+        if self.delta_depth:
+            return
+        base = PageHistory.objects.filter(page_id=self.page_id, version_no=self.version_no - 1).first()
+        if base is None or base.delta_depth + 1 >= settings.CTRLF_PAGE_HISTORY_STORAGE["SNAPSHOT_INTERVAL"]:
+            return
+        # 본문이 같으면 이미 같은 PageBody 를 함께 쓰고 있어 delta 로 바꿔도 줄어들지 않는다.
+        if base.delta_depth == 0 and self.has_same_content(base):
+            return
+        delta = make_delta(base.get_content(), self.content)
+        if len(delta) >= len(self.content):
+            return
+        self.content, self.delta_depth = delta, base.delta_depth + 1
+        PageBody.store([self.body])
+        PageHistory.objects.filter(id=self.id).update(body=self.body, delta_depth=self.delta_depth)
+
+
+class IssueQuerySet(models.QuerySet):
+    def change_status(self, status):
+        with transaction.atomic():
+            changing_ids = list(self.exclude(status=status).select_for_update().values_list("id", flat=True))
+            changing = Issue.objects.filter(id__in=changing_ids)
+            counts = list(changing.values("status", "related_model_type").annotate(count=Count("id")))
+            updated = changing.update(status=status)
+            for row in counts:
+                IssueCounter.add(row["status"], row["related_model_type"], -row["count"])
+                IssueCounter.add(status, row["related_model_type"], row["count"])
+        return updated
+
 
 class Issue(CommonTimestamp):
     owner = models.ForeignKey(CtrlfUser, on_delete=models.CASCADE, help_text="이슈를 생성한 사람")
     title = models.CharField(max_length=100)
-    reason = models.TextField(default="", help_text="NOTE, TOPIC, PAGE CRUD에 대한 설명")
+    reason = CompressedTextField(default="", help_text="NOTE, TOPIC, PAGE CRUD에 대한 설명")
     status = models.CharField(max_length=30, choices=CtrlfIssueStatus.choices, help_text="Issue 상태들")
     related_model_type = models.CharField(
         max_length=30, choices=CtrlfContentType.choices, help_text="NOTE, TOPIC, PAGE"
@@ -170,15 +340,141 @@ class Issue(CommonTimestamp):
     related_model_id = models.IntegerField(default=0, help_text="note_id, topic_id, page_history_id")
     action = models.CharField(max_length=30, default="", choices=CtrlfActionType.choices, help_text="CRUD")
     etc = models.CharField(max_length=300, null=True, help_text="legacy title을 저장하는 용도 및 다양하게 사용")
+    note_id = models.IntegerField(null=True, help_text="이슈 대상 컨텐츠가 속한 note_id")
+    topic_id = models.IntegerField(null=True, help_text="이슈 대상 컨텐츠가 속한 topic_id (TOPIC, PAGE)")
+    page_id = models.IntegerField(null=True, help_text="이슈 대상 page_id (PAGE)")
+    version_no = models.IntegerField(null=True, help_text="이슈 대상 page_history의 version_no (PAGE)")
+
+    objects = IssueQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["related_model_type", "related_model_id", "action"], name="issue_related_model_idx"),
+            models.Index(fields=["status", "id"], name="issue_status_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.title}-{self.related_model_type}-{self.related_model_id}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        issue = super().from_db(db, field_names, values)
+        issue._saved_status = issue.__dict__.get("status")
+        return issue
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        if adding and self.note_id is None:
+            self.set_location()
+        saved_status = getattr(self, "_saved_status", None)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                IssueCounter.add(self.status, self.related_model_type)
+            elif saved_status is not None and saved_status != self.status:
+                IssueCounter.add(saved_status, self.related_model_type, -1)
+                IssueCounter.add(self.status, self.related_model_type)
+        self._saved_status = self.status
+
+    def set_location(self, related_model=None):
+        if related_model is None:
+            related_model = self._get_location_model()
+
+        if isinstance(related_model, PageHistory):
+            self.note_id = related_model.page.topic.note_id
+            self.topic_id = related_model.page.topic_id
+            self.page_id = related_model.page_id
+            self.version_no = related_model.version_no
+        elif isinstance(related_model, Topic):
+            self.note_id = related_model.note_id
+            self.topic_id = related_model.id
+        elif isinstance(related_model, Note):
+            self.note_id = related_model.id
+
+    def _get_location_model(self):
+        queryset = {
+            CtrlfContentType.PAGE: PageHistory.objects.select_related("page__topic"),
+            CtrlfContentType.NOTE: Note.objects.all(),
+            CtrlfContentType.TOPIC: Topic.objects.all(),
+        }[self.related_model_type]
+        return queryset.filter(id=self.related_model_id).first()
+
     def get_ctrlf_content(self):
-        page_history = PageHistory.objects.filter(id=self.related_model_id).first()
-        page = page_history and page_history.page
-        return {
-            CtrlfContentType.PAGE: page,
-            CtrlfContentType.NOTE: Note.objects.filter(id=self.related_model_id).first(),
-            CtrlfContentType.TOPIC: Topic.objects.filter(id=self.related_model_id).first(),
-        }.get(self.related_model_type)
+        return self.get_ctrlf_contents([self]).get(self.id)
+
+    @classmethod
+    def get_ctrlf_contents(cls, issues):
+        content_querysets = {
+            CtrlfContentType.PAGE: PageHistory.objects.select_related("page__topic__note").prefetch_related(
+                "page__owners", "page__topic__owners"
+            ),
+            CtrlfContentType.TOPIC: Topic.objects.select_related("note").prefetch_related("owners", "note__owners"),
+            CtrlfContentType.NOTE: Note.objects.prefetch_related("owners"),
+        }
+        ctrlf_contents = {}
+        for content_type, content_queryset in content_querysets.items():
+            typed_issues = [issue for issue in issues if issue.related_model_type == content_type]
+            if not typed_issues:
+                continue
+            content_map = content_queryset.in_bulk({issue.related_model_id for issue in typed_issues})
+            for issue in typed_issues:
+                content = content_map.get(issue.related_model_id)
+                if content_type == CtrlfContentType.PAGE and content is not None:
+                    content = content.page
+                ctrlf_contents[issue.id] = content
+        return ctrlf_contents
+
+
+class IssueCounter(models.Model):
+    status = models.CharField(max_length=30, choices=CtrlfIssueStatus.choices)
+    related_model_type = models.CharField(max_length=30, choices=CtrlfContentType.choices)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["status", "related_model_type"], name="unique_issue_counter")]
+
+    def __str__(self):
+        return f"{self.status}-{self.related_model_type}-{self.count}"
+
+    @classmethod
+    def add(cls, status, related_model_type, amount=1):
+        counter = cls.objects.filter(status=status, related_model_type=related_model_type)
+        if counter.update(count=F("count") + amount):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(status=status, related_model_type=related_model_type, count=amount)
+        except IntegrityError:
+            counter.update(count=F("count") + amount)
+
+    @classmethod
+    def total(cls, **filters):
+        return cls.objects.filter(**filters).aggregate(total=Coalesce(Sum("count"), 0))["total"]
+
+    @classmethod
+    def reconcile(cls):
+        with transaction.atomic():
+            counters = {
+                (counter.status, counter.related_model_type): counter for counter in cls.objects.select_for_update()
+            }
+            actual_counts = {
+                (row["status"], row["related_model_type"]): row["count"]
+                for row in Issue.objects.values("status", "related_model_type").annotate(count=Count("id"))
+            }
+            drifted_counters = []
+            for status in CtrlfIssueStatus.values:
+                for related_model_type in CtrlfContentType.values:
+                    key = (status, related_model_type)
+                    counter = counters.get(key) or cls.objects.create(
+                        status=status, related_model_type=related_model_type
+                    )
+                    if counter.count != actual_counts.get(key, 0):
+                        counter.count = actual_counts.get(key, 0)
+                        drifted_counters.append(counter)
+            cls.objects.bulk_update(drifted_counters, ["count"])
+        return len(drifted_counters)
+
+
+@receiver(post_delete, sender=Issue)
+def decrease_issue_counter(sender, instance, **kwargs):
+    IssueCounter.add(instance.status, instance.related_model_type, -1)
@@ -24,6 +24,11 @@ urlpatterns = [
         ),
         name="topic_list",
     ),
+    path(
+        "<int:note_id>/tree/",
+        NoteViewSet.as_view({"get": "tree"}),
+        name="note_tree",
+    ),
     path(
         "<int:note_id>/",
         NoteViewSet.as_view({"get": "retrieve", "put": "update", "delete": "delete"}),
@@ -0,0 +1,26 @@
+import json
+from difflib import SequenceMatcher
+from typing import List, Union
+
+# delta 는 JSON 배열이다. [start, end] 는 이전 버전의 start:end 줄을 그대로 쓰고, 문자열은 그 내용을 끼워 넣는다.
+
+
+def make_delta(base, target):
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    operations: List[Union[List[int], str]] = []
+    matcher = SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    for tag, base_start, base_end, target_start, target_end in matcher.get_opcodes():
+        if tag == "equal":
+            operations.append([base_start, base_end])
+        elif tag in ("replace", "insert"):
+            operations.append("".join(target_lines[target_start:target_end]))
+    return json.dumps(operations, ensure_ascii=False, separators=(",", ":"))
+
+
+def apply_delta(base, delta):
+    base_lines = base.splitlines(keepends=True)
+    return "".join(
+        operation if isinstance(operation, str) else "".join(base_lines[operation[0] : operation[1]])
+        for operation in json.loads(delta)
+    )
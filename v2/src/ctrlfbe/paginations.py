@@ -1,28 +1,105 @@
-from ctrlfbe.constants import MAX_PRINTABLE_NOTE_COUNT
-from ctrlfbe.models import Note
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from typing import Optional
+
+from ctrlfbe.constants import ERR_INVALID_CURSOR, MAX_PRINTABLE_NOTE_COUNT
+from rest_framework.exceptions import ValidationError
 from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 
 
-class NoteListPagination(CursorPagination):
+class KeysetCursorPagination(CursorPagination):
+    """id 기준 keyset pagination.
+
+    cursor 는 마지막으로 내려준 id 를 감싼 opaque 문자열이고, has_more 는 page_size + 1 개를 조회해서 판단한다.
+    기존 클라이언트가 보내는 정수 cursor 는 OFFSET 으로 처리하고 정수 next_cursor 를 그대로 내려준다.
+    """
+
+    page_size = MAX_PRINTABLE_NOTE_COUNT
     max_page_size = MAX_PRINTABLE_NOTE_COUNT
+    ordering = "id"
+    results_key = "results"
+    offset: Optional[int] = None
 
     def paginate_queryset(self, queryset, request, view=None):
-        self.current_cursor = int(request.query_params["cursor"])
-        notes = Note.objects.all()[self.current_cursor : self.current_cursor + MAX_PRINTABLE_NOTE_COUNT]
-        return notes
+        cursor = request.query_params.get(self.cursor_query_param, "")
+        queryset = queryset.order_by(self.ordering)
+        if cursor.isdigit():
+            self.offset = int(cursor)
+            rows = list(queryset[self.offset : self.offset + self.page_size + 1])
+        else:
+            self.offset = None
+            rows = list(queryset.filter(id__gt=self._decode_cursor(cursor))[: self.page_size + 1])
+
+        self.has_more = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
 
     def get_paginated_response(self, data):
-        return Response(data={"next_cursor": self.current_cursor + len(data), "notes": data})
+        return Response(data={"next_cursor": self.get_next_cursor(), "has_more": self.has_more, self.results_key: data})
 
+    def get_next_cursor(self):
+        if self.offset is not None:
+            return self.offset + len(self.page)
+        if not self.has_more:
+            return None
+        return self._encode_cursor(self.page[-1].id)
+
+    def _encode_cursor(self, last_id):
+        return urlsafe_b64encode(str(last_id).encode()).decode().rstrip("=")
+
+    def _decode_cursor(self, cursor):
+        if not cursor:
+            return 0
+        try:
+            last_id = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        except (BinasciiError, UnicodeDecodeError):
+            raise ValidationError(ERR_INVALID_CURSOR)
+        if not last_id.isdigit():
+            raise ValidationError(ERR_INVALID_CURSOR)
+        return int(last_id)
+
+
+class NoteListPagination(KeysetCursorPagination):
+    results_key = "notes"
 
-class IssueListPagination(CursorPagination):
-    max_page_size = MAX_PRINTABLE_NOTE_COUNT
+
+class IssueListPagination(KeysetCursorPagination):
+    results_key = "issues"
+
+
+class TopicListPagination(KeysetCursorPagination):
+    """cursor 를 보내지 않는 기존 클라이언트에게는 pagination 없이 전체 list 를 내려준다."""
+
+    results_key = "topics"
 
     def paginate_queryset(self, queryset, request, view=None):
-        self.current_cursor = int(request.query_params["cursor"])
-        issues = queryset[self.current_cursor : self.current_cursor + MAX_PRINTABLE_NOTE_COUNT]
-        return issues
+        if self.cursor_query_param not in request.query_params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
 
-    def get_paginated_response(self, data):
-        return Response(data={"next_cursor": self.current_cursor + len(data), "issues": data})
+
+class SearchResultPagination(KeysetCursorPagination):
+    """검색 결과를 (score, 문서 key) 기준 keyset 으로 나눈다. cursor 는 마지막 hit 의 score 와 key 를 감싼다."""
+
+    def paginate_search(self, search_index, query, request):
+        after = self._decode_search_cursor(request.query_params.get(self.cursor_query_param, ""))
+        hits = search_index.search(query, self.page_size + 1, after)
+        self.offset = None
+        self.has_more = len(hits) > self.page_size
+        self.page = hits[: self.page_size]
+        return self.page
+
+    def get_next_cursor(self):
+        if not self.has_more:
+            return None
+        return self._encode_cursor(f"{self.page[-1].score}:{self.page[-1].key}")
+
+    def _decode_search_cursor(self, cursor):
+        if not cursor:
+            return None
+        try:
+            score, key = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode().split(":")
+            return float(score), int(key)
+        except (BinasciiError, UnicodeDecodeError, ValueError):
+            raise ValidationError(ERR_INVALID_CURSOR)
@@ -0,0 +1,11 @@
+from django.conf import settings
+
+from .database import DatabaseSearchBackend
+from .documents import get_search_index
+
+SEARCH_BACKENDS = {"index": get_search_index, "database": DatabaseSearchBackend}
+
+
+def get_search_backend(name=None):
+    """CTRLF_SEARCH_INDEX["BACKEND"] 의 검색 backend 를 돌려준다. 모두 search(query, limit, after) 와 index_size() 를 가진다."""
+    return SEARCH_BACKENDS[name or settings.CTRLF_SEARCH_INDEX["BACKEND"]]()
@@ -0,0 +1,97 @@
+from ctrlfbe.models import CtrlfContentType
+from django.db import connection
+
+from .documents import KEY_ID_MASK, make_key
+from .index import SearchHit
+from .tokenizer import WORD_PATTERN, normalize
+
+# 두 backend 모두 score 가 클수록 앞에 오도록 맞춘다. FTS5 의 bm25() 는 작을수록 관련도가 높아 부호를 뒤집는다.
+# MySQL 은 title 과 본문(ctrlfbe_pagebody)이 다른 table 이라 FULLTEXT 색인도 따로 있어서, FTS5 처럼 검색어마다 title 이나
+# 본문 중 한 곳에 있는 Page 를 찾고(MYSQL_WORD_CONDITION 의 AND) title 점수에 가중치를 준다.
+SEARCH_SQL = {
+    "mysql": """
+        SELECT MATCH(h.title) AGAINST (%s IN BOOLEAN MODE) * 2 + MATCH(b.content) AGAINST (%s IN BOOLEAN MODE) AS score,
+               p.id, h.title, t.note_id, p.topic_id
+        FROM ctrlfbe_page p
+        JOIN ctrlfbe_pagehistory h ON h.id = p.current_history_id
+        JOIN ctrlfbe_pagebody b ON b.hash = h.content_hash
+        JOIN ctrlfbe_topic t ON t.id = p.topic_id
+        WHERE {match_condition} AND h.is_approved AND NOT t.is_deleted
+        {after_condition}
+        ORDER BY score DESC, p.id
+        LIMIT %s
+    """,
+    "sqlite": """
+        SELECT score, page_id, title, note_id, topic_id FROM (
+            SELECT -bm25(ctrlfbe_pagehistory_fts, 2.0, 1.0) AS score,
+                   p.id AS page_id, h.title AS title, t.note_id AS note_id, p.topic_id AS topic_id
+            FROM ctrlfbe_pagehistory_fts
+            JOIN ctrlfbe_pagehistory h ON h.id = ctrlfbe_pagehistory_fts.rowid
+            JOIN ctrlfbe_page p ON p.current_history_id = h.id
+            JOIN ctrlfbe_topic t ON t.id = p.topic_id
+            WHERE {match_condition} AND h.is_approved AND NOT t.is_deleted
+        )
+        {after_condition}
+        ORDER BY score DESC, page_id
+        LIMIT %s
+    """,
+}
+AFTER_CONDITION = {
+    "mysql": "HAVING score < %s OR (score = %s AND p.id > %s)",
+    "sqlite": "WHERE score < %s OR (score = %s AND page_id > %s)",
+}
+MYSQL_WORD_CONDITION = "(MATCH(h.title) AGAINST (%s IN BOOLEAN MODE) OR MATCH(b.content) AGAINST (%s IN BOOLEAN MODE))"
+
+INDEX_SIZE_SQL = {
+    "mysql": """
+        SELECT COALESCE(SUM(ts.FILE_SIZE), 0)
+        FROM information_schema.INNODB_TABLESPACES ts
+        JOIN information_schema.INNODB_TABLES t
+          ON t.NAME IN (CONCAT(DATABASE(), '/ctrlfbe_pagehistory'), CONCAT(DATABASE(), '/ctrlfbe_pagebody'))
+        WHERE ts.NAME LIKE CONCAT(DATABASE(), '/fts\\_', LPAD(LOWER(HEX(t.TABLE_ID)), 16, '0'), '\\_%')
+    """,
+    "sqlite": "SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name LIKE 'ctrlfbe_pagehistory_fts%'",
+}
+
+
+class DatabaseSearchBackend:
+    """CURRENT PageHistory 의 title/content 를 DB 의 full-text 색인으로 검색한다.
+
+    MySQL 은 ngram parser FULLTEXT 색인을, SQLite 는 trigger 로 동기화하는 FTS5 table 을 쓴다(0024, 0027 migration).
+    SearchIndex 와 같은 search(query, limit, after) 로 호출하며 Page 만 검색한다.
+    """
+
+    def search(self, query, limit, after=None):
+        words = WORD_PATTERN.findall(normalize(query))
+        if not words:
+            return []
+        vendor = connection.vendor
+        match_condition, params = self._match(words)
+        after_condition = ""
+        if after is not None:
+            after_score, after_key = after
+            after_condition = AFTER_CONDITION[vendor]
+            params += [after_score, after_score, after_key & KEY_ID_MASK]
+        with connection.cursor() as cursor:
+            sql = SEARCH_SQL[vendor].format(match_condition=match_condition, after_condition=after_condition)
+            cursor.execute(sql, [*params, limit])
+            rows = cursor.fetchall()
+        return [
+            SearchHit(score, make_key(CtrlfContentType.PAGE, page_id), title, note_id, topic_id)
+            for score, page_id, title, note_id, topic_id in rows
+        ]
+
+    def index_size(self):
+        with connection.cursor() as cursor:
+            cursor.execute(INDEX_SIZE_SQL[connection.vendor])
+            return cursor.fetchone()[0]
+
+    def _match(self, words):
+        """검색어 조건 SQL 과 score 및 조건에 넘길 parameter 를 돌려준다."""
+        if connection.vendor == "mysql":
+            # ngram parser 는 따옴표로 감싼 단어를 n-gram phrase 로 찾는다. score 는 모든 단어로 한 번에 계산한다.
+            phrases = [f'"{word}"' for word in words]
+            match_condition = " AND ".join([MYSQL_WORD_CONDITION] * len(phrases))
+            return match_condition, [" ".join(phrases)] * 2 + [phrase for phrase in phrases for _ in range(2)]
+        # unicode61 tokenizer 는 띄어쓰기 단위로 색인하므로 조사가 붙은 단어도 찾도록 prefix 로 검색한다.
+        return "ctrlfbe_pagehistory_fts MATCH %s", [" ".join(f'"{word}"*' for word in words)]
@@ -0,0 +1,97 @@
+from collections import Counter
+from typing import Dict
+
+from common.fields import decode_text
+from ctrlfbe.models import CtrlfContentType, Note, Page, Topic
+from django.conf import settings
+
+from .index import SearchIndex
+from .segment import SearchDocument, Tombstones
+from .tokenizer import tokenize
+
+TITLE_BOOST = 2
+KEY_BITS = 32
+KEY_ID_MASK = (1 << KEY_BITS) - 1
+CONTENT_TYPE_CODES = {CtrlfContentType.NOTE: 1, CtrlfContentType.TOPIC: 2, CtrlfContentType.PAGE: 3}
+CONTENT_TYPES_BY_CODE = {code: content_type for content_type, code in CONTENT_TYPE_CODES.items()}
+
+_search_indexes: Dict[str, SearchIndex] = {}
+
+
+def get_search_index():
+    config = settings.CTRLF_SEARCH_INDEX
+    search_index = _search_indexes.get(config["DIR"])
+    if search_index is None:
+        search_index = _search_indexes.setdefault(
+            config["DIR"], SearchIndex(config["DIR"], max_segments=config["MAX_SEGMENTS"])
+        )
+    return search_index
+
+
+def make_key(content_type, content_id):
+    return CONTENT_TYPE_CODES[content_type] << KEY_BITS | content_id
+
+
+def split_key(key):
+    return CONTENT_TYPES_BY_CODE[key >> KEY_BITS], key & KEY_ID_MASK
+
+
+def make_document(content_type, content_id, title, content="", note_id=None, topic_id=None):
+    terms: Counter = Counter(tokenize(title) * TITLE_BOOST + tokenize(content))
+    return SearchDocument(make_key(content_type, content_id), title, note_id, topic_id, terms)
+
+
+def iter_documents():
+    """검색 대상(승인되고 삭제되지 않은 Note/Topic 과 승인된 CURRENT PageHistory)을 모두 문서로 만든다."""
+    for note_id, title in Note.objects.filter(is_approved=True, is_deleted=False).values_list("id", "title").iterator():
+        yield make_document(CtrlfContentType.NOTE, note_id, title, note_id=note_id)
+    for topic_id, title, note_id in (
+        Topic.objects.filter(is_approved=True, is_deleted=False).values_list("id", "title", "note_id").iterator()
+    ):
+        yield make_document(CtrlfContentType.TOPIC, topic_id, title, note_id=note_id, topic_id=topic_id)
+    for page_id, topic_id, note_id, title, content in (
+        _searchable_pages()
+        .values_list("id", "topic_id", "topic__note_id", "current_history__title", "current_history__body__content")
+        .iterator()
+    ):
+        # values_list 는 압축된 본문을 StoredText 그대로 돌려준다.
+        yield make_document(CtrlfContentType.PAGE, page_id, title, decode_text(content), note_id, topic_id)
+
+
+def load_document(content_type, content_id):
+    if content_type == CtrlfContentType.NOTE:
+        note = Note.objects.filter(id=content_id, is_approved=True, is_deleted=False).first()
+        return note and make_document(content_type, note.id, note.title, note_id=note.id)
+    if content_type == CtrlfContentType.TOPIC:
+        topic = Topic.objects.filter(id=content_id, is_approved=True, is_deleted=False).first()
+        return topic and make_document(content_type, topic.id, topic.title, note_id=topic.note_id, topic_id=topic.id)
+    page = _searchable_pages().select_related("topic", "current_history__body").filter(id=content_id).first()
+    return page and make_document(
+        content_type,
+        page.id,
+        page.current_history.title,
+        page.current_history.content,
+        page.topic.note_id,
+        page.topic_id,
+    )
+
+
+def index_content(content_type, content_id):
+    """승인 처리된 컨텐츠 하나를 색인에 반영한다. 검색 대상이 아니게 된 Note/Topic 은 하위 문서까지 가린다."""
+    document = load_document(content_type, content_id)
+    if document is not None:
+        get_search_index().add_segment([document])
+    elif content_type == CtrlfContentType.NOTE:
+        get_search_index().add_segment([], Tombstones(note_ids=[content_id]))
+    elif content_type == CtrlfContentType.TOPIC:
+        get_search_index().add_segment([], Tombstones(topic_ids=[content_id]))
+    else:
+        get_search_index().add_segment([], Tombstones(keys=[make_key(content_type, content_id)]))
+
+
+def rebuild_index():
+    get_search_index().rebuild(iter_documents())
+
+
+def _searchable_pages():
+    return Page.objects.filter(topic__is_deleted=False, current_history__is_approved=True)
@@ -0,0 +1,251 @@
+import fcntl
+import heapq
+import json
+import math
+import os
+import threading
+from bisect import bisect_left
+from collections import namedtuple
+from contextlib import contextmanager
+from itertools import compress, repeat
+from operator import neg
+from pathlib import Path
+from typing import List, Set, Tuple
+
+from .segment import Segment, Tombstones, merge_segments, write_segment
+from .tokenizer import tokenize
+
+MANIFEST_NAME = "MANIFEST"
+LOCK_NAME = "LOCK"
+BM25_K1 = 1.2
+BM25_B = 0.75
+BISECT_RATIO = 16
+
+SearchHit = namedtuple("SearchHit", ["score", "key", "title", "note_id", "topic_id"])
+
+
+class SearchIndex:
+    """directory 안의 segment 들로 이루어진 검색 색인.
+
+    MANIFEST 에 적힌 순서대로 segment 를 열고, 뒤 segment 의 tombstone 이 앞 segment 의 문서를 가린다.
+    쓰기는 LOCK 파일의 flock 으로 process 간 직렬화하고, 읽기는 MANIFEST 의 generation 이 바뀌었을 때만 다시 연다.
+    BM25 통계는 Lucene 처럼 병합 전까지 가려진 문서도 포함한다.
+    """
+
+    def __init__(self, directory, max_segments=16):
+        self.directory = Path(directory)
+        self.max_segments = max_segments
+        self._lock = threading.Lock()
+        self._generation = None
+        self._segments = []
+        self._tombstones_after = []
+
+    def search(self, query, limit, after=None):
+        """query 의 token 을 모두 포함한 문서를 BM25 점수 내림차순, key 오름차순으로 limit 개 돌려준다.
+
+        after 는 직전 page 마지막 hit 의 (score, key) 이고, 그 뒤의 hit 만 돌려준다.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        segments, tombstones_after = self._refresh()
+        doc_count = sum(segment.doc_count for segment in segments)
+        if not terms or not doc_count:
+            return []
+
+        term_nos = [{term: segment.find_term(term) for term in terms} for segment in segments]
+        document_frequencies = {
+            term: sum(
+                segment.document_frequency(term_nos[segment_no][term])
+                for segment_no, segment in enumerate(segments)
+                if term_nos[segment_no][term] is not None
+            )
+            for term in terms
+        }
+        idfs = {term: math.log(1 + (doc_count - df + 0.5) / (df + 0.5)) for term, df in document_frequencies.items()}
+        average_length = sum(segment.total_length for segment in segments) / doc_count
+
+        ranked: List[Tuple[float, int, int, int]] = []
+        for segment_no, segment in enumerate(segments):
+            if None in term_nos[segment_no].values():
+                continue
+            doc_idxs, scores = _score_segment(segment, term_nos[segment_no], idfs, average_length)
+            ranked += zip(map(neg, scores), map(segment.doc_keys.__getitem__, doc_idxs), repeat(segment_no), doc_idxs)
+        if after is not None:
+            # 같은 (score, key) 는 직전 page 의 마지막 hit 이므로 segment_no 자리에 inf 를 두어 함께 거른다.
+            after_rank = (-after[0], after[1], math.inf)
+            ranked = [rank for rank in ranked if rank > after_rank]
+
+        # 가려진 문서는 드물기 때문에 상위 후보만 골라 확인하고, 모자랄 때만 후보를 늘린다.
+        candidate_count = limit
+        while True:
+            top_ranked = heapq.nsmallest(candidate_count, ranked)
+            live_ranked = [rank for rank in top_ranked if _is_live(segments, tombstones_after, rank[2], rank[3])]
+            if len(live_ranked) >= limit or len(top_ranked) < candidate_count:
+                break
+            candidate_count *= 2
+
+        return [
+            SearchHit(
+                -negative_score,
+                key,
+                segments[segment_no].title(doc_idx),
+                segments[segment_no].doc_notes[doc_idx],
+                segments[segment_no].doc_topics[doc_idx],
+            )
+            for negative_score, key, segment_no, doc_idx in live_ranked[:limit]
+        ]
+
+    def add_segment(self, documents, tombstones=Tombstones()):
+        """documents 를 새 segment 로 덧붙인다. 같은 key 의 이전 문서는 새 segment 의 tombstone 으로 가린다."""
+        documents = list(documents)
+        tombstones = Tombstones(
+            sorted({*tombstones.keys, *(document.key for document in documents)}),
+            tombstones.note_ids,
+            tombstones.topic_ids,
+        )
+        with self._write_lock():
+            generation, segment_names = self._read_manifest()
+            segment_names = [*segment_names, self._write_new_segment(generation, documents, tombstones)]
+            if len(segment_names) > self.max_segments:
+                segment_names = [segment_names[0], self._merge(generation, segment_names[1:])]
+            self._write_manifest(generation + 1, segment_names)
+
+    def rebuild(self, documents):
+        """documents 만 담은 segment 하나로 색인을 통째로 바꾼다."""
+        with self._write_lock():
+            generation, _ = self._read_manifest()
+            self._write_manifest(generation + 1, [self._write_new_segment(generation, documents)])
+
+    def index_size(self):
+        _, segment_names = self._read_manifest()
+        return sum((self.directory / name).stat().st_size for name in segment_names)
+
+    def _merge(self, generation, segment_names):
+        segments = [Segment(self.directory / name) for name in segment_names]
+        try:
+            name = self._segment_name(generation, "merged")
+            tombstones_after = _tombstones_after(segments)
+            merge_segments(
+                self.directory / name,
+                segments,
+                lambda segment_no, doc_idx: _is_live(segments, tombstones_after, segment_no, doc_idx),
+            )
+        finally:
+            for segment in segments:
+                segment.close()
+        return name
+
+    def _write_new_segment(self, generation, documents, tombstones=Tombstones()):
+        name = self._segment_name(generation)
+        write_segment(self.directory / name, documents, tombstones)
+        return name
+
+    def _segment_name(self, generation, suffix="new"):
+        return f"segment-{generation + 1:010d}-{suffix}.bin"
+
+    def _refresh(self):
+        with self._lock:
+            generation, segment_names = self._read_manifest()
+            while generation != self._generation:
+                try:
+                    self._open_segments(segment_names)
+                except FileNotFoundError:
+                    # manifest 를 읽은 사이에 다른 process 가 segment 를 병합했으면 새 manifest 로 다시 연다.
+                    generation, segment_names = self._read_manifest()
+                    continue
+                self._generation = generation
+            return self._segments, self._tombstones_after
+
+    def _open_segments(self, segment_names):
+        # 다른 thread 가 아직 검색 중일 수 있으므로 빠진 segment 의 mmap 은 참조가 사라질 때 닫히게 둔다.
+        opened = {segment.path.name: segment for segment in self._segments}
+        segments = [opened.get(name) or Segment(self.directory / name) for name in segment_names]
+        self._segments = segments
+        self._tombstones_after = _tombstones_after(segments)
+
+    def _read_manifest(self):
+        try:
+            with open(self.directory / MANIFEST_NAME) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return 0, []
+        return manifest["generation"], manifest["segments"]
+
+    def _write_manifest(self, generation, segment_names):
+        tmp_path = self.directory / f"{MANIFEST_NAME}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"generation": generation, "segments": segment_names}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.directory / MANIFEST_NAME)
+        # 이미 열린 mmap 은 파일이 지워져도 유효하므로 manifest 에서 빠진 segment 는 바로 지운다.
+        for path in self.directory.glob("segment-*.bin"):
+            if path.name not in segment_names:
+                path.unlink()
+
+    @contextmanager
+    def _write_lock(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / LOCK_NAME, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _score_segment(segment, term_nos, idfs, average_length):
+    # df 가 작은 term 부터 교집합을 좁힌다. postings 가 후보보다 훨씬 길면 bisect 로, 아니면 dict 로 tf 를 찾는다.
+    terms = sorted(term_nos, key=lambda term: segment.document_frequency(term_nos[term]))
+    candidates = segment.doc_ids(term_nos[terms[0]])
+    term_tfs = {terms[0]: segment.tfs(term_nos[terms[0]])}
+    for term in terms[1:]:
+        doc_ids, tfs = segment.doc_ids(term_nos[term]), segment.tfs(term_nos[term])
+        if len(candidates) * BISECT_RATIO < len(doc_ids):
+            found_tfs = _find_tfs(candidates, doc_ids, tfs)
+        else:
+            found_tfs = list(map(dict(zip(doc_ids, tfs)).get, candidates))
+        # tf 는 1 이상이므로 찾지 못한 후보(None)만 걸러진다.
+        candidates = list(compress(candidates, found_tfs))
+        term_tfs = {matched: list(compress(matched_tfs, found_tfs)) for matched, matched_tfs in term_tfs.items()}
+        term_tfs[term] = list(filter(None, found_tfs))
+
+    norms = [
+        BM25_K1 * (1 - BM25_B + BM25_B * length / average_length)
+        for length in map(segment.doc_lengths.__getitem__, candidates)
+    ]
+    scores = [0.0] * len(candidates)
+    for term, tfs in term_tfs.items():
+        idf = idfs[term]
+        scores = [score + idf * tf * (BM25_K1 + 1) / (tf + norm) for score, tf, norm in zip(scores, tfs, norms)]
+    return candidates, scores
+
+
+def _find_tfs(candidates, doc_ids, tfs):
+    found_tfs, low = [], 0
+    for doc_idx in candidates:
+        low = bisect_left(doc_ids, doc_idx, low)
+        found_tfs.append(tfs[low] if low < len(doc_ids) and doc_ids[low] == doc_idx else None)
+    return found_tfs
+
+
+def _tombstones_after(segments):
+    tombstones_after = []
+    keys: Set[int] = set()
+    note_ids: Set[int] = set()
+    topic_ids: Set[int] = set()
+    for segment in reversed(segments):
+        tombstones_after.append((frozenset(keys), frozenset(note_ids), frozenset(topic_ids)))
+        keys |= segment.tombstone_keys
+        note_ids |= segment.tombstone_notes
+        topic_ids |= segment.tombstone_topics
+    return tombstones_after[::-1]
+
+
+def _is_live(segments, tombstones_after, segment_no, doc_idx):
+    segment = segments[segment_no]
+    keys, note_ids, topic_ids = tombstones_after[segment_no]
+    return not (
+        segment.doc_keys[doc_idx] in keys
+        or segment.doc_notes[doc_idx] in note_ids
+        or segment.doc_topics[doc_idx] in topic_ids
+    )
@@ -0,0 +1,225 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import Counter, namedtuple
+from typing import Dict, List, Tuple
+
+MAGIC = b"CTRLFSG1"
+HEADER = struct.Struct("<8sI")
+ALIGNMENT = 8
+
+SearchDocument = namedtuple("SearchDocument", ["key", "title", "note_id", "topic_id", "terms"])
+Tombstones = namedtuple("Tombstones", ["keys", "note_ids", "topic_ids"], defaults=[(), (), ()])
+
+
+class SegmentError(Exception):
+    pass
+
+
+def write_segment(path, documents, tombstones=Tombstones()):
+    """문서를 역색인으로 뒤집어 path 에 segment 파일 하나로 쓴다.
+
+    section 은 8 byte 로 정렬한 array 이고, header 의 json 에 section 별 (offset, length) 를 적는다.
+    postings 는 term 마다 정렬된 doc_idx 들 뒤에 같은 순서의 tf 들을 이어 붙인 uint32 array 이다.
+    """
+    doc_keys, doc_lengths, doc_notes, doc_topics = array("Q"), array("I"), array("I"), array("I")
+    title_offsets, titles = array("Q", [0]), bytearray()
+    postings: Dict[str, Tuple[array, array]] = {}
+    for doc_idx, document in enumerate(documents):
+        doc_keys.append(document.key)
+        doc_lengths.append(sum(document.terms.values()))
+        doc_notes.append(document.note_id or 0)
+        doc_topics.append(document.topic_id or 0)
+        titles += document.title.encode()
+        title_offsets.append(len(titles))
+        for term, tf in document.terms.items():
+            entries = postings.get(term)
+            if entries is None:
+                entries = postings[term] = (array("I"), array("I"))
+            entries[0].append(doc_idx)
+            entries[1].append(tf)
+
+    term_offsets, terms = array("Q", [0]), bytearray()
+    postings_offsets, postings_data = array("Q", [0]), array("I")
+    for encoded_term, term in sorted((term.encode(), term) for term in postings):
+        terms += encoded_term
+        term_offsets.append(len(terms))
+        doc_ids, tfs = postings.pop(term)
+        postings_data += doc_ids
+        postings_data += tfs
+        postings_offsets.append(len(postings_data) // 2)
+
+    sections = {
+        "doc_keys": doc_keys,
+        "doc_lengths": doc_lengths,
+        "doc_notes": doc_notes,
+        "doc_topics": doc_topics,
+        "title_offsets": title_offsets,
+        "titles": titles,
+        "term_offsets": term_offsets,
+        "terms": terms,
+        "postings_offsets": postings_offsets,
+        "postings": postings_data,
+        "tombstone_keys": array("Q", tombstones.keys),
+        "tombstone_notes": array("I", tombstones.note_ids),
+        "tombstone_topics": array("I", tombstones.topic_ids),
+    }
+    layout, offset = {}, 0
+    for name, data in sections.items():
+        length = len(data) * getattr(data, "itemsize", 1)
+        layout[name] = [offset, length]
+        offset += _padding(length) + length
+    header = json.dumps(
+        {
+            "byteorder": sys.byteorder,
+            "doc_count": len(doc_keys),
+            "total_length": sum(doc_lengths),
+            "sections": layout,
+        }
+    ).encode()
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(header)))
+        f.write(header)
+        f.write(b"\0" * _padding(HEADER.size + len(header)))
+        for data in sections.values():
+            encoded = data.tobytes() if isinstance(data, array) else bytes(data)
+            f.write(encoded)
+            f.write(b"\0" * _padding(len(encoded)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def merge_segments(path, segments, is_live):
+    """segments 의 살아있는 문서와 tombstone 을 segment 하나로 합친다.
+
+    segment 에는 역색인만 있으므로 term 을 훑어 문서별 term 빈도를 다시 모은다.
+    """
+    documents: List[SearchDocument] = []
+    tombstones = Tombstones(set(), set(), set())
+    for segment_no, segment in enumerate(segments):
+        doc_terms: Dict[int, Counter] = {
+            doc_idx: Counter() for doc_idx in range(segment.doc_count) if is_live(segment_no, doc_idx)
+        }
+        for term, (doc_ids, tfs) in segment.iter_postings():
+            for doc_idx, tf in zip(doc_ids, tfs):
+                if doc_idx in doc_terms:
+                    doc_terms[doc_idx][term] = tf
+        documents.extend(
+            SearchDocument(
+                segment.doc_keys[doc_idx],
+                segment.title(doc_idx),
+                segment.doc_notes[doc_idx],
+                segment.doc_topics[doc_idx],
+                terms,
+            )
+            for doc_idx, terms in doc_terms.items()
+        )
+        tombstones.keys.update(segment.tombstone_keys)
+        tombstones.note_ids.update(segment.tombstone_notes)
+        tombstones.topic_ids.update(segment.tombstone_topics)
+    write_segment(path, documents, Tombstones(*(sorted(ids) for ids in tombstones)))
+
+
+class Segment:
+    """write_segment 로 쓴 파일을 memory-map 으로 연다.
+
+    문서 단위 array 와 term offset 은 처음 열 때 읽고, term 문자열/postings/title 은 필요할 때 mmap 에서 읽는다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, header_length = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self._mmap.close()
+            raise SegmentError(f"segment 파일이 아닙니다: {path}")
+        header = json.loads(self._mmap[HEADER.size : HEADER.size + header_length])
+        self._byteswap = header["byteorder"] != sys.byteorder
+        self._data_offset = HEADER.size + header_length + _padding(HEADER.size + header_length)
+        self._sections = header["sections"]
+        self.doc_count = header["doc_count"]
+        self.total_length = header["total_length"]
+
+        self.doc_keys = self._array("doc_keys", "Q")
+        self.doc_lengths = self._array("doc_lengths", "I")
+        self.doc_notes = self._array("doc_notes", "I")
+        self.doc_topics = self._array("doc_topics", "I")
+        self._title_offsets = self._array("title_offsets", "Q")
+        self._term_offsets = self._array("term_offsets", "Q")
+        self._postings_offsets = self._array("postings_offsets", "Q")
+        self.tombstone_keys = frozenset(self._array("tombstone_keys", "Q"))
+        self.tombstone_notes = frozenset(self._array("tombstone_notes", "I"))
+        self.tombstone_topics = frozenset(self._array("tombstone_topics", "I"))
+
+    @property
+    def term_count(self):
+        return len(self._term_offsets) - 1
+
+    def find_term(self, term):
+        encoded_term = term.encode()
+        low, high = 0, self.term_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._term(middle) < encoded_term:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.term_count and self._term(low) == encoded_term:
+            return low
+        return None
+
+    def document_frequency(self, term_no):
+        return self._postings_offsets[term_no + 1] - self._postings_offsets[term_no]
+
+    def doc_ids(self, term_no):
+        start = self._postings_offsets[term_no] * 2
+        return self._uint32s(start, start + self.document_frequency(term_no))
+
+    def tfs(self, term_no):
+        start = self._postings_offsets[term_no] * 2 + self.document_frequency(term_no)
+        return self._uint32s(start, start + self.document_frequency(term_no))
+
+    def iter_postings(self):
+        for term_no in range(self.term_count):
+            yield self._term(term_no).decode(), (self.doc_ids(term_no), self.tfs(term_no))
+
+    def title(self, doc_idx):
+        start = self._section_start("titles")
+        return self._mmap[start + self._title_offsets[doc_idx] : start + self._title_offsets[doc_idx + 1]].decode()
+
+    def close(self):
+        self._mmap.close()
+
+    def _term(self, term_no):
+        start = self._section_start("terms")
+        return self._mmap[start + self._term_offsets[term_no] : start + self._term_offsets[term_no + 1]]
+
+    def _uint32s(self, start, end):
+        values = array("I")
+        offset = self._section_start("postings")
+        values.frombytes(self._mmap[offset + start * values.itemsize : offset + end * values.itemsize])
+        if self._byteswap:
+            values.byteswap()
+        return values
+
+    def _array(self, name, typecode):
+        start, length = self._section_start(name), self._sections[name][1]
+        values = array(typecode)
+        values.frombytes(self._mmap[start : start + length])
+        if self._byteswap:
+            values.byteswap()
+        return values
+
+    def _section_start(self, name):
+        return self._data_offset + self._sections[name][0]
+
+
+def _padding(length):
+    return -length % ALIGNMENT
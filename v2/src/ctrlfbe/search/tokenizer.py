@@ -0,0 +1,21 @@
+import re
+import unicodedata
+
+NGRAM_SIZE = 2
+
+# 영문/숫자는 단어 단위로, 한글처럼 띄어쓰기와 조사가 붙는 문자는 n-gram 으로 자른다.
+WORD_PATTERN = re.compile(r"[a-z0-9]+|[^\W_a-z0-9]+")
+
+
+def normalize(text):
+    return unicodedata.normalize("NFKC", text or "").lower()
+
+
+def tokenize(text):
+    tokens = []
+    for word in WORD_PATTERN.findall(normalize(text)):
+        if word.isascii() or len(word) <= NGRAM_SIZE:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i : i + NGRAM_SIZE] for i in range(len(word) - NGRAM_SIZE + 1))
+    return tokens
@@ -1,8 +1,10 @@
 from django.http import Http404
 from rest_framework import serializers
 
+from .constants import MAX_BULK_ISSUE_COUNT, MAX_SEARCH_QUERY_LENGTH
 from .models import (
     CtrlfContentType,
+    CtrlfIssueStatus,
     Issue,
     Note,
     Page,
@@ -10,6 +12,7 @@ from .models import (
     PageVersionType,
     Topic,
 )
+from .search.documents import split_key
 
 
 class NoteListSerializer(serializers.ListSerializer):
@@ -36,7 +39,7 @@ class NoteDeleteResponseSerializer(serializers.Serializer):
 class NoteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Note
-        fields = "__all__"
+        exclude = ["generation"]
         read_only_fields = ["id", "created_at"]
         list_serializer_class = NoteListSerializer
 
@@ -53,6 +56,9 @@ class NoteCreateRequestBodySerializer(serializers.Serializer):
 
 
 class TopicSerializer(serializers.ModelSerializer):
+    # 삭제 승인된 Note 는 cascade task 가 지울 때까지 남아 있으므로 부모로 받지 않는다.
+    note = serializers.PrimaryKeyRelatedField(queryset=Note.objects.filter(is_deleted=False))
+
     class Meta:
         model = Topic
         fields = "__all__"
@@ -103,9 +109,11 @@ class TopicCreateRequestBodySerializer(serializers.Serializer):
 
 
 class PageHistorySerializer(serializers.ModelSerializer):
+    content = serializers.CharField()
+
     class Meta:
         model = PageHistory
-        fields = "__all__"
+        exclude = ["body"]
 
     def create(self, validated_data):
         owner = validated_data.pop("owner")
@@ -117,11 +125,12 @@ class PageHistorySerializer(serializers.ModelSerializer):
 class PageCreateSerializer(serializers.ModelSerializer):
     title = serializers.CharField(required=True)
     content = serializers.CharField(required=True)
+    topic = serializers.PrimaryKeyRelatedField(queryset=Topic.objects.filter(is_deleted=False, note__is_deleted=False))
 
     class Meta:
         model = Page
         fields = "__all__"
-        read_only_fields = ["id", "created_at"]
+        read_only_fields = ["id", "created_at", "current_history", "last_version_no"]
 
     def create(self, validated_data):
         owner = validated_data["owners"][0]
@@ -147,7 +156,7 @@ class PageDetailSerializer(serializers.ModelSerializer):
 
     def to_representation(self, page):
         version_no = self.context["version_no"]
-        page_history = page.page_history.filter(page=page, version_no=version_no).first()
+        page_history = page.page_history.filter(page=page, version_no=version_no).select_related("body").first()
         if page_history is None:
             raise Http404("No PageHistory matches the given query.")
         owners = serializers.PrimaryKeyRelatedField(many=True, queryset=page.owners.all())
@@ -160,7 +169,7 @@ class PageDetailSerializer(serializers.ModelSerializer):
             "owners": owners.to_representation(page.owners.all()),
             "issue_id": issue_id,
             "title": page_history.title,
-            "content": page_history.content,
+            "content": page_history.get_content(),
             "is_approved": page_history.is_approved,
             "version_no": version_no,
             "version_type": page_history.version_type,
@@ -173,19 +182,41 @@ class PageListSerializer(serializers.ModelSerializer):
         exclude = ["created_at", "updated_at"]
 
     def to_representation(self, page):
-        page_history = page.page_history.filter(version_type=PageVersionType.CURRENT).first()
-        owners = serializers.PrimaryKeyRelatedField(many=True, queryset=page.owners.all())
+        # PageViewSet.get_child_queryset 에서 current_history 와 owners 를 미리 불러온다.
+        page_history = page.current_history
 
         return {
             "id": page.id,
-            "owners": owners.to_representation(page.owners.all()),
-            "topic": page.topic.id,
+            "owners": [owner.id for owner in page.owners.all()],
+            "topic": page.topic_id,
             "title": page_history.title,
             "version_no": page_history.version_no,
             "is_approved": page_history.is_approved,
         }
 
 
+class PageTreeSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField(source="current_history.title")
+    version_no = serializers.IntegerField(source="current_history.version_no")
+    is_approved = serializers.BooleanField(source="current_history.is_approved")
+
+
+class TopicTreeSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    is_approved = serializers.BooleanField()
+    pages = PageTreeSerializer(many=True, source="tree_pages")
+
+
+class NoteTreeSerializer(serializers.Serializer):
+    # NoteViewSet.get_tree_queryset 에서 topic 과 page 의 current_history 를 미리 불러온다.
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    is_approved = serializers.BooleanField()
+    topics = TopicTreeSerializer(many=True, source="tree_topics")
+
+
 class PageCreateRequestBodySerializer(serializers.Serializer):
     topic_id = serializers.IntegerField()
     title = serializers.CharField()
@@ -210,21 +241,24 @@ class IssueCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Issue
         fields = "__all__"
+        read_only_fields = ["note_id", "topic_id", "page_id", "version_no"]
 
     def create(self, validated_data):
         owner = validated_data.pop("owner")
         related_model = validated_data.pop("related_model")
         related_model_id = related_model.id
         validated_data["etc"] = related_model.title
-        issue = Issue.objects.create(owner=owner, related_model_id=related_model_id, **validated_data)
+        issue = Issue(owner=owner, related_model_id=related_model_id, **validated_data)
+        issue.set_location(related_model)
+        issue.save()
         return issue
 
 
 class IssueDetailSerializer(serializers.Serializer):
-    note_id = serializers.SerializerMethodField()
-    topic_id = serializers.SerializerMethodField()
-    page_id = serializers.SerializerMethodField()
-    version_no = serializers.SerializerMethodField()
+    note_id = serializers.IntegerField()
+    topic_id = serializers.IntegerField()
+    page_id = serializers.IntegerField()
+    version_no = serializers.IntegerField()
 
     id = serializers.IntegerField()
     owner = serializers.EmailField()
@@ -238,36 +272,6 @@ class IssueDetailSerializer(serializers.Serializer):
     def get_legacy_title(self, issue):
         return issue.etc or ""
 
-    def get_page_id(self, issue):
-        if issue.related_model_type == CtrlfContentType.PAGE:
-            return PageHistory.objects.get(id=issue.related_model_id).page.id
-        return None
-
-    def get_topic_id(self, issue):
-        if issue.related_model_type == CtrlfContentType.TOPIC:
-            return issue.related_model_id
-        elif issue.related_model_type == CtrlfContentType.PAGE:
-            page = PageHistory.objects.get(id=issue.related_model_id).page
-            return Topic.objects.get(id=page.topic.id).id
-        else:
-            return None
-
-    def get_note_id(self, issue):
-        if issue.related_model_type == CtrlfContentType.NOTE:
-            return issue.related_model_id
-        elif issue.related_model_type == CtrlfContentType.TOPIC:
-            topic = Topic.objects.get(id=issue.related_model_id)
-        else:
-            page = PageHistory.objects.get(id=issue.related_model_id).page
-            topic = Topic.objects.get(id=page.topic.id)
-        return Note.objects.get(id=topic.note.id).id
-
-    def get_version_no(self, issue):
-        if issue.related_model_type != CtrlfContentType.PAGE:
-            return None
-        page_history = PageHistory.objects.get(id=issue.related_model_id)
-        return page_history.version_no
-
 
 class IssueActionResponseSerializer(serializers.Serializer):
     message = serializers.CharField()
@@ -277,6 +281,22 @@ class IssueActionRequestBodySerializer(serializers.Serializer):
     issue_id = serializers.IntegerField()
 
 
+class IssueBulkActionRequestBodySerializer(serializers.Serializer):
+    issue_ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=MAX_BULK_ISSUE_COUNT
+    )
+
+
+class IssueBulkActionResultSerializer(serializers.Serializer):
+    issue_id = serializers.IntegerField()
+    status = serializers.IntegerField()
+    message = serializers.CharField()
+
+
+class IssueBulkActionResponseSerializer(serializers.Serializer):
+    results = IssueBulkActionResultSerializer(many=True)
+
+
 class ImageUploadRequestBodySerializer(serializers.Serializer):
     image = serializers.ImageField()
 
@@ -287,3 +307,37 @@ class ImageSerializer(serializers.Serializer):
 
 class IssueCountSerializer(serializers.Serializer):
     issues_count = serializers.IntegerField()
+
+
+class IssueCountQuerySerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=CtrlfIssueStatus.choices, required=False)
+    related_model_type = serializers.ChoiceField(choices=CtrlfContentType.choices, required=False)
+
+
+class SearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=MAX_SEARCH_QUERY_LENGTH)
+    cursor = serializers.CharField(required=False)
+
+
+class SearchResultSerializer(serializers.Serializer):
+    content_type = serializers.SerializerMethodField()
+    content_id = serializers.SerializerMethodField()
+    title = serializers.CharField()
+    note_id = serializers.IntegerField()
+    topic_id = serializers.SerializerMethodField()
+    score = serializers.FloatField()
+
+    def get_content_type(self, hit):
+        return split_key(hit.key)[0]
+
+    def get_content_id(self, hit):
+        return split_key(hit.key)[1]
+
+    def get_topic_id(self, hit):
+        return hit.topic_id or None
+
+
+class SearchResponseSerializer(serializers.Serializer):
+    next_cursor = serializers.CharField(allow_null=True)
+    has_more = serializers.BooleanField()
+    results = SearchResultSerializer(many=True)
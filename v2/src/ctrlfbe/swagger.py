@@ -3,6 +3,9 @@ from ctrlfbe.serializers import (
     ImageUploadRequestBodySerializer,
     IssueActionRequestBodySerializer,
     IssueActionResponseSerializer,
+    IssueBulkActionRequestBodySerializer,
+    IssueBulkActionResponseSerializer,
+    IssueCountQuerySerializer,
     IssueCountSerializer,
     IssueDetailSerializer,
     IssueListSerializer,
@@ -10,6 +13,7 @@ from ctrlfbe.serializers import (
     NoteDeleteRequestBodySerializer,
     NoteDeleteResponseSerializer,
     NoteSerializer,
+    NoteTreeSerializer,
     NoteUpdateRequestBodySerializer,
     NoteUpdateResponseSerializer,
     PageCreateRequestBodySerializer,
@@ -19,6 +23,8 @@ from ctrlfbe.serializers import (
     PageDetailSerializer,
     PageListSerializer,
     PageUpdateRequestBodySerializer,
+    SearchQuerySerializer,
+    SearchResponseSerializer,
     TopicCreateRequestBodySerializer,
     TopicDeleteRequestBodySerializer,
     TopicDeleteResponseSerializer,
@@ -37,7 +43,9 @@ SWAGGER_PAGE_LIST_VIEW = {
 SWAGGER_TOPIC_LIST_VIEW = {
     "responses": {200: TopicSerializer(many=True)},
     "operation_summary": "Topic List API",
-    "operation_description": "note_id에 해당하는 topic들의 list를 리턴해줍니다",
+    "operation_description": "note_id에 해당하는 topic들의 list를 리턴해줍니다\n"
+    "cursor를 보내면 {next_cursor, has_more, topics} 형태로 30개씩 리턴하고, "
+    "stream=ndjson을 보내면 topic을 한 줄에 하나씩 application/x-ndjson으로 스트리밍합니다",
     "tags": ["디테일 화면"],
 }
 
@@ -48,16 +56,24 @@ SWAGGER_NOTE_DETAIL_VIEW = {
     "tags": ["디테일 화면"],
 }
 
+SWAGGER_NOTE_TREE_VIEW = {
+    "responses": {200: NoteTreeSerializer()},
+    "operation_summary": "Note Tree API",
+    "operation_description": "note_id에 해당하는 Note와 topic들, 각 page의 최신 title/version_no/is_approved를 한 번에 리턴합니다",
+    "tags": ["디테일 화면"],
+}
+
 SWAGGER_NOTE_LIST_VIEW = {
     "responses": {200: NoteSerializer(many=True)},
     "operation_summary": "Note List API",
-    "operation_description": "Cursor based pagination 처리된 Note List를 리턴 합니다",
+    "operation_description": "Cursor based pagination 처리된 Note List를 리턴 합니다. next_cursor 를 그대로 cursor 로 보내면 다음 페이지를 조회합니다",
     "tags": ["메인 화면"],
 }
 SWAGGER_ISSUE_COUNT = {
     "responses": {200: IssueCountSerializer()},
     "operation_summary": "Issue Count API",
-    "operation_description": "모든 이슈 개수를 리턴합니다.",
+    "operation_description": "이슈 개수를 리턴합니다. status, related_model_type 으로 필터링 할 수 있습니다.",
+    "query_serializer": IssueCountQuerySerializer,
     "tags": ["메인 화면"],
 }
 
@@ -194,6 +210,39 @@ SWAGGER_ISSUE_CLOSE_VIEW = {
     "tags": ["이슈 화면"],
 }
 
+SWAGGER_ISSUE_BULK_APPROVE_VIEW = {
+    "responses": {200: IssueBulkActionResponseSerializer(), 401: IssueActionResponseSerializer()},
+    "request_body": IssueBulkActionRequestBodySerializer(),
+    "operation_summary": "Issue Bulk Approve API",
+    "operation_description": "issue_ids에 해당하는 Issue들의 content를 한 번에 승인하고, Issue별 결과를 리턴합니다",
+    "tags": ["이슈 화면"],
+}
+
+SWAGGER_ISSUE_BULK_DELETE_VIEW = {
+    "responses": {200: IssueBulkActionResponseSerializer(), 401: IssueActionResponseSerializer()},
+    "request_body": IssueBulkActionRequestBodySerializer(),
+    "operation_summary": "Issue Bulk Delete API",
+    "operation_description": "issue_ids에 해당하는 Issue들을 한 번에 삭제하고, Issue별 결과를 리턴합니다",
+    "tags": ["이슈 화면"],
+}
+
+SWAGGER_ISSUE_BULK_CLOSE_VIEW = {
+    "responses": {200: IssueBulkActionResponseSerializer(), 401: IssueActionResponseSerializer()},
+    "request_body": IssueBulkActionRequestBodySerializer(),
+    "operation_summary": "Issue Bulk Close API",
+    "operation_description": "issue_ids에 해당하는 Issue들의 상태를 한 번에 Closed로 변경하고, Issue별 결과를 리턴합니다",
+    "tags": ["이슈 화면"],
+}
+
+SWAGGER_SEARCH_VIEW = {
+    "responses": {200: SearchResponseSerializer()},
+    "operation_summary": "Search API",
+    "operation_description": "승인된 Note, Topic 제목과 Page 제목/내용에서 q 를 검색해 BM25 점수 순으로 리턴합니다. "
+    "다음 페이지는 next_cursor 를 cursor 로 넘겨 조회합니다.",
+    "query_serializer": SearchQuerySerializer,
+    "tags": ["메인 화면"],
+}
+
 SWAGGER_IMAGE_UPLOAD_VIEW = {
     "operation_summary": "Image Upload API",
     "operation_description": "Page content의 이미지를 aws s3에 업로드합니다.",
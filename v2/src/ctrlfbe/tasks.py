@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+from common.fields import compress_column
+from config.celery import app
+from ctrlfbe.constants import CASCADE_DELETE_CHUNK_SIZE
+from ctrlfbe.models import (
+    CtrlfContentType,
+    Issue,
+    IssueCounter,
+    Note,
+    Page,
+    PageBody,
+    PageHistory,
+    PageVersionType,
+    Topic,
+)
+from ctrlfbe.search.documents import index_content, rebuild_index
+from django.db import transaction
+from django.utils import timezone
+
+
+@app.task
+def reconcile_issue_counters():
+    return IssueCounter.reconcile()
+
+
+@app.task
+def delete_note_cascade(note_id):
+    if not Note.objects.filter(id=note_id, is_deleted=True).exists():
+        return 0
+    return _delete_all_in_chunks(
+        PageHistory.objects.filter(page__topic__note_id=note_id),
+        Page.objects.filter(topic__note_id=note_id),
+        Topic.objects.filter(note_id=note_id),
+        Issue.objects.filter(note_id=note_id),
+        Note.objects.filter(id=note_id),
+    )
+
+
+@app.task
+def delete_topic_cascade(topic_id):
+    if not Topic.objects.filter(id=topic_id, is_deleted=True).exists():
+        return 0
+    return _delete_all_in_chunks(
+        PageHistory.objects.filter(page__topic_id=topic_id),
+        Page.objects.filter(topic_id=topic_id),
+        Issue.objects.filter(topic_id=topic_id),
+        Topic.objects.filter(id=topic_id),
+    )
+
+
+@app.task
+def cleanup_orphaned_issues():
+    content_models = {
+        CtrlfContentType.NOTE: Note,
+        CtrlfContentType.TOPIC: Topic,
+        CtrlfContentType.PAGE: PageHistory,
+    }
+    return _delete_all_in_chunks(
+        *(
+            Issue.objects.filter(related_model_type=content_type).exclude(
+                related_model_id__in=content_model.objects.values("id")
+            )
+            for content_type, content_model in content_models.items()
+        )
+    )
+
+
+@app.task
+def cleanup_orphaned_page_bodies():
+    # 방금 저장해서 아직 commit 되지 않은 PageHistory 가 가리킬 수 있으므로 하루 지난 본문만 지운다.
+    return _delete_all_in_chunks(
+        PageBody.objects.filter(created_at__lt=timezone.now() - timedelta(days=1)).exclude(
+            hash__in=PageHistory.objects.values("body_id")
+        )
+    )
+
+
+@app.task
+def update_search_index(content_type, content_id):
+    index_content(content_type, content_id)
+
+
+@app.task
+def rebuild_search_index():
+    rebuild_index()
+
+
+@app.task
+def compress_text_columns(compress=True):
+    """CompressedTextField 를 table 별로 압축(compress=False 면 해제)하고 (바꾼 row 수, 변환 전 byte, 변환 후 byte) 를 돌려준다."""
+    page_bodies = PageBody.objects.all()
+    if compress:
+        # CURRENT 나 수정 대기 버전이 함께 쓰는 본문은 full-text 색인이 읽으므로 평문으로 둔다.
+        page_bodies = page_bodies.exclude(
+            hash__in=PageHistory.objects.exclude(version_type=PageVersionType.PREVIOUS).values("body_id")
+        )
+    return {
+        PageBody._meta.db_table: compress_column(page_bodies, "content", compress=compress),
+        Issue._meta.db_table: compress_column(Issue.objects.all(), "reason", compress=compress),
+    }
+
+
+def _delete_all_in_chunks(*querysets):
+    return sum(_delete_in_chunks(queryset) for queryset in querysets)
+
+
+def _delete_in_chunks(queryset):
+    # 긴 transaction 으로 lock 을 오래 잡지 않도록 id 를 chunk 단위로 끊어서 삭제한다.
+    deleted_count = 0
+    while True:
+        chunk_ids = list(queryset.values_list("pk", flat=True)[:CASCADE_DELETE_CHUNK_SIZE])
+        if not chunk_ids:
+            return deleted_count
+        with transaction.atomic():
+            queryset.model.objects.filter(pk__in=chunk_ids).delete()
+        deleted_count += len(chunk_ids)
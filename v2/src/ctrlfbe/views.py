@@ -1,9 +1,20 @@
+from functools import partial
+
 from common.s3.client import S3Client
+from ctrlf_auth.models import CtrlfUser
+from ctrlfbe.constants import (
+    BULK_ISSUE_CHUNK_SIZE,
+    ERR_ISSUE_CONTENT_NOT_FOUND,
+    ERR_ISSUE_NOT_FOUND,
+)
 from ctrlfbe.mixins import CtrlfAuthenticationMixin
 from ctrlfbe.swagger import (
     SWAGGER_HEALTH_CHECK_VIEW,
     SWAGGER_IMAGE_UPLOAD_VIEW,
     SWAGGER_ISSUE_APPROVE_VIEW,
+    SWAGGER_ISSUE_BULK_APPROVE_VIEW,
+    SWAGGER_ISSUE_BULK_CLOSE_VIEW,
+    SWAGGER_ISSUE_BULK_DELETE_VIEW,
     SWAGGER_ISSUE_CLOSE_VIEW,
     SWAGGER_ISSUE_COUNT,
     SWAGGER_ISSUE_DELETE_VIEW,
@@ -13,12 +24,14 @@ from ctrlfbe.swagger import (
     SWAGGER_NOTE_DELETE_VIEW,
     SWAGGER_NOTE_DETAIL_VIEW,
     SWAGGER_NOTE_LIST_VIEW,
+    SWAGGER_NOTE_TREE_VIEW,
     SWAGGER_NOTE_UPDATE_VIEW,
     SWAGGER_PAGE_CREATE_VIEW,
     SWAGGER_PAGE_DELETE_VIEW,
     SWAGGER_PAGE_DETAIL_VIEW,
     SWAGGER_PAGE_LIST_VIEW,
     SWAGGER_PAGE_UPDATE_VIEW,
+    SWAGGER_SEARCH_VIEW,
     SWAGGER_TOPIC_CREATE_VIEW,
     SWAGGER_TOPIC_DELETE_VIEW,
     SWAGGER_TOPIC_DETAIL_VIEW,
@@ -26,7 +39,10 @@ from ctrlfbe.swagger import (
     SWAGGER_TOPIC_UPDATE_VIEW,
 )
 from django.conf import settings
-from django.db.models import Q
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.http import StreamingHttpResponse
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
 from rest_framework.generics import get_object_or_404
@@ -36,51 +52,91 @@ from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet
 
 from .basedata import NoteData, PageData, TopicData
+from .cache import response_cache
+from .conditional import ContentState
 from .models import (
     CtrlfActionType,
     CtrlfIssueStatus,
     Issue,
+    IssueCounter,
     Note,
     Page,
-    PageHistory,
     Topic,
 )
-from .paginations import IssueListPagination, NoteListPagination
+from .paginations import (
+    IssueListPagination,
+    NoteListPagination,
+    SearchResultPagination,
+    TopicListPagination,
+)
+from .search.backends import get_search_backend
 from .serializers import (
+    IssueBulkActionRequestBodySerializer,
+    IssueCountQuerySerializer,
     IssueCountSerializer,
     IssueCreateSerializer,
     IssueDetailSerializer,
     IssueListSerializer,
     NoteSerializer,
+    NoteTreeSerializer,
     PageCreateSerializer,
     PageDetailSerializer,
     PageHistorySerializer,
     PageListSerializer,
+    SearchQuerySerializer,
+    SearchResultSerializer,
     TopicSerializer,
 )
+from .tasks import delete_note_cascade, delete_topic_cascade, update_search_index
 
 s3_client = S3Client()
 
 
+def _prefetch_owner_ids():
+    return Prefetch("owners", queryset=CtrlfUser.objects.only("id"))
+
+
 class BaseContentViewSet(CtrlfAuthenticationMixin, ModelViewSet):
     def paginated_list(self, request, *args, **kwargs):
         return super().list(request, *args, **kwargs)
 
     def list(self, request, *args, **kwargs):
-        parent_model_kwargs = self.get_parent_kwargs(list(kwargs.values())[0])
-        self.queryset = self.child_model.objects.filter(**parent_model_kwargs)
+        parent_id = list(kwargs.values())[0]
+        content_state = ContentState.of_children(self.parent_model, parent_id, request)
+        if content_state is None:
+            self.get_parent_kwargs(parent_id)
+        list_children = partial(self.list_children, request, parent_id, *args, **kwargs)
+        return self.read_response(request, content_state, list_children)
+
+    def list_children(self, request, parent_id, *args, **kwargs):
+        # 부모가 있는지는 ContentState 를 만들 때 확인했으므로 id 로만 거른다.
+        parent_name = str(self.parent_model._meta).split(".")[1]
+        self.queryset = self.get_child_queryset().filter(**{f"{parent_name}_id": parent_id})
 
         return super().list(request, *args, **kwargs)
 
+    def read_response(self, request, content_state, build_response):
+        # content 가 없으면 content_state 가 None 이므로 build_response 가 404 응답을 만든다.
+        if content_state is None:
+            return build_response()
+        response = content_state.not_modified_response(request) or response_cache.get_or_set(
+            content_state.note_id, content_state.generation, request, build_response
+        )
+        content_state.set_headers(response)
+        return response
+
+    def get_child_queryset(self):
+        return self.child_model.objects.all()
+
     def get_parent_kwargs(self, parent_id):
         parent_name = str(self.parent_model._meta).split(".")[1]
-        parent_queryset = self.parent_model.objects.filter(id=parent_id)
+        parent_queryset = self.parent_model.objects.filter(id=parent_id, is_deleted=False)
         parent = get_object_or_404(parent_queryset)
 
         return {parent_name: parent}
 
     def create(self, request, *args, **data):
-        ctrlf_user = self._ctrlf_authentication(request)
+        ctrlf_user = request.user
         model_data, issue_data = self.append_ctrlf_user(data, ctrlf_user)
 
         related_model_serializer = self.get_serializer(data=model_data)
@@ -88,12 +144,15 @@ class BaseContentViewSet(CtrlfAuthenticationMixin, ModelViewSet):
 
         related_model_serializer.is_valid(raise_exception=True)
         issue_serializer.is_valid(raise_exception=True)
-        issue_serializer.save(related_model=related_model_serializer.save())
+        with transaction.atomic():
+            related_model = related_model_serializer.save()
+            issue_serializer.save(related_model=related_model)
+            response_cache.bump(related_model)
 
         return Response(status=status.HTTP_201_CREATED)
 
     def update(self, request, *args, **issue_data):
-        ctrlf_user = self._ctrlf_authentication(request)
+        ctrlf_user = request.user
         issue_data["owner"] = ctrlf_user.id
 
         issue_serializer = IssueCreateSerializer(data=issue_data)
@@ -103,24 +162,26 @@ class BaseContentViewSet(CtrlfAuthenticationMixin, ModelViewSet):
         return Response(data={"message": "Note 수정 이슈를 생성하였습니다."}, status=status.HTTP_200_OK)
 
     def delete(self, request, *args, **issue_data):
-        ctrlf_user = self._ctrlf_authentication(request)
+        ctrlf_user = request.user
         issue_data["owner"] = ctrlf_user.id
 
-        if self.get_object().__class__ is Page:
-            page_history = PageHistory.objects.get(page=self.get_object())
-            issue_data["title"] = f"{page_history.title} 삭제"
-        else:
-            issue_data["title"] = f"{self.get_object().title} 삭제"
+        related_model = self.get_delete_target()
+        issue_data["title"] = f"{related_model.title} 삭제"
 
         issue_serializer = IssueCreateSerializer(data=issue_data)
         issue_serializer.is_valid(raise_exception=True)
-        if self.get_object().__class__ is Page:
-            issue_serializer.save(related_model=page_history)
-        else:
-            issue_serializer.save(related_model=self.get_object())
+        issue_serializer.save(related_model=related_model)
 
         return Response(data={"message": "삭제 이슈를 생성하였습니다."}, status=status.HTTP_200_OK)
 
+    def get_object(self):
+        if not hasattr(self, "_object"):
+            self._object = super().get_object()
+        return self._object
+
+    def get_delete_target(self):
+        return self.get_object()
+
     def append_ctrlf_user(self, data, ctrlf_user):
         if self.serializer_class is PageHistorySerializer:
             data["model_data"]["owner"] = ctrlf_user.id
@@ -131,14 +192,20 @@ class BaseContentViewSet(CtrlfAuthenticationMixin, ModelViewSet):
 
 
 class NoteViewSet(BaseContentViewSet):
-    queryset = Note.objects.all()
+    queryset = Note.objects.filter(is_deleted=False)
     serializer_class = NoteSerializer
     pagination_class = NoteListPagination
     lookup_url_kwarg = "note_id"
 
+    def get_queryset(self):
+        if self.action in ("list", "retrieve"):
+            return super().get_queryset().prefetch_related(_prefetch_owner_ids())
+        return super().get_queryset()
+
     @swagger_auto_schema(**SWAGGER_NOTE_LIST_VIEW)
     def list(self, request, *args, **kwargs):
-        return super().paginated_list(request, *args, **kwargs)
+        paginated_list = partial(super().paginated_list, request, *args, **kwargs)
+        return response_cache.get_or_set_note_list(request, paginated_list)
 
     @swagger_auto_schema(**SWAGGER_NOTE_CREATE_VIEW)
     def create(self, request, *args, **kwargs):
@@ -147,7 +214,40 @@ class NoteViewSet(BaseContentViewSet):
 
     @swagger_auto_schema(**SWAGGER_NOTE_DETAIL_VIEW)
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        retrieve = partial(super().retrieve, request, *args, **kwargs)
+        return self.read_response(request, ContentState.of_note(kwargs["note_id"]), retrieve)
+
+    @swagger_auto_schema(**SWAGGER_NOTE_TREE_VIEW)
+    def tree(self, request, *args, **kwargs):
+        note_id = kwargs["note_id"]
+        return self.read_response(request, ContentState.of_note_tree(note_id), partial(self.build_tree, note_id))
+
+    def build_tree(self, note_id):
+        note = get_object_or_404(self.get_tree_queryset(), id=note_id)
+        return Response(data=NoteTreeSerializer(note).data, status=status.HTTP_200_OK)
+
+    def get_tree_queryset(self):
+        # Note, Topic, Page(current_history JOIN) 세 번의 query 로 tree 를 만든다.
+        pages = (
+            Page.objects.filter(current_history__isnull=False)
+            .select_related("current_history")
+            .only(
+                "topic_id",
+                "current_history__title",
+                "current_history__version_no",
+                "current_history__is_approved",
+            )
+            .order_by("id")
+        )
+        topics = Topic.objects.filter(is_deleted=False).only("note_id", "title", "is_approved").order_by("id")
+        return (
+            Note.objects.filter(is_deleted=False)
+            .only("title", "is_approved")
+            .prefetch_related(
+                Prefetch("topic_set", queryset=topics, to_attr="tree_topics"),
+                Prefetch("tree_topics__page_set", queryset=pages, to_attr="tree_pages"),
+            )
+        )
 
     @swagger_auto_schema(**SWAGGER_NOTE_UPDATE_VIEW)
     def update(self, request, *args, **kwargs):
@@ -163,14 +263,36 @@ class NoteViewSet(BaseContentViewSet):
 class TopicViewSet(BaseContentViewSet):
     parent_model = Note
     child_model = Topic
-    queryset = Topic.objects.all()
+    queryset = Topic.objects.filter(is_deleted=False)
     serializer_class = TopicSerializer
+    pagination_class = TopicListPagination
     lookup_url_kwarg = "topic_id"
+    stream_chunk_size = 500
 
     @swagger_auto_schema(**SWAGGER_TOPIC_LIST_VIEW)
     def list(self, request, *args, **kwargs):
+        if request.query_params.get("stream") == "ndjson":
+            return self.stream_list(kwargs["note_id"])
         return super().list(request, *args, **kwargs)
 
+    def get_child_queryset(self):
+        return Topic.objects.filter(is_deleted=False).prefetch_related(_prefetch_owner_ids())
+
+    def stream_list(self, note_id):
+        queryset = self.get_child_queryset().filter(**self.get_parent_kwargs(note_id)).order_by("id")
+        return StreamingHttpResponse(self._iter_ndjson(queryset), content_type="application/x-ndjson")
+
+    def _iter_ndjson(self, queryset):
+        renderer = self.renderer_classes[0]()
+        last_id = 0
+        while True:
+            topics = list(queryset.filter(id__gt=last_id)[: self.stream_chunk_size])
+            if not topics:
+                return
+            for data in self.get_serializer(topics, many=True).data:
+                yield renderer.render(data) + b"\n"
+            last_id = topics[-1].id
+
     @swagger_auto_schema(**SWAGGER_TOPIC_CREATE_VIEW)
     def create(self, request, *args, **kwargs):
         data = TopicData(request).build_create_data()
@@ -178,7 +300,8 @@ class TopicViewSet(BaseContentViewSet):
 
     @swagger_auto_schema(**SWAGGER_TOPIC_DETAIL_VIEW)
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        retrieve = partial(super().retrieve, request, *args, **kwargs)
+        return self.read_response(request, ContentState.of_topic(kwargs["topic_id"]), retrieve)
 
     @swagger_auto_schema(**SWAGGER_TOPIC_UPDATE_VIEW)
     def update(self, request, *args, **kwargs):
@@ -194,7 +317,7 @@ class TopicViewSet(BaseContentViewSet):
 class PageViewSet(BaseContentViewSet):
     parent_model = Topic
     child_model = Page
-    queryset = Page.objects.all()
+    queryset = Page.objects.filter(topic__is_deleted=False)
     lookup_url_kwarg = "page_id"
     serializer_class = PageCreateSerializer
 
@@ -203,6 +326,20 @@ class PageViewSet(BaseContentViewSet):
         self.serializer_class = PageListSerializer
         return super().list(request, *args, **kwargs)
 
+    def get_child_queryset(self):
+        return Page.objects.select_related("current_history").prefetch_related(_prefetch_owner_ids())
+
+    def get_queryset(self):
+        if self.action == "delete":
+            return super().get_queryset().select_related("current_history", "topic")
+        return super().get_queryset()
+
+    def get_delete_target(self):
+        page = self.get_object()
+        page_history = page.current_history or page.page_history.order_by("-version_no").first()
+        page_history.page = page
+        return page_history
+
     @swagger_auto_schema(**SWAGGER_PAGE_CREATE_VIEW)
     def create(self, request, *args, **kwargs):
         data = PageData(request).build_create_data()
@@ -210,6 +347,10 @@ class PageViewSet(BaseContentViewSet):
 
     @swagger_auto_schema(**SWAGGER_PAGE_DETAIL_VIEW)
     def retrieve(self, request, *args, **kwargs):
+        content_state = ContentState.of_page_version(kwargs["page_id"], request.query_params.get("version_no"))
+        return self.read_response(request, content_state, self.retrieve_version)
+
+    def retrieve_version(self):
         version_no = self.request.query_params.get("version_no")
         page_serializer = PageDetailSerializer(self.get_object(), context={"version_no": int(version_no)})
         return Response(data=page_serializer.data, status=status.HTTP_200_OK)
@@ -217,8 +358,10 @@ class PageViewSet(BaseContentViewSet):
     @swagger_auto_schema(**SWAGGER_PAGE_UPDATE_VIEW)
     def update(self, request, *args, **kwargs):
         self.serializer_class = PageHistorySerializer
-        data = PageData(request).build_update_data(self.get_object())
-        return super().create(request, **data)
+        page = self.get_object()
+        with transaction.atomic():
+            data = PageData(request).build_update_data(page)
+            return super().create(request, **data)
 
     @swagger_auto_schema(**SWAGGER_PAGE_DELETE_VIEW)
     def delete(self, request, *args, **kwargs):
@@ -241,86 +384,213 @@ class IssueViewSet(CtrlfAuthenticationMixin, ModelViewSet):
     @swagger_auto_schema(**SWAGGER_ISSUE_DETAIL_VIEW)
     def retrieve(self, request, *args, **kwargs):
         self.serializer_class = IssueDetailSerializer
+        self.queryset = self.queryset.select_related("owner")
         return super().retrieve(request, *args, **kwargs)
 
 
 class IssueCloseView(CtrlfAuthenticationMixin, APIView):
     @swagger_auto_schema(**SWAGGER_ISSUE_CLOSE_VIEW)
     def post(self, request, *args, **kwargs):
-        user = self._ctrlf_authentication(request)
         issue = Issue.objects.filter(id=request.data["issue_id"]).first()
-        if issue is None:
-            return Response(data={"message": "이슈 ID를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
-        if issue.owner != user:
-            return Response(data={"message": "권한이 없습니다"}, status=status.HTTP_403_FORBIDDEN)
-        if issue.status not in CtrlfIssueStatus.can_be_closed():
-            return Response(data={"message": "유효한 요청이 아닙니다."}, status=status.HTTP_400_BAD_REQUEST)
+        error = self.validate(issue, request.user)
+        if error:
+            status_code, message = error
+            return Response(data={"message": message}, status=status_code)
 
         issue.status = CtrlfIssueStatus.CLOSED
-        issue.save()
+        issue.save(update_fields=["status", "updated_at"])
         return Response(data={"message": "이슈 닫힘"}, status=status.HTTP_200_OK)
 
+    @staticmethod
+    def validate(issue, user):
+        if issue is None:
+            return status.HTTP_404_NOT_FOUND, ERR_ISSUE_NOT_FOUND
+        if issue.owner_id != user.id:
+            return status.HTTP_403_FORBIDDEN, "권한이 없습니다"
+        if issue.status not in CtrlfIssueStatus.can_be_closed():
+            return status.HTTP_400_BAD_REQUEST, "유효한 요청이 아닙니다."
+        return None
+
 
 class IssueDeleteView(CtrlfAuthenticationMixin, APIView):
     @swagger_auto_schema(**SWAGGER_ISSUE_DELETE_VIEW)
     def delete(self, request, *args, **kwargs):
-        user = self._ctrlf_authentication(request)
         issue = Issue.objects.filter(id=request.data["issue_id"]).first()
+        error = self.validate(issue, request.user)
+        if error:
+            status_code, message = error
+            return Response(data={"message": message}, status=status_code)
+
+        with transaction.atomic():
+            issue.delete()
+            response_cache.bump_issues([issue])
+        return Response(data={"message": "이슈 삭제"}, status=status.HTTP_204_NO_CONTENT)
+
+    @staticmethod
+    def validate(issue, user):
         if issue is None:
-            return Response(data={"message": "이슈 ID를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
-        if issue.owner != user:
-            return Response(data={"message": "권한이 없습니다"}, status=status.HTTP_403_FORBIDDEN)
+            return status.HTTP_404_NOT_FOUND, ERR_ISSUE_NOT_FOUND
+        if issue.owner_id != user.id:
+            return status.HTTP_403_FORBIDDEN, "권한이 없습니다"
         if issue.status == CtrlfIssueStatus.APPROVED:
-            return Response(data={"message": "유효한 요청이 아닙니다"}, status=status.HTTP_400_BAD_REQUEST)
-
-        issue.delete()
-        return Response(data={"message": "이슈 삭제"}, status=status.HTTP_204_NO_CONTENT)
+            return status.HTTP_400_BAD_REQUEST, "유효한 요청이 아닙니다"
+        return None
 
 
 class IssueApproveView(CtrlfAuthenticationMixin, APIView):
     @swagger_auto_schema(**SWAGGER_ISSUE_APPROVE_VIEW)
     def post(self, request, *args, **kwargs):
-        issue_approve_request_user = self._ctrlf_authentication(request)
-        issue_id = request.data["issue_id"]
         try:
-            issue = Issue.objects.get(id=issue_id)
+            issue = Issue.objects.get(id=request.data["issue_id"])
         except Issue.DoesNotExist:
-            return Response(data={"message": "이슈 ID를 찾을 수 없습니다."}, status=status.HTTP_404_NOT_FOUND)
-        try:
-            ctrlf_content = self.get_ctrlf_content(issue=issue, ctrlf_user=issue_approve_request_user)
-        except ValueError:
-            return Response(data={"message": "승인 권한이 없습니다."}, status=status.HTTP_403_FORBIDDEN)
+            return Response(data={"message": ERR_ISSUE_NOT_FOUND}, status=status.HTTP_404_NOT_FOUND)
 
-        if not ctrlf_content.owners.filter(email=issue_approve_request_user.email).exists():
-            return Response(status=status.HTTP_403_FORBIDDEN)
+        ctrlf_content = issue.get_ctrlf_content()
+        with transaction.atomic():
+            status_code, message = self.validate(issue, ctrlf_content, request.user) or self.approve_in_savepoint(
+                issue, ctrlf_content
+            )
+            if issue.action != CtrlfActionType.DELETE and status_code == status.HTTP_200_OK:
+                issue.status = CtrlfIssueStatus.APPROVED
+                issue.save(update_fields=["status", "updated_at"])
+        return Response(data={"message": message}, status=status_code)
+
+    def validate(self, issue, ctrlf_content, user):
+        if issue.status not in CtrlfIssueStatus.can_be_approved():
+            return status.HTTP_400_BAD_REQUEST, "유효한 요청이 아닙니다."
+        if ctrlf_content is None or self.is_deleted_content(ctrlf_content):
+            return status.HTTP_404_NOT_FOUND, ERR_ISSUE_CONTENT_NOT_FOUND
+        if issue.action == CtrlfActionType.CREATE and not self.exists_parent_owner(ctrlf_content, user):
+            return status.HTTP_403_FORBIDDEN, "승인 권한이 없습니다."
+        if not ctrlf_content.exists_owner(user.id):
+            return status.HTTP_403_FORBIDDEN, "승인 권한이 없습니다."
+        return None
+
+    def approve_in_savepoint(self, issue, ctrlf_content):
+        # 승인할 버전이 그 사이 사라졌으면 500 대신 이슈별 결과로 돌려주고, 같은 transaction 의 다른 승인은 유지한다.
+        try:
+            with transaction.atomic():
+                return self.approve(issue, ctrlf_content)
+        except ObjectDoesNotExist:
+            return status.HTTP_404_NOT_FOUND, ERR_ISSUE_CONTENT_NOT_FOUND
 
+    def approve(self, issue, ctrlf_content):
+        content_id = ctrlf_content.id
         if issue.action == CtrlfActionType.UPDATE:
-            is_page = ctrlf_content.__class__ is Page
-            ctrlf_content.process_update() if is_page else ctrlf_content.process_update(issue.title)
+            if ctrlf_content.__class__ is Page:
+                # Page 이슈의 related_model_id 는 승인할 page_history_id 이다.
+                ctrlf_content.process_update(issue.related_model_id)
+            else:
+                ctrlf_content.process_update(issue.title)
         elif issue.action == CtrlfActionType.CREATE:
             ctrlf_content.process_create()
         else:
+            response_cache.bump(ctrlf_content)
             ctrlf_content.process_delete()
-            return Response(data={"message": "삭제 완료"}, status=status.HTTP_204_NO_CONTENT)
-
-        issue.status = CtrlfIssueStatus.APPROVED
-        issue.save()
+            self.schedule_cascade_delete(ctrlf_content)
+            self.schedule_search_index_update(issue.related_model_type, content_id)
+            return status.HTTP_204_NO_CONTENT, "삭제 완료"
+        response_cache.bump(ctrlf_content)
+        self.schedule_search_index_update(issue.related_model_type, content_id)
+        return status.HTTP_200_OK, "승인 완료"
+
+    def schedule_cascade_delete(self, ctrlf_content):
+        cascade_task = {Note: delete_note_cascade, Topic: delete_topic_cascade}.get(ctrlf_content.__class__)
+        if cascade_task:
+            content_id = ctrlf_content.id
+            transaction.on_commit(lambda: cascade_task.delay(content_id))
+
+    def schedule_search_index_update(self, content_type, content_id):
+        transaction.on_commit(lambda: update_search_index.delay(content_type, content_id))
+
+    def is_deleted_content(self, content):
+        # 삭제 승인된 Note/Topic 과 그 하위 컨텐츠는 cascade task 가 지울 때까지 남아 있지만 승인하지 않는다.
+        if content.__class__ is Page:
+            content = content.topic
+        if content.__class__ is Topic:
+            return content.is_deleted or content.note.is_deleted
+        return content.is_deleted
+
+    def exists_parent_owner(self, content, ctrlf_user):
+        exists_owner_method_map = {Page: "exists_topic_owner", Topic: "exists_note_owner", Note: "exists_owner"}[
+            content.__class__
+        ]
+        return getattr(content, exists_owner_method_map)(ctrlf_user.id)
 
-        return Response(data={"message": "승인 완료"}, status=status.HTTP_200_OK)
 
-    def get_ctrlf_content(self, issue, ctrlf_user):
-        ctrlf_content = issue.get_ctrlf_content()
-        if issue.action == CtrlfActionType.CREATE:
-            self.validate_exists_owner(ctrlf_content, ctrlf_user)
-        return ctrlf_content
+class IssueBulkActionMixin(CtrlfAuthenticationMixin):
+    def get_issue_ids(self, request):
+        serializer = IssueBulkActionRequestBodySerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return list(dict.fromkeys(serializer.validated_data["issue_ids"]))
 
-    def validate_exists_owner(self, content, ctrlf_user):
-        owner_id = ctrlf_user.id
-        exists_owner_method_map = {Page: "exists_topic_owner", Topic: "exists_note_owner", Note: "exists_owner"}[
-            content.__class__
+    def bulk_response(self, issue_ids, results):
+        data = [
+            {"issue_id": issue_id, "status": results[issue_id][0], "message": results[issue_id][1]}
+            for issue_id in issue_ids
         ]
-        if not getattr(content, exists_owner_method_map)(owner_id):
-            raise ValueError
+        return Response(data={"results": data}, status=status.HTTP_200_OK)
+
+
+class IssueBulkCloseView(IssueBulkActionMixin, APIView):
+    @swagger_auto_schema(**SWAGGER_ISSUE_BULK_CLOSE_VIEW)
+    def post(self, request, *args, **kwargs):
+        issue_ids = self.get_issue_ids(request)
+        results = {}
+        with transaction.atomic():
+            issues = Issue.objects.select_for_update().in_bulk(issue_ids)
+            for issue_id in issue_ids:
+                results[issue_id] = IssueCloseView.validate(issues.get(issue_id), request.user) or (
+                    status.HTTP_200_OK,
+                    "이슈 닫힘",
+                )
+            closable_ids = [issue_id for issue_id in issue_ids if results[issue_id][0] == status.HTTP_200_OK]
+            Issue.objects.filter(id__in=closable_ids).change_status(CtrlfIssueStatus.CLOSED)
+        return self.bulk_response(issue_ids, results)
+
+
+class IssueBulkDeleteView(IssueBulkActionMixin, APIView):
+    @swagger_auto_schema(**SWAGGER_ISSUE_BULK_DELETE_VIEW)
+    def post(self, request, *args, **kwargs):
+        issue_ids = self.get_issue_ids(request)
+        results = {}
+        with transaction.atomic():
+            issues = Issue.objects.select_for_update().in_bulk(issue_ids)
+            for issue_id in issue_ids:
+                results[issue_id] = IssueDeleteView.validate(issues.get(issue_id), request.user) or (
+                    status.HTTP_204_NO_CONTENT,
+                    "이슈 삭제",
+                )
+            deletable_ids = [issue_id for issue_id in issue_ids if results[issue_id][0] == status.HTTP_204_NO_CONTENT]
+            Issue.objects.filter(id__in=deletable_ids).delete()
+            response_cache.bump_issues([issues[issue_id] for issue_id in deletable_ids])
+        return self.bulk_response(issue_ids, results)
+
+
+class IssueBulkApproveView(IssueBulkActionMixin, IssueApproveView):
+    @swagger_auto_schema(**SWAGGER_ISSUE_BULK_APPROVE_VIEW)
+    def post(self, request, *args, **kwargs):
+        issue_ids = self.get_issue_ids(request)
+        results = {}
+        for offset in range(0, len(issue_ids), BULK_ISSUE_CHUNK_SIZE):
+            chunk_ids = issue_ids[offset : offset + BULK_ISSUE_CHUNK_SIZE]
+            with transaction.atomic():
+                issues = Issue.objects.select_for_update().in_bulk(chunk_ids)
+                ctrlf_contents = Issue.get_ctrlf_contents(issues.values())
+                approved_ids = []
+                for issue_id in chunk_ids:
+                    issue = issues.get(issue_id)
+                    if issue is None:
+                        results[issue_id] = status.HTTP_404_NOT_FOUND, ERR_ISSUE_NOT_FOUND
+                        continue
+                    ctrlf_content = ctrlf_contents.get(issue_id)
+                    results[issue_id] = self.validate(issue, ctrlf_content, request.user) or self.approve_in_savepoint(
+                        issue, ctrlf_content
+                    )
+                    if results[issue_id][0] == status.HTTP_200_OK:
+                        approved_ids.append(issue_id)
+                Issue.objects.filter(id__in=approved_ids).change_status(CtrlfIssueStatus.APPROVED)
+        return self.bulk_response(issue_ids, results)
 
 
 class ImageUploadView(APIView):
@@ -342,10 +612,22 @@ class ImageUploadView(APIView):
 class IssueCount(APIView):
     @swagger_auto_schema(**SWAGGER_ISSUE_COUNT)
     def get(self, request):
-        serializer = IssueCountSerializer({"issues_count": Issue.objects.count()})
+        query_serializer = IssueCountQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        serializer = IssueCountSerializer({"issues_count": IssueCounter.total(**query_serializer.validated_data)})
         return Response(data=serializer.data, status=status.HTTP_200_OK)
 
 
+class SearchView(APIView):
+    @swagger_auto_schema(**SWAGGER_SEARCH_VIEW)
+    def get(self, request):
+        query_serializer = SearchQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        paginator = SearchResultPagination()
+        hits = paginator.paginate_search(get_search_backend(), query_serializer.validated_data["q"], request)
+        return paginator.get_paginated_response(SearchResultSerializer(hits, many=True).data)
+
+
 class HealthCheckView(APIView):
     @swagger_auto_schema(**SWAGGER_HEALTH_CHECK_VIEW)
     def get(self, request):
@@ -3,11 +3,12 @@ from http import HTTPStatus
 from unittest.mock import patch
 
 from ctrlf_auth.authentication import CtrlfAuthentication
+from ctrlf_auth.cache import UserCache, user_cache
 from ctrlf_auth.helpers import generate_auth_code, generate_signing_token
 from ctrlf_auth.models import CtrlfUser, EmailAuthCode
 from ctrlf_auth.serializers import LoginSerializer
 from django.core import signing
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from drf_yasg.utils import swagger_auto_schema
 from freezegun import freeze_time
@@ -400,6 +401,142 @@ class TestJWTAuth(TestCase):
         self.assertEqual(json.loads(response.content)["message"], "인증이 유효하지 않습니다.")
 
 
+class TestJWTUserCache(TestCase):
+    def setUp(self):
+        self.c = Client()
+        user_cache.clear()
+        self.data = {"email": "kwon5604@naver.com", "password": "1234"}
+        self.user = CtrlfUser.objects.create_user(**self.data)
+        self.token = LoginSerializer().validate(self.data)["token"]
+
+    def tearDown(self):
+        user_cache.clear()
+
+    def _call_mock_api(self, token):
+        return self.c.get(reverse("auth:mock_auth_api"), HTTP_AUTHORIZATION=f"Bearer {token}")
+
+    def test_jwt_auth_should_skip_decode_and_db_lookup_on_cached_token(self):
+        # Given: 한 번 인증에 성공한 토큰이 주어진다.
+        self._call_mock_api(self.token)
+
+        # When: 같은 토큰으로 다시 인증이 필수인 mock api를 호출 했을 때,
+        with patch.object(CtrlfAuthentication, "_decode_token") as mock_decode_token:
+            with self.assertNumQueries(0):
+                response = self._call_mock_api(self.token)
+
+        # Then: 토큰 decode와 user 조회 없이 200을 리턴해야한다
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(json.loads(response.content)["email"], self.user.email)
+        mock_decode_token.assert_not_called()
+
+    def test_jwt_auth_should_lookup_user_again_after_user_is_changed(self):
+        # Given: 한 번 인증에 성공한 토큰이 주어진다.
+        self._call_mock_api(self.token)
+
+        # When: password와 is_active가 변경된 뒤 같은 토큰으로 mock api를 호출 했을 때,
+        self.user.set_password("5678")
+        self.user.is_active = False
+        self.user.save()
+        with self.assertNumQueries(1):
+            self._call_mock_api(self.token)
+
+        # Then: 캐시된 user 대신 변경된 user를 다시 조회해야한다
+        self.assertFalse(user_cache.get(self.token).is_active)
+
+    def test_jwt_auth_should_forget_user_deleted_by_temp_delete_email_api(self):
+        # Given: 한 번 인증에 성공한 토큰이 주어진다.
+        self._call_mock_api(self.token)
+
+        # When: Temp Delete Email API로 user를 삭제 했을 때,
+        self.c.delete(
+            reverse("auth:email"),
+            json.dumps({"email": self.user.email}),
+            content_type="application/json",
+        )
+
+        # Then: 캐시에 삭제된 user가 남아있지 않아야한다
+        self.assertIsNone(user_cache.get(self.token))
+
+    @override_settings(CTRLF_AUTH_USER_CACHE={"MAX_SIZE": 2, "TTL": 60, "SHARED_CACHE_ALIAS": ""})
+    def test_user_cache_should_evict_least_recently_used_token(self):
+        # Given: 최대 2개까지 캐시할 수 있을 때,
+        user_cache.set("token-a", self.user)
+        user_cache.set("token-b", self.user)
+        user_cache.get("token-a")
+
+        # When: 3번째 토큰을 캐시 했을 때,
+        user_cache.set("token-c", self.user)
+
+        # Then: 가장 오래 사용하지 않은 토큰이 제거되어야한다
+        self.assertEqual(len(user_cache), 2)
+        self.assertIsNone(user_cache.get("token-b"))
+        self.assertEqual(user_cache.get("token-a"), self.user)
+
+    def test_user_cache_should_expire_entry_at_token_exp(self):
+        # Given: 10초 뒤 만료되는 토큰을 캐시 했을 때,
+        with freeze_time("2021-08-01 00:00:00") as frozen_time:
+            user_cache.set("token", self.user, exp=frozen_time().timestamp() + 10)
+
+            # When: 토큰의 exp가 지나면,
+            frozen_time.tick(11)
+
+            # Then: 캐시에서 더 이상 조회되지 않아야한다
+            self.assertIsNone(user_cache.get("token"))
+
+    @override_settings(
+        CACHES={"shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        CTRLF_AUTH_USER_CACHE={"MAX_SIZE": 1024, "TTL": 60, "SHARED_CACHE_ALIAS": "shared"},
+    )
+    def test_user_cache_should_share_user_through_shared_cache(self):
+        # Given: shared cache를 사용할 때 토큰을 캐시 했다.
+        user_cache.set(self.token, self.user, version=user_cache.version(self.user.id))
+
+        # When: 다른 process의 LRU처럼 local cache가 비어 있어도,
+        user_cache.clear()
+
+        # Then: shared cache에서 user를 찾아야한다
+        self.assertEqual(user_cache.get(self.token), self.user)
+        # And: user가 변경되면 shared cache에서도 제거되어야한다
+        self.user.save()
+        user_cache.clear()
+        self.assertIsNone(user_cache.get(self.token))
+
+    @override_settings(
+        CACHES={"shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        CTRLF_AUTH_USER_CACHE={"MAX_SIZE": 1024, "TTL": 60, "SHARED_CACHE_ALIAS": "shared"},
+    )
+    def test_user_cache_should_forget_user_in_other_process_lru_after_user_is_changed(self):
+        # Given: shared cache를 사용할 때 다른 process의 LRU에도 user가 캐시되어 있다.
+        other_process_cache = UserCache()
+        user_cache.set(self.token, self.user, version=user_cache.version(self.user.id))
+        self.assertEqual(other_process_cache.get(self.token), self.user)
+
+        # When: 현재 process에서 user가 비활성화 되었을 때,
+        self.user.is_active = False
+        self.user.save()
+
+        # Then: 다른 process의 LRU도 이전 user를 돌려주지 않아야한다
+        self.assertIsNone(other_process_cache.get(self.token))
+
+    @override_settings(
+        CACHES={"shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+        CTRLF_AUTH_USER_CACHE={"MAX_SIZE": 1024, "TTL": 60, "SHARED_CACHE_ALIAS": "shared"},
+    )
+    def test_user_cache_should_not_keep_user_invalidated_while_loading_it(self):
+        # Given: user를 DB에서 읽기 전에 version을 읽었다.
+        version = user_cache.version(self.user.id)
+        stale_user = CtrlfUser.objects.get(id=self.user.id)
+
+        # When: user를 읽은 뒤 캐시에 넣기 전에 user가 비활성화 되었을 때,
+        self.user.is_active = False
+        self.user.save()
+        user_cache.set(self.token, stale_user, version=version)
+
+        # Then: 현재 process와 다른 process 모두 이전 user를 돌려주지 않아야한다
+        self.assertIsNone(user_cache.get(self.token))
+        self.assertIsNone(UserCache().get(self.token))
+
+
 class TestResetPassword(TestCase):
     def setUp(self) -> None:
         self.c = Client()
@@ -0,0 +1,165 @@
+from io import StringIO
+
+from common.fields import MARKER, StoredText, compress_column, decode_text, encode_text
+from ctrlf_auth.models import CtrlfUser
+from ctrlfbe.models import (
+    CtrlfActionType,
+    CtrlfContentType,
+    CtrlfIssueStatus,
+    Issue,
+    Note,
+    Page,
+    PageBody,
+    PageHistory,
+    PageVersionType,
+    Topic,
+)
+from ctrlfbe.search.database import DatabaseSearchBackend
+from ctrlfbe.search.documents import iter_documents
+from ctrlfbe.search.tokenizer import tokenize
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+LONG_TEXT = "## 장고 배포 가이드\n" + "gunicorn 과 nginx 로 장고 서버를 배포하는 방법을 정리합니다.\n" * 50
+TEXT_COMPRESSION = {"MIN_LENGTH": 256}
+
+
+@override_settings(CTRLF_TEXT_COMPRESSION=TEXT_COMPRESSION)
+class TestTextEncoding(SimpleTestCase):
+    def test_encode_text_should_compress_only_text_longer_than_min_length(self):
+        # When: 긴 글과 짧은 글을 저장 형식으로 바꾼다.
+        compressed = encode_text(LONG_TEXT)
+        short = encode_text("짧은 글")
+
+        # Then: 긴 글만 압축되어 더 작아지고, 둘 다 원래 글로 복원된다.
+        self.assertTrue(compressed.startswith(MARKER))
+        self.assertLess(len(compressed.encode()), len(LONG_TEXT.encode()) / 4)
+        self.assertEqual(short, "짧은 글")
+        self.assertEqual(decode_text(compressed), LONG_TEXT)
+        self.assertEqual(decode_text(short), "짧은 글")
+
+    def test_encode_text_should_escape_text_starting_with_marker(self):
+        # Given: 형식 표시 글자로 시작하는 평문이 주어진다.
+        text = MARKER + "z 압축된 글이 아닙니다"
+
+        # When & Then: 저장 형식으로 바꿨다가 복원하면 원래 글이 된다.
+        self.assertEqual(decode_text(encode_text(text)), text)
+
+
+@override_settings(CTRLF_TEXT_COMPRESSION=TEXT_COMPRESSION)
+class TestCompressedTextField(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.user = CtrlfUser.objects.create_user(email="test@test.com", password="12345")
+        self.note = Note.objects.create(title="test note title")
+        self.topic = Topic.objects.create(note=self.note, title="test topic title")
+        self.page = Page.objects.create(topic=self.topic)
+        self.page.owners.add(self.user)
+        for version_no, version_type in enumerate([PageVersionType.PREVIOUS, PageVersionType.CURRENT], start=1):
+            PageHistory.objects.create(
+                owner=self.user,
+                page=self.page,
+                title=f"title {version_no}",
+                content=f"{LONG_TEXT}{version_no}",
+                version_no=version_no,
+                version_type=version_type,
+            )
+
+    def _stored_values(self, model, field_name):
+        # values_list 는 descriptor 를 거치지 않아 DB 에 저장된 형식을 그대로 돌려준다.
+        return list(model.objects.order_by("id").values_list(field_name, flat=True))
+
+    def test_issue_reason_should_be_compressed_on_save_and_decompressed_on_access(self):
+        # When: 긴 reason 으로 Issue 를 만든다.
+        issue = Issue.objects.create(
+            owner=self.user,
+            title="test issue title",
+            reason=LONG_TEXT,
+            status=CtrlfIssueStatus.REQUESTED,
+            related_model_type=CtrlfContentType.NOTE,
+            related_model_id=self.note.id,
+            action=CtrlfActionType.CREATE,
+        )
+
+        # Then: DB 에는 압축해서 저장한다.
+        self.assertTrue(self._stored_values(Issue, "reason")[0].startswith(MARKER))
+        # And: 다시 읽으면 attribute 에 처음 접근할 때 압축을 푼다.
+        issue = Issue.objects.get(id=issue.id)
+        self.assertIsInstance(issue.__dict__["reason"], StoredText)
+        self.assertEqual(issue.reason, LONG_TEXT)
+        self.assertEqual(issue.__dict__["reason"], LONG_TEXT)
+        # And: serializer 응답도 원래 reason 을 돌려준다.
+        response = self.client.get(reverse("issues:issue_detail", kwargs={"issue_id": issue.id}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["reason"], LONG_TEXT)
+
+    def test_page_history_content_should_stay_plain_until_compress_command(self):
+        # Given: 새 PageHistory 본문은 full-text 색인을 위해 평문으로 저장된다.
+        stored_contents = self._stored_values(PageHistory, "body__content")
+        self.assertFalse(any(content.startswith(MARKER) for content in stored_contents))
+
+        # When: 압축 command 를 실행한다.
+        out = StringIO()
+        call_command("compress_text_columns", stdout=out)
+
+        # Then: PREVIOUS 버전만 압축하고 table 별로 줄어든 크기를 출력한다.
+        previous_content, current_content = self._stored_values(PageHistory, "body__content")
+        self.assertTrue(previous_content.startswith(MARKER))
+        self.assertFalse(current_content.startswith(MARKER))
+        self.assertIn("ctrlfbe_pagebody: rows: 1,", out.getvalue())
+        self.assertIn("ctrlfbe_issue: rows: 0,", out.getvalue())
+        # And: Page Detail 은 모든 버전의 본문을 그대로 돌려준다.
+        for version_no in (1, 2):
+            response = self.client.get(
+                reverse("pages:page_detail_update_delete", kwargs={"page_id": self.page.id}),
+                {"version_no": version_no},
+            )
+            self.assertEqual(response.data["content"], f"{LONG_TEXT}{version_no}")
+
+        # When: 압축을 푼다.
+        call_command("compress_text_columns", "--decompress", stdout=StringIO())
+
+        # Then: 모든 버전이 평문으로 돌아온다.
+        self.assertEqual(self._stored_values(PageHistory, "body__content"), [f"{LONG_TEXT}1", f"{LONG_TEXT}2"])
+
+    def test_page_body_compressed_while_previous_should_be_decompressed_when_reverted_to(self):
+        # Given: Page 를 승인하고, PREVIOUS 버전의 본문을 압축한다.
+        PageHistory.objects.filter(page=self.page).update(is_approved=True)
+        call_command("compress_text_columns", stdout=StringIO())
+        self.assertTrue(self._stored_values(PageHistory, "body__content")[0].startswith(MARKER))
+
+        # When: PREVIOUS 버전과 같은 본문으로 되돌리는 수정 버전을 만들고 승인한다.
+        PageHistory.objects.create(
+            owner=self.user,
+            page=self.page,
+            title="title 3",
+            content=f"{LONG_TEXT}1",
+            version_no=3,
+            version_type=PageVersionType.UPDATE,
+        )
+        self.page.refresh_from_db()
+        self.page.process_update()
+
+        # Then: 함께 쓰는 본문은 평문으로 돌아오고 DB full-text 색인으로 검색된다.
+        self.assertEqual(
+            PageBody.objects.values_list("content", flat=True).get(hash=PageBody.for_content(f"{LONG_TEXT}1").hash),
+            f"{LONG_TEXT}1",
+        )
+        self.assertEqual([hit.key & 0xFFFFFFFF for hit in DatabaseSearchBackend().search("배포", 10)], [self.page.id])
+
+    def test_iter_documents_should_index_decompressed_page_content(self):
+        # Given: 검색 대상 Page 의 CURRENT 본문이 압축되어 있다.
+        self.note.is_approved = self.topic.is_approved = True
+        self.note.save()
+        self.topic.save()
+        PageHistory.objects.filter(page=self.page).update(is_approved=True)
+        compress_column(PageBody.objects.all(), "content")
+
+        # When: 검색 문서를 만든다.
+        (page_document,) = [document for document in iter_documents() if document.title == "title 2"]
+
+        # Then: 압축된 저장 형식이 아니라 원래 본문의 term 으로 색인한다.
+        self.assertIn("배포", page_document.terms)
+        self.assertTrue(set(page_document.terms) <= set(tokenize(f"title 2 {LONG_TEXT}2")))
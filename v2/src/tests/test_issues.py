@@ -1,20 +1,35 @@
+import json
+from io import StringIO
+from unittest.mock import patch
+
 from ctrlf_auth.models import CtrlfUser
 from ctrlf_auth.serializers import LoginSerializer
+from ctrlfbe.management.commands.explain_hot_queries import HOT_QUERIES
 from ctrlfbe.models import (
     CtrlfActionType,
     CtrlfContentType,
     CtrlfIssueStatus,
     Issue,
+    IssueCounter,
     Note,
     Page,
     PageHistory,
     PageVersionType,
     Topic,
 )
-from django.test import Client, TestCase
+from ctrlfbe.tasks import (
+    cleanup_orphaned_issues,
+    delete_note_cascade,
+    delete_topic_cascade,
+    reconcile_issue_counters,
+)
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
-from tests.test_mixin import IssueTestMixin
+from tests.test_mixin import IssueTestMixin, _get_header
 
 
 class IssueApproveTextMixin:
@@ -146,6 +161,24 @@ class TestListIssue(IssueApproveTextMixin, TestCase):
             self.assertIn(issue["status"], {CtrlfIssueStatus.REQUESTED, CtrlfIssueStatus.REJECTED})
 
 
+class TestListIssueKeysetCursor(IssueApproveTextMixin, TestCase):
+    def test_issue_list_should_walk_filtered_issues_with_opaque_cursor(self):
+        # Given: REQUESTED 이슈 35개와 APPROVED 이슈 1개를 생성한다.
+        self._make_issues(35)
+        self._make_issues_by_status(title="test", reason="reason", status=CtrlfIssueStatus.APPROVED)
+
+        # When: cursor 없이 issue list api를 호출하고, next_cursor로 다음 페이지를 호출한다.
+        first_page = self.client.get(reverse("issues:issue_list")).data
+        second_page = self._call_api(first_page["next_cursor"]).data
+
+        # Then: 30개, 5개의 REQUESTED 이슈를 리턴한다.
+        self.assertEqual(len(first_page["issues"]), 30)
+        self.assertTrue(first_page["has_more"])
+        self.assertEqual(len(second_page["issues"]), 5)
+        self.assertFalse(second_page["has_more"])
+        self.assertIsNone(second_page["next_cursor"])
+
+
 class TestIssueDetail(IssueApproveTextMixin, TestCase):
     def setUp(self) -> None:
         super().setUp()
@@ -182,6 +215,64 @@ class TestIssueDetail(IssueApproveTextMixin, TestCase):
         self.assertEqual(response.data["topic_id"], self.topic.id)
         self.assertEqual(response.data["page_id"], self.page.id)
 
+    def test_issue_detail_should_read_single_row(self):
+        # Given: page에 대한 이슈를 1개 생성한다.
+        self._make_all_contents()
+        issue = Issue.objects.create(
+            owner=self.user,
+            title="test issue title",
+            reason="reason for update page",
+            status=CtrlfIssueStatus.REQUESTED,
+            related_model_type=CtrlfContentType.PAGE,
+            related_model_id=self.page_history.id,
+            action=CtrlfActionType.UPDATE,
+        )
+
+        # When: issue detail api를 호출한다.
+        # Then: Issue 조회 쿼리 1개만 실행된다.
+        with self.assertNumQueries(1):
+            response = self._call_detail_api(issue_id=issue.id)
+
+        # And: issue에 대한 note, topic, page의 id와 version_no를 제공해야한다
+        self.assertEqual(response.data["note_id"], self.note.id)
+        self.assertEqual(response.data["topic_id"], self.topic.id)
+        self.assertEqual(response.data["page_id"], self.page.id)
+        self.assertEqual(response.data["version_no"], self.page_history.version_no)
+
+    def test_backfill_issue_location_should_fill_location_of_legacy_issues(self):
+        # Given: 위치 정보가 비어있는 note, topic, page 이슈가 주어진다.
+        self._make_all_contents()
+        related_models = {
+            CtrlfContentType.NOTE: self.note,
+            CtrlfContentType.TOPIC: self.topic,
+            CtrlfContentType.PAGE: self.page_history,
+        }
+        for content_type, related_model in related_models.items():
+            Issue.objects.create(
+                owner=self.user,
+                title="test issue title",
+                reason="reason",
+                status=CtrlfIssueStatus.REQUESTED,
+                related_model_type=content_type,
+                related_model_id=related_model.id,
+                action=CtrlfActionType.CREATE,
+            )
+        Issue.objects.update(note_id=None, topic_id=None, page_id=None, version_no=None)
+
+        # When: backfill_issue_location 커맨드를 chunk 크기 2로 실행한다.
+        call_command("backfill_issue_location", chunk_size=2, stdout=StringIO())
+
+        # Then: 각 이슈의 위치 정보가 채워진다.
+        note_issue = Issue.objects.get(related_model_type=CtrlfContentType.NOTE)
+        self.assertEqual((note_issue.note_id, note_issue.topic_id), (self.note.id, None))
+        topic_issue = Issue.objects.get(related_model_type=CtrlfContentType.TOPIC)
+        self.assertEqual((topic_issue.note_id, topic_issue.topic_id), (self.note.id, self.topic.id))
+        page_issue = Issue.objects.get(related_model_type=CtrlfContentType.PAGE)
+        self.assertEqual(
+            (page_issue.note_id, page_issue.topic_id, page_issue.page_id, page_issue.version_no),
+            (self.note.id, self.topic.id, self.page.id, self.page_history.version_no),
+        )
+
     def test_issue_detail_should_return_404_not_found_on_issue_does_not_exist(self):
         # Given: 이슈를 생성하지 않았을 때,
         invalid_issue_id = 1122334
@@ -294,6 +385,27 @@ class TestIssueApprove(IssueApproveTextMixin, TestCase):
         issue = Issue.objects.get(id=issue_id)
         self.assertEqual(issue.status, CtrlfIssueStatus.APPROVED)
 
+    @override_settings(DEBUG=True)
+    def test_issue_approve_should_authenticate_only_once_per_request(self):
+        # Given: Page와 Issue를 생성하고, owner 정보로 로그인 하여 토큰을 발급받은 상태이다.
+        _, issue, _ = self._make_page()
+        owner_token = self._login(self.owner_data)
+
+        # When: 인증이 필요한 approve issue api를 호출한다.
+        response = self._call_api({"issue_id": issue.id}, owner_token)
+
+        # Then: 요청 하나에 인증은 한 번만 실행된다.
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["X-Ctrlf-Auth-Count"], "1")
+
+    @override_settings(DEBUG=True)
+    def test_issue_list_should_not_authenticate(self):
+        # When: 인증이 필요 없는 issue list api를 호출한다.
+        response = self.client.get(reverse("issues:issue_list"))
+
+        # Then: 인증은 실행되지 않는다.
+        self.assertEqual(response["X-Ctrlf-Auth-Count"], "0")
+
     def test_issue_approve_should_return_200_on_issue_about_topic(self):
         # Given: Topic과 Issue를 생성한다.
         topic_id, issue_id = self._make_topic()
@@ -540,6 +652,9 @@ class TestIssueApprove(IssueApproveTextMixin, TestCase):
             "version_no": 2,
         }
         new_page_history = PageHistory.objects.create(**new_page_history_data)
+        # And: 수정 이슈는 UPDATE page history를 가리킨다.
+        issue.related_model_id = new_page_history.id
+        issue.save()
         # And: request_body로 유효한 issue id가 주어진다.
         request_body = {"issue_id": issue.id}
         # And: owner 정보로 로그인 하여 토큰을 발급받은 상태이다.
@@ -570,16 +685,10 @@ class TestIssueApprove(IssueApproveTextMixin, TestCase):
         issue_request_user = CtrlfUser.objects.create_user(**user_info)
         issue.owner = issue_request_user
         issue.save()
-        # And: page에 대한 page history를 생성한다 - 이미 있던 것
-        prev_page_history_data = {
-            "page": page,
-            "owner": self.user,
-            "title": "prev title",
-            "content": "prev content",
-            "version_type": PageVersionType.CURRENT,
-            "version_no": 1,
-        }
-        PageHistory.objects.create(**prev_page_history_data)
+        # And: page에 대한 page history가 있다 - 이미 있던 것 (page, version_no 는 unique)
+        page_history.title = "prev title"
+        page_history.content = "prev content"
+        page_history.save()
         # And: page에 대한 page history를 생성한다 - UPDATE
         new_page_history_data = {
             "page": page,
@@ -602,12 +711,75 @@ class TestIssueApprove(IssueApproveTextMixin, TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
 
 
+class TestIssueCtrlfContent(IssueApproveTextMixin, TestCase):
+    def _make_issue(self, content_type, related_model_id):
+        return Issue.objects.create(
+            owner=self.user,
+            title="test issue title",
+            reason="reason",
+            status=CtrlfIssueStatus.REQUESTED,
+            related_model_type=content_type,
+            related_model_id=related_model_id,
+            action=CtrlfActionType.CREATE,
+        )
+
+    def test_get_ctrlf_content_should_query_only_table_of_issue_type(self):
+        # Given: note에 대한 이슈가 주어진다.
+        self._make_all_contents()
+        issue = self._make_issue(CtrlfContentType.NOTE, self.note.id)
+
+        # When: get_ctrlf_content를 호출한다.
+        # Then: Note 와 owners 조회 쿼리만 실행된다.
+        with self.assertNumQueries(2):
+            content = issue.get_ctrlf_content()
+            # And: owner 확인에는 추가 쿼리가 발생하지 않는다.
+            self.assertTrue(content.exists_owner(self.user.id))
+        self.assertEqual(content, self.note)
+
+    def test_get_ctrlf_contents_should_resolve_issues_with_fixed_number_of_queries(self):
+        # Given: note, topic, page에 대한 이슈가 각각 여러개 주어진다.
+        self._make_all_contents()
+        issues = []
+        for _ in range(3):
+            issues.append(self._make_issue(CtrlfContentType.NOTE, self.note.id))
+            issues.append(self._make_issue(CtrlfContentType.TOPIC, self.topic.id))
+            issues.append(self._make_issue(CtrlfContentType.PAGE, self.page_history.id))
+
+        # When: get_ctrlf_contents를 호출한다.
+        # Then: note 2개, topic 3개, page 3개의 쿼리만 실행된다.
+        with self.assertNumQueries(8):
+            contents = Issue.get_ctrlf_contents(issues)
+            # And: 승인에 필요한 owner 확인에는 추가 쿼리가 발생하지 않는다.
+            for content in contents.values():
+                self.assertTrue(content.exists_owner(self.user.id))
+            self.assertTrue(contents[issues[1].id].exists_note_owner(self.user.id))
+            self.assertTrue(contents[issues[2].id].exists_topic_owner(self.user.id))
+
+        # And: 각 이슈의 타입에 맞는 컨텐츠를 리턴한다.
+        self.assertEqual(contents[issues[0].id], self.note)
+        self.assertEqual(contents[issues[1].id], self.topic)
+        self.assertEqual(contents[issues[2].id], self.page)
+
+
+class TestExplainHotQueries(TestCase):
+    def test_explain_hot_queries_should_print_plan_of_every_hot_query(self):
+        # Given: EXPLAIN 결과를 받을 stdout이 주어진다.
+        stdout = StringIO()
+
+        # When: explain_hot_queries 커맨드를 실행한다.
+        call_command("explain_hot_queries", stdout=stdout)
+
+        # Then: 모든 hot query의 EXPLAIN 결과가 출력된다.
+        for name in HOT_QUERIES:
+            self.assertIn(f"== {name}", stdout.getvalue())
+
+
 class TestIssueCount(IssueApproveTextMixin, TestCase):
     def setUp(self) -> None:
         super().setUp()
 
-    def _call_api(self):
-        return self.client.get(reverse("issues:issue_count"))
+    def _call_api(self, query_params=None):
+        return self.client.get(reverse("issues:issue_count"), query_params or {})
 
     def test_issue_count_should_return_count_of_all_issues(self):
         # Given: 5개의 이슈를 생성하고,
@@ -620,6 +792,72 @@ class TestIssueCount(IssueApproveTextMixin, TestCase):
         # Then: 생성한 Issue 개수 만큼 리턴 해야한다
         self.assertEqual(response.json()["issues_count"], want_to_make_issue_count)
 
+    def test_issue_count_should_read_counter_without_scanning_issues(self):
+        # Given: 5개의 이슈를 생성하고,
+        self._make_issues(5)
+
+        # When: api를 호출했을 때,
+        # Then: IssueCounter 합계 조회 쿼리 1개만 실행된다.
+        with self.assertNumQueries(1):
+            response = self._call_api()
+        self.assertEqual(response.json()["issues_count"], 5)
+
+    def test_issue_count_should_follow_status_changes_and_deletes(self):
+        # Given: 5개의 이슈를 생성하고,
+        self._make_issues(5)
+        issues = list(Issue.objects.order_by("id"))
+        # And: 1개는 닫고, 1개는 승인하고, 1개는 삭제한다.
+        issues[0].status = CtrlfIssueStatus.CLOSED
+        issues[0].save()
+        issues[1].status = CtrlfIssueStatus.APPROVED
+        issues[1].save()
+        Issue.objects.filter(id=issues[2].id).delete()
+
+        # When: status 별로 api를 호출했을 때,
+        requested_response = self._call_api({"status": CtrlfIssueStatus.REQUESTED})
+        closed_response = self._call_api({"status": CtrlfIssueStatus.CLOSED})
+        approved_response = self._call_api({"status": CtrlfIssueStatus.APPROVED})
+        all_response = self._call_api()
+
+        # Then: status 별 이슈 개수를 리턴 해야한다
+        self.assertEqual(requested_response.json()["issues_count"], 2)
+        self.assertEqual(closed_response.json()["issues_count"], 1)
+        self.assertEqual(approved_response.json()["issues_count"], 1)
+        self.assertEqual(all_response.json()["issues_count"], 4)
+
+    def test_issue_count_should_filter_by_related_model_type(self):
+        # Given: NOTE 이슈 3개를 생성하고,
+        self._make_issues(3)
+
+        # When: related_model_type 으로 api를 호출했을 때,
+        note_response = self._call_api({"related_model_type": CtrlfContentType.NOTE})
+        page_response = self._call_api({"related_model_type": CtrlfContentType.PAGE})
+
+        # Then: 타입 별 이슈 개수를 리턴 해야한다
+        self.assertEqual(note_response.json()["issues_count"], 3)
+        self.assertEqual(page_response.json()["issues_count"], 0)
+
+    def test_issue_count_should_return_400_on_invalid_status(self):
+        # When: 유효하지 않은 status로 api를 호출했을 때,
+        response = self._call_api({"status": "INVALID"})
+
+        # Then: status code 400을 리턴한다.
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_reconcile_issue_counters_should_correct_drift(self):
+        # Given: 3개의 이슈를 생성하고, counter가 실제와 다르게 틀어진다.
+        self._make_issues(3)
+        IssueCounter.objects.filter(status=CtrlfIssueStatus.REQUESTED, related_model_type=CtrlfContentType.NOTE).update(
+            count=100
+        )
+
+        # When: reconcile task를 실행했을 때,
+        drifted_count = reconcile_issue_counters()
+
+        # Then: 틀어진 counter 1개를 바로잡는다.
+        self.assertEqual(drifted_count, 1)
+        self.assertEqual(self._call_api().json()["issues_count"], 3)
+
 
 class TestIssueDelete(IssueTestMixin, TestCase):
     def setUp(self) -> None:
@@ -852,3 +1090,299 @@ class TestIssueClose(IssueTestMixin, TestCase):
 
         # Then: 상태코드는 403 이어야 한다
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TestIssueBulkAction(IssueTestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.note.owners.add(self.owner)
+        self.topic.owners.add(self.owner)
+
+    def _call_api(self, url_name, issue_ids, token=None):
+        return self.client.post(
+            reverse(f"actions:{url_name}"),
+            json.dumps({"issue_ids": issue_ids}),
+            content_type="application/json",
+            **_get_header(token),
+        )
+
+    def _results(self, response):
+        return {result["issue_id"]: result["status"] for result in response.data["results"]}
+
+    def test_issue_bulk_approve_should_approve_contents_and_return_results_per_issue(self):
+        # Given: Note, Topic, Page와 생성 Issue들을 만든다.
+        note_id, note_issue_id = self._make_note()
+        topic_id, topic_issue_id = self._make_topic()
+        _, page_issue, page_history = self._make_page()
+        # And: 존재하지 않는 issue id가 함께 주어진다.
+        issue_ids = [note_issue_id, topic_issue_id, page_issue.id, 99999]
+
+        # When: owner 정보로 로그인 하여 Issue Bulk Approve API를 호출한다.
+        response = self._call_api("issue_bulk_approve", issue_ids, self._login(self.owner_data))
+
+        # Then: Issue별 결과를 요청 순서대로 리턴한다.
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result["issue_id"] for result in response.data["results"]], issue_ids)
+        self.assertEqual(
+            self._results(response),
+            {
+                note_issue_id: status.HTTP_200_OK,
+                topic_issue_id: status.HTTP_200_OK,
+                page_issue.id: status.HTTP_200_OK,
+                99999: status.HTTP_404_NOT_FOUND,
+            },
+        )
+        # And: content들은 승인되고, Issue들은 APPROVED 상태이다.
+        self.assertTrue(Note.objects.get(id=note_id).is_approved)
+        self.assertTrue(Topic.objects.get(id=topic_id).is_approved)
+        self.assertTrue(PageHistory.objects.get(id=page_history.id).is_approved)
+        self.assertEqual(Issue.objects.filter(status=CtrlfIssueStatus.APPROVED).count(), 3)
+        # And: Issue 개수 카운터도 함께 갱신된다.
+        self.assertEqual(IssueCounter.total(status=CtrlfIssueStatus.APPROVED), 3)
+        self.assertEqual(IssueCounter.total(status=CtrlfIssueStatus.REQUESTED), 0)
+
+    def _make_page_update_issues(self, page, count):
+        issues = []
+        for version_no in range(2, count + 2):
+            page_history = PageHistory.objects.create(
+                owner=self.user,
+                page=page,
+                title=f"title {version_no}",
+                content=f"content {version_no}",
+                version_no=version_no,
+                version_type=PageVersionType.UPDATE,
+            )
+            issues.append(
+                Issue.objects.create(
+                    owner=self.user,
+                    title=f"title {version_no}",
+                    status=CtrlfIssueStatus.REQUESTED,
+                    related_model_type=CtrlfContentType.PAGE,
+                    related_model_id=page_history.id,
+                    action=CtrlfActionType.UPDATE,
+                )
+            )
+        return issues
+
+    def test_issue_bulk_approve_should_keep_single_current_version_on_update_issues_of_same_page(self):
+        # Given: 같은 Page에 대한 수정 Issue 2개를 생성한다.
+        page, _, _ = self._make_page()
+        issue_ids = [issue.id for issue in self._make_page_update_issues(page, 2)]
+
+        # When: owner 정보로 로그인 하여 두 Issue를 한 번에 승인한다.
+        response = self._call_api("issue_bulk_approve", issue_ids, self._login(self.owner_data))
+
+        # Then: 두 Issue 모두 승인되고, 마지막으로 승인한 버전만 CURRENT 이다.
+        self.assertEqual(self._results(response), {issue_id: status.HTTP_200_OK for issue_id in issue_ids})
+        version_types = (
+            PageHistory.objects.filter(page=page).order_by("version_no").values_list("version_no", "version_type")
+        )
+        self.assertEqual(
+            list(version_types),
+            [(1, PageVersionType.PREVIOUS), (2, PageVersionType.PREVIOUS), (3, PageVersionType.CURRENT)],
+        )
+        self.assertEqual(Page.objects.get(id=page.id).current_history.version_no, 3)
+
+    def test_issue_bulk_approve_should_return_400_per_issue_on_already_approved_issue(self):
+        # Given: 이미 승인된 Page 수정 Issue와 그 뒤에 올라온 수정 Issue가 있다.
+        page, _, _ = self._make_page()
+        approved_issue, newer_issue = self._make_page_update_issues(page, 2)
+        owner_token = self._login(self.owner_data)
+        self._call_api("issue_bulk_approve", [approved_issue.id], owner_token)
+
+        # When: 승인된 Issue를 Note 생성 Issue와 함께 다시 승인한다.
+        note_id, note_issue_id = self._make_note()
+        response = self._call_api("issue_bulk_approve", [approved_issue.id, note_issue_id], owner_token)
+
+        # Then: 승인된 Issue는 400, 다른 Issue는 그대로 승인된다.
+        self.assertEqual(
+            self._results(response), {approved_issue.id: status.HTTP_400_BAD_REQUEST, note_issue_id: status.HTTP_200_OK}
+        )
+        self.assertTrue(Note.objects.get(id=note_id).is_approved)
+        # And: 뒤에 올라온 수정 버전은 승인되지 않는다.
+        self.assertEqual(PageHistory.objects.get(id=newer_issue.related_model_id).version_type, PageVersionType.UPDATE)
+        self.assertEqual(Issue.objects.get(id=newer_issue.id).status, CtrlfIssueStatus.REQUESTED)
+
+    def test_issue_bulk_approve_should_return_404_per_issue_on_missing_update_version(self):
+        # Given: 수정 버전이 이미 CURRENT 로 바뀌어 승인할 수정 버전이 없는 Issue가 있다.
+        page, _, _ = self._make_page()
+        (issue,) = self._make_page_update_issues(page, 1)
+        PageHistory.objects.filter(id=issue.related_model_id).update(version_type=PageVersionType.PREVIOUS)
+        note_id, note_issue_id = self._make_note()
+
+        # When: Note 생성 Issue와 함께 승인한다.
+        response = self._call_api("issue_bulk_approve", [issue.id, note_issue_id], self._login(self.owner_data))
+
+        # Then: 500 대신 해당 Issue의 결과만 404이고, 다른 Issue는 승인된다.
+        self.assertEqual(
+            self._results(response), {issue.id: status.HTTP_404_NOT_FOUND, note_issue_id: status.HTTP_200_OK}
+        )
+        self.assertTrue(Note.objects.get(id=note_id).is_approved)
+        self.assertEqual(Issue.objects.get(id=issue.id).status, CtrlfIssueStatus.REQUESTED)
+
+    def test_issue_bulk_approve_should_return_403_per_issue_on_not_owner(self):
+        # Given: Note와 Issue를 생성한다.
+        note_id, issue_id = self._make_note()
+
+        # When: owner가 아닌 계정으로 Issue Bulk Approve API를 호출한다.
+        response = self._call_api("issue_bulk_approve", [issue_id], self._login(self.user_data))
+
+        # Then: 해당 Issue의 결과는 403이고, Note는 승인되지 않는다.
+        self.assertEqual(self._results(response), {issue_id: status.HTTP_403_FORBIDDEN})
+        self.assertFalse(Note.objects.get(id=note_id).is_approved)
+        self.assertEqual(Issue.objects.get(id=issue_id).status, CtrlfIssueStatus.REQUESTED)
+
+    def test_issue_bulk_close_should_close_only_closable_issues(self):
+        # Given: owner의 Issue 2개와 이미 승인된 Issue 1개를 생성한다.
+        _, first_issue_id = self._make_note()
+        _, second_issue_id = self._make_topic()
+        _, approved_issue_id = self._make_note()
+        Issue.objects.filter(id=approved_issue_id).change_status(CtrlfIssueStatus.APPROVED)
+
+        # When: owner 정보로 로그인 하여 Issue Bulk Close API를 호출한다.
+        issue_ids = [first_issue_id, second_issue_id, approved_issue_id]
+        response = self._call_api("issue_bulk_close", issue_ids, self._login(self.owner_data))
+
+        # Then: 닫을 수 있는 Issue만 CLOSED 상태가 된다.
+        self.assertEqual(
+            self._results(response),
+            {
+                first_issue_id: status.HTTP_200_OK,
+                second_issue_id: status.HTTP_200_OK,
+                approved_issue_id: status.HTTP_400_BAD_REQUEST,
+            },
+        )
+        self.assertEqual(Issue.objects.filter(status=CtrlfIssueStatus.CLOSED).count(), 2)
+        self.assertEqual(IssueCounter.total(status=CtrlfIssueStatus.CLOSED), 2)
+        self.assertEqual(IssueCounter.total(status=CtrlfIssueStatus.APPROVED), 1)
+
+    def test_issue_bulk_close_should_run_same_number_of_queries_regardless_of_issue_count(self):
+        # Given: Issue 2개와 Issue 10개 묶음을 생성한다.
+        owner_token = self._login(self.owner_data)
+        # And: 첫 호출에서 인증 user 캐시를 채워 둔다.
+        self._call_api("issue_bulk_close", [99999], owner_token)
+        small_issue_ids = [self._make_note()[1] for _ in range(2)]
+        large_issue_ids = [self._make_note()[1] for _ in range(10)]
+
+        # When: 각각 Issue Bulk Close API를 호출한다.
+        with CaptureQueriesContext(connection) as small:
+            self._call_api("issue_bulk_close", small_issue_ids, owner_token)
+        with CaptureQueriesContext(connection) as large:
+            self._call_api("issue_bulk_close", large_issue_ids, owner_token)
+
+        # Then: Issue 개수와 관계없이 같은 수의 query를 실행한다.
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_issue_bulk_delete_should_delete_only_deletable_issues(self):
+        # Given: owner의 Issue 1개, 다른 사람의 Issue 1개, 승인된 Issue 1개를 생성한다.
+        _, issue_id = self._make_note()
+        _, approved_issue_id = self._make_note()
+        Issue.objects.filter(id=approved_issue_id).change_status(CtrlfIssueStatus.APPROVED)
+        others_issue = Issue.objects.create(
+            owner=self.user,
+            title="others issue",
+            status=CtrlfIssueStatus.REQUESTED,
+            related_model_type=CtrlfContentType.NOTE,
+            related_model_id=self.note.id,
+            action=CtrlfActionType.UPDATE,
+        )
+
+        # When: owner 정보로 로그인 하여 Issue Bulk Delete API를 호출한다.
+        issue_ids = [issue_id, approved_issue_id, others_issue.id]
+        response = self._call_api("issue_bulk_delete", issue_ids, self._login(self.owner_data))
+
+        # Then: 삭제할 수 있는 Issue만 삭제된다.
+        self.assertEqual(
+            self._results(response),
+            {
+                issue_id: status.HTTP_204_NO_CONTENT,
+                approved_issue_id: status.HTTP_400_BAD_REQUEST,
+                others_issue.id: status.HTTP_403_FORBIDDEN,
+            },
+        )
+        self.assertFalse(Issue.objects.filter(id=issue_id).exists())
+        self.assertEqual(IssueCounter.total(), Issue.objects.count())
+
+    def test_issue_bulk_action_should_return_400_on_empty_issue_ids(self):
+        # When: 빈 issue_ids로 Issue Bulk Close API를 호출한다.
+        response = self._call_api("issue_bulk_close", [], self._login(self.owner_data))
+
+        # Then: 400을 리턴한다.
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TestCascadeDeleteTasks(IssueTestMixin, TestCase):
+    def _make_pages_with_history(self, topic, count):
+        for i in range(count):
+            page = Page.objects.create(topic=topic)
+            page.owners.add(self.owner)
+            page_history = PageHistory.objects.create(
+                owner=self.owner, page=page, title=f"page {i}", content="content", version_type=PageVersionType.CURRENT
+            )
+            Issue.objects.create(
+                owner=self.owner,
+                title=f"page {i}",
+                status=CtrlfIssueStatus.REQUESTED,
+                related_model_type=CtrlfContentType.PAGE,
+                related_model_id=page_history.id,
+                action=CtrlfActionType.CREATE,
+            )
+
+    def test_delete_note_cascade_should_delete_children_and_issues_in_chunks(self):
+        # Given: Note에 Topic 2개, Topic마다 Page 3개와 이슈를 생성한다.
+        topics = [Topic.objects.create(note=self.note, title=f"topic {i}") for i in range(2)]
+        for topic in topics:
+            self._make_pages_with_history(topic, 3)
+        # And: 다른 Note의 Page는 남아 있어야 한다.
+        other_topic = Topic.objects.create(note=Note.objects.create(title="other note"), title="other topic")
+        self._make_pages_with_history(other_topic, 1)
+        # And: Note 삭제가 승인되어 삭제 표시가 되어 있다.
+        self.note.process_delete()
+
+        # When: chunk 크기를 2로 두고 delete_note_cascade task를 실행했을 때,
+        with patch("ctrlfbe.tasks.CASCADE_DELETE_CHUNK_SIZE", 2):
+            deleted_count = delete_note_cascade(self.note.id)
+
+        # Then: Note 하위의 Topic, Page, PageHistory, 이슈가 모두 삭제된다.
+        self.assertEqual(deleted_count, 1 + 3 + 6 + 6 + 6)
+        self.assertFalse(Note.objects.filter(id=self.note.id).exists())
+        self.assertEqual(list(Page.objects.values_list("topic_id", flat=True)), [other_topic.id])
+        self.assertEqual(PageHistory.objects.count(), 1)
+        self.assertEqual(Issue.objects.count(), 1)
+        # And: 이슈 카운터도 함께 줄어든다.
+        self.assertEqual(IssueCounter.total(), 1)
+
+    def test_delete_note_cascade_should_skip_note_not_marked_deleted(self):
+        # When: 삭제 표시가 되지 않은 Note로 delete_note_cascade task를 실행했을 때,
+        deleted_count = delete_note_cascade(self.note.id)
+
+        # Then: 아무것도 삭제하지 않는다.
+        self.assertEqual(deleted_count, 0)
+        self.assertTrue(Note.objects.filter(id=self.note.id).exists())
+
+    def test_delete_topic_cascade_should_delete_pages_and_issues_of_topic(self):
+        # Given: Topic에 Page 2개와 이슈를 생성하고, Topic 삭제가 승인되었다.
+        self._make_pages_with_history(self.topic, 2)
+        self.topic.process_delete()
+
+        # When: delete_topic_cascade task를 실행했을 때,
+        delete_topic_cascade(self.topic.id)
+
+        # Then: Topic과 하위 Page, 이슈가 삭제되고 Note는 남는다.
+        self.assertFalse(Topic.objects.filter(id=self.topic.id).exists())
+        self.assertFalse(Page.objects.exists())
+        self.assertFalse(Issue.objects.exists())
+        self.assertTrue(Note.objects.filter(id=self.note.id).exists())
+
+    def test_cleanup_orphaned_issues_should_delete_issues_without_content(self):
+        # Given: 컨텐츠가 있는 이슈와 컨텐츠가 사라진 이슈를 생성한다.
+        note_id, issue_id = self._make_note()
+        _, orphaned_issue_id = self._make_note()
+        Note.objects.exclude(id__in=[note_id, self.note.id]).delete()
+
+        # When: cleanup_orphaned_issues task를 실행했을 때,
+        deleted_count = cleanup_orphaned_issues()
+
+        # Then: 컨텐츠가 사라진 이슈만 삭제된다.
+        self.assertEqual(deleted_count, 1)
+        self.assertEqual(list(Issue.objects.values_list("id", flat=True)), [issue_id])
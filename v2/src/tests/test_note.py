@@ -1,15 +1,25 @@
 import json
+from unittest import mock
 
 from ctrlf_auth.models import CtrlfUser
+from ctrlfbe.cache import CACHE_STATUS_HEADER, response_cache
 from ctrlfbe.models import (
     CtrlfActionType,
     CtrlfContentType,
     CtrlfIssueStatus,
     Issue,
     Note,
+    Page,
+    PageHistory,
+    PageVersionType,
+    Topic,
 )
 from ctrlfbe.serializers import IssueCreateSerializer
-from django.test import Client, TestCase
+from ctrlfbe.tasks import delete_note_cascade
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 
@@ -142,6 +152,78 @@ class TestNoteList(NoteTestMixin, TestCase):
         self.assertEqual(response.data["notes"], [])
 
 
+class TestNoteListKeysetCursor(NoteTestMixin, TestCase):
+    def test_note_list_should_walk_all_notes_with_opaque_cursor(self):
+        # Given: Note를 65개 생성한다.
+        note_list = self._make_note_list(65)
+
+        # When: cursor 없이 Note List API를 호출하고, next_cursor를 따라 끝까지 호출한다.
+        response = self.client.get(reverse("notes:note_list_create"))
+        pages = [response.data]
+        while pages[-1]["has_more"]:
+            pages.append(self._call_note_list_api(pages[-1]["next_cursor"]).data)
+
+        # Then: 30, 30, 5개씩 3 페이지로 나누어 리턴한다.
+        self.assertEqual([len(page["notes"]) for page in pages], [30, 30, 5])
+        # And: 마지막 페이지의 next_cursor는 None 이다.
+        self.assertIsNone(pages[-1]["next_cursor"])
+        # And: 모든 Note를 중복 없이 순서대로 리턴한다.
+        self.assertEqual([note["id"] for page in pages for note in page["notes"]], [note.id for note in note_list])
+
+    def test_note_list_should_not_shift_rows_on_deleting_previous_notes(self):
+        # Given: Note를 40개 생성하고, 첫 페이지를 조회한다.
+        note_list = self._make_note_list(40)
+        first_page = self.client.get(reverse("notes:note_list_create")).data
+        # And: 첫 페이지에 있던 Note 5개를 삭제한다.
+        Note.objects.filter(id__in=[note.id for note in note_list[:5]]).delete()
+
+        # When: next_cursor로 Note List API를 호출한다.
+        response = self._call_note_list_api(first_page["next_cursor"])
+
+        # Then: 첫 페이지 다음 Note부터 리턴한다.
+        self.assertEqual([note["id"] for note in response.data["notes"]], [note.id for note in note_list[30:]])
+        self.assertFalse(response.data["has_more"])
+
+    def test_note_list_should_return_has_more_on_legacy_integer_cursor(self):
+        # Given: Note를 31개 생성한다.
+        self._make_note_list(31)
+
+        # When: 기존 정수 cursor로 Note List API를 호출한다.
+        response = self._call_note_list_api(0)
+
+        # Then: 정수 next_cursor와 has_more를 리턴한다.
+        self.assertEqual(response.data["next_cursor"], 30)
+        self.assertTrue(response.data["has_more"])
+
+    def test_note_list_should_not_run_count_query(self):
+        # Given: Note를 31개 생성한다.
+        self._make_note_list(31)
+
+        # When: Note List API를 호출한다.
+        with CaptureQueriesContext(connection) as captured:
+            self.client.get(reverse("notes:note_list_create"))
+
+        # Then: COUNT 쿼리는 실행되지 않는다.
+        self.assertFalse(any("COUNT(" in query["sql"].upper() for query in captured.captured_queries))
+
+    def test_note_list_should_return_400_on_invalid_cursor(self):
+        # When: 유효하지 않은 cursor로 Note List API를 호출한다.
+        response = self._call_note_list_api("invalid-cursor")
+
+        # Then: status code는 400을 리턴한다.
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_note_list_should_prefetch_owners_in_one_query(self):
+        # Given: Note를 30개 생성한다.
+        self._make_note_list(30)
+
+        # When: Note List API를 호출한다.
+        # Then: Note 조회, owners 조회 2번의 query만 실행한다.
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("notes:note_list_create"))
+        self.assertEqual(response.data["notes"][0]["owners"], [self.user.id])
+
+
 class TestNoteCreate(NoteTestMixin, TestCase):
     def _create_note_and_issue_by_calling_note_create_api(self):
         note_create_request_body = {"title": "test note title", "reason": "reason for note create"}
@@ -306,6 +388,13 @@ class TestNoteDetail(NoteTestMixin, TestCase):
         # And : "노트를 찾을 수 없습니다."라는 메시지를 리턴한다.
         self.assertEqual(response.data["message"], "노트를 찾을 수 없습니다.")
 
+    def test_note_detail_should_prefetch_owners(self):
+        # When: Note Detail API를 호출한다.
+        # Then: ETag 를 만들 generation 조회, Note 조회, owners 조회 3번의 query만 실행한다.
+        with self.assertNumQueries(3):
+            response = self._call_note_detail_api(self.note.id)
+        self.assertEqual(response.data["owners"], [self.user.id])
+
 
 class TestNoteUpdate(NoteTestMixin, TestCase):
     def setUp(self) -> None:
@@ -545,14 +634,26 @@ class TestNoteDelete(NoteTestMixin, TestCase):
         issue_approve_user_token = _login(self.user_data)
 
         # When: Note Update Issue에 대한 Issue Approve API를 호출한다.
-        response = self._call_issue_approve_api(valid_issue.id, issue_approve_user_token)
+        with mock.patch("ctrlfbe.views.delete_note_cascade.delay") as mock_cascade_delay, mock.patch(
+            "ctrlfbe.views.update_search_index.delay"
+        ) as mock_search_index_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self._call_issue_approve_api(valid_issue.id, issue_approve_user_token)
 
         # Then: status code는 204이다.
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         # And: issue도 삭제되어야 한다
         valid_issue = Issue.objects.first()
         self.assertIsNone(valid_issue)
-        # And: Note는 None 이어야 한다
+        # And: Note는 삭제 표시되어 Note Detail API에서 조회되지 않는다.
+        self.assertTrue(Note.objects.get(id=self.note.id).is_deleted)
+        self.assertEqual(self._call_note_detail_api(self.note.id).status_code, status.HTTP_404_NOT_FOUND)
+        # And: commit 후 하위 컨텐츠 삭제 task를 예약한다.
+        mock_cascade_delay.assert_called_once_with(self.note.id)
+        # And: 검색 색인에서도 하위 컨텐츠까지 빠지도록 색인 갱신 task를 예약한다.
+        mock_search_index_delay.assert_called_once_with(CtrlfContentType.NOTE, self.note.id)
+        # And: task가 실행되면 Note는 None 이어야 한다
+        delete_note_cascade(self.note.id)
         self.assertIsNone(Note.objects.filter(id=self.note.id).first())
 
     def test_should_not_delete_note_on_not_having_permission_about_delete_note_issue(self):
@@ -584,3 +685,139 @@ class TestNoteDelete(NoteTestMixin, TestCase):
         # And: Note는 삭제되지 않아야 한다.
         note = Note.objects.filter(id=self.note.id).first()
         self.assertIsNotNone(note)
+
+    def test_note_delete_should_run_fixed_number_of_queries(self):
+        # Given: 로그인 해서 토큰을 발급받는다.
+        token = _login(self.user_data)
+
+        # When: Note 삭제 API를 호출한다.
+        # Then: Note는 한 번만 조회하고, 정해진 횟수의 query만 실행한다.
+        with self.assertNumQueries(7):
+            response = self._call_note_delete_api({"reason": "reason for delete note"}, self.note.id, token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+@override_settings(CTRLF_RESPONSE_CACHE={"ENABLED": True, "ALIAS": "default", "TTL": 600})
+class TestNoteResponseCache(NoteTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.note = self._make_note_list(1)[0]
+
+    @mock.patch("ctrlfbe.views.update_search_index.delay")
+    def test_note_list_should_be_cached_until_note_is_created_or_approved(self, _):
+        # Given: Note 목록을 한 번 조회해 cache 에 저장한다.
+        self.client.get(reverse("notes:note_list_create"))
+
+        # When: 다시 조회한다.
+        # Then: query 없이 cache 된 응답을 돌려준다.
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("notes:note_list_create"))
+        self.assertEqual(response[CACHE_STATUS_HEADER], "HIT")
+
+        # When: Note 를 만들고 승인한다.
+        token = _login(self.user_data)
+        with self.captureOnCommitCallbacks(execute=True):
+            self._call_note_create_api({"title": "new note", "reason": "reason"}, token)
+
+        # Then: 새 Note 가 목록에 보인다.
+        response = self.client.get(reverse("notes:note_list_create"))
+        self.assertEqual(response[CACHE_STATUS_HEADER], "MISS")
+        self.assertEqual([note["title"] for note in response.data["notes"]], ["test title 1", "new note"])
+
+        # When: 새 Note 생성 이슈를 승인한다.
+        with self.captureOnCommitCallbacks(execute=True):
+            self._call_issue_approve_api(Issue.objects.get().id, token)
+
+        # Then: Note 목록과 Note Detail 모두 승인된 Note 를 돌려준다.
+        new_note = Note.objects.get(title="new note")
+        response = self.client.get(reverse("notes:note_list_create"))
+        self.assertEqual(response[CACHE_STATUS_HEADER], "MISS")
+        self.assertTrue(response.data["notes"][1]["is_approved"])
+        self.assertTrue(self._call_note_detail_api(new_note.id).data["is_approved"])
+        self.assertNotIn("generation", response.data["notes"][1])
+
+
+class TestNoteTree(NoteTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.note = self._make_note_list(1)[0]
+        self.topics = [Topic.objects.create(note=self.note, title=f"topic {i + 1}") for i in range(3)]
+        Topic.objects.filter(id=self.topics[2].id).update(is_deleted=True)
+        for topic in self.topics:
+            for i in range(2):
+                page = Page.objects.create(topic=topic)
+                PageHistory.objects.create(
+                    owner=self.user,
+                    page=page,
+                    title=f"{topic.title} page {i + 1}",
+                    content="content",
+                    version_type=PageVersionType.CURRENT,
+                )
+
+    def _call_note_tree_api(self, note_id):
+        return self.client.get(reverse("notes:note_tree", kwargs={"note_id": note_id}))
+
+    def test_note_tree_should_return_topics_and_current_pages_in_fixed_number_of_queries(self):
+        # When: Note Tree API를 호출한다.
+        # Then: validator 조회와 Note, Topic, Page 조회 4번의 query만 실행한다.
+        with self.assertNumQueries(4):
+            response = self._call_note_tree_api(self.note.id)
+
+        # And: 삭제되지 않은 topic 과 각 page 의 최신 버전 정보를 리턴한다.
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["title"], "test title 1")
+        self.assertEqual([topic["title"] for topic in response.data["topics"]], ["topic 1", "topic 2"])
+        self.assertEqual(
+            response.data["topics"][1]["pages"][0],
+            {
+                "id": self.topics[1].page_set.first().id,
+                "title": "topic 2 page 1",
+                "version_no": 1,
+                "is_approved": False,
+            },
+        )
+
+    def test_note_tree_should_revalidate_by_etag_after_child_topic_is_approved(self):
+        # Given: Note Tree 를 조회해 ETag 를 받는다.
+        response = self._call_note_tree_api(self.note.id)
+        self.assertNotIn("Last-Modified", response)
+        etag = response["ETag"]
+
+        # When: Note.updated_at 은 그대로 두고 하위 Topic 이 승인된다.
+        self.topics[0].process_create()
+        response_cache.bump(self.topics[0])
+
+        # Then: 이전 ETag 로 조회하면 304 대신 바뀐 tree 를 리턴한다.
+        response = self.client.get(
+            reverse("notes:note_tree", kwargs={"note_id": self.note.id}), HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data["topics"][0]["is_approved"])
+
+    def test_note_tree_should_return_404_on_invalid_note_id(self):
+        # When: 없는 Note 의 Note Tree API를 호출한다.
+        response = self._call_note_tree_api(1234)
+
+        # Then: status code는 404이다.
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data["message"], "노트를 찾을 수 없습니다.")
+
+    @override_settings(CTRLF_RESPONSE_CACHE={"ENABLED": True, "ALIAS": "default", "TTL": 600})
+    def test_note_tree_should_be_cached_under_note_generation(self):
+        # Given: Note Tree 를 한 번 조회한다.
+        cache.clear()
+        self._call_note_tree_api(self.note.id)
+
+        # When: 다시 조회한다.
+        # Then: generation 조회 query 한 번으로 cache 된 응답을 돌려준다.
+        with self.assertNumQueries(1):
+            response = self._call_note_tree_api(self.note.id)
+        self.assertEqual(response[CACHE_STATUS_HEADER], "HIT")
+
+        # When: Note 에 속한 Topic 이 바뀌어 generation 이 올라간다.
+        response_cache.bump(self.topics[0])
+
+        # Then: tree 를 다시 만든다.
+        response = self._call_note_tree_api(self.note.id)
+        self.assertEqual(response[CACHE_STATUS_HEADER], "MISS")
@@ -1,6 +1,11 @@
 import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import StringIO
 
 from ctrlf_auth.models import CtrlfUser
+from ctrlfbe.cache import CACHE_STATUS_HEADER, response_cache
+from ctrlfbe.conditional import IMMUTABLE_CACHE_CONTROL, REVALIDATE_CACHE_CONTROL
 from ctrlfbe.models import (
     CtrlfActionType,
     CtrlfContentType,
@@ -8,13 +13,27 @@ from ctrlfbe.models import (
     Issue,
     Note,
     Page,
+    PageBody,
     PageHistory,
     PageVersionType,
     Topic,
 )
+from ctrlfbe.page_delta import apply_delta, make_delta
 from ctrlfbe.serializers import IssueCreateSerializer
-from django.test import Client, TestCase
+from ctrlfbe.tasks import cleanup_orphaned_page_bodies
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import (
+    Client,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
 from rest_framework import status
 
 from .test_mixin import _get_header, _login
@@ -150,6 +169,21 @@ class TestPageList(PageTestMixin, TestCase):
             actual=response.data, expected=(page_list_in_topic_a, page_history_list_in_topic_a)
         )
 
+    def test_page_list_should_run_fixed_number_of_queries_regardless_of_page_count(self):
+        # Given: Topic A에 1개, Topic B에 20개의 Page와 PageHistory를 생성한다.
+        topic_a = Topic.objects.create(note=self.note, title="topic A")
+        topic_b = Topic.objects.create(note=self.note, title="topic B")
+        self._make_page_history_in_page(self._make_pages_in_topic(topic=topic_a, count=1))
+        self._make_page_history_in_page(self._make_pages_in_topic(topic=topic_b, count=20))
+
+        for topic in (topic_a, topic_b):
+            # When: Page List API를 호출한다.
+            # Then: Topic, Page(current_history join), owners 조회 3개의 쿼리만 실행된다.
+            with self.assertNumQueries(3):
+                response = self._call_page_list_api(topic.id)
+            # And: status code는 200을 리턴한다.
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_page_list_should_return_404_not_found_by_invalid_topic_id(self):
         # Given: Page 10개 생성한다. 유효하지 않은 topic id가 주어진다.
         page_list = self._make_pages_in_topic(topic=self.topic, count=10)
@@ -248,6 +282,26 @@ class TestPageCreate(PageTestMixin, TestCase):
         # And: Issue는 생성되지 않는다.
         self.assertEqual(Issue.objects.count(), 0)
 
+    def test_create_page_should_return_404_not_found_on_deleted_topic(self):
+        # Given: 삭제가 승인되어 cascade 삭제를 기다리는 Topic이 주어진다.
+        self.topic.process_delete()
+        request_body = {
+            "title": "test page title",
+            "content": "test page content",
+            "topic_id": self.topic.id,
+            "reason": "some reason for page create",
+        }
+
+        # When: 인증이 필요한 Page Create API를 호출한다.
+        response = self._call_page_create_api(request_body, _login(self.user_data))
+
+        # Then: status code는 404을 리턴한다.
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        # And: Page, PageHistory, Issue는 생성되지 않는다.
+        self.assertEqual(Page.objects.count(), 0)
+        self.assertEqual(PageHistory.objects.count(), 0)
+        self.assertEqual(Issue.objects.count(), 0)
+
     def test_create_page_should_return_400_bad_request_on_invalid_title(self):
         # Given: 유효하지 않은 PageHistory title이 주어진다.
         invalid_title = ""
@@ -360,6 +414,21 @@ class TestPageCreate(PageTestMixin, TestCase):
         page_history = PageHistory.objects.first()
         self.assertTrue(page_history.is_approved)
 
+    def test_should_return_404_not_found_on_approving_issue_about_page_create_in_deleted_note(self):
+        # Given: Page Create API를 호출하여 Page, 미승인 상태의 PageHistory, Page Create Issue를 생성한다.
+        self._create_page_and_page_history_and_issue_by_calling_topic_create_api()
+        page_create_issue_id = Issue.objects.first().id
+        # And: 그 뒤 상위 Note 삭제가 승인되었다.
+        self.note.process_delete()
+
+        # When: Page Create Issue에 대한 Issue Approve API를 호출한다.
+        response = self._call_issue_approve_api(page_create_issue_id, _login(self.user_data))
+
+        # Then: status code는 404을 리턴한다.
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        # And: PageHistory는 승인되지 않는다.
+        self.assertFalse(PageHistory.objects.first().is_approved)
+
     def test_should_not_change_field_of_is_approved_to_true_on_not_having_permission_to_issue_about_page_create(self):
         # Given: Page Create API를 호출하여 Page, 미승인 상태의 PageHistory, Page Create Issue를 생성한다.
         self._create_page_and_page_history_and_issue_by_calling_topic_create_api()
@@ -651,6 +720,9 @@ class TestPageUpdate(PageTestMixin, TestCase):
         # And: Issue Approve에 대한 PageHistory의 PageVersionType은 CURRENT이다.
         new_page_history = PageHistory.objects.get(version_no=2)
         self.assertEqual(new_page_history.version_type, PageVersionType.CURRENT)
+        # And: Page의 current_history는 Issue Approve에 대한 PageHistory를 가리킨다.
+        self.page.refresh_from_db()
+        self.assertEqual(self.page.current_history, new_page_history)
 
     def test_should_not_change_version_type_to_previous_on_not_having_permission_to_topic_update_issue(self):
         # Given: Page Update API를 호출하여 Topic Update Issue와 새 PageHistory를 생성한다.
@@ -675,6 +747,286 @@ class TestPageUpdate(PageTestMixin, TestCase):
         self.assertEqual(new_page_history.version_type, PageVersionType.UPDATE)
 
 
+class TestPageUpdateConcurrency(PageTestMixin, TransactionTestCase):
+    THREAD_COUNT = 8
+
+    def setUp(self):
+        super().setUp()
+        self.page = self._make_pages_in_topic(self.topic, 1)[0]
+        self._make_page_history_in_page([self.page])
+
+    def _call_page_update_api_in_thread(self, token, index):
+        try:
+            request_body = {"new_title": f"title {index}", "new_content": f"content {index}", "reason": "reason"}
+            return self._call_page_update_api(request_body, self.page.id, token).status_code
+        finally:
+            connection.close()
+
+    def test_concurrent_page_updates_should_get_distinct_and_gap_free_version_no(self):
+        # Given: 로그인 해서 토큰을 발급받는다.
+        token = _login(self.user_data)
+
+        # When: 여러 thread에서 동시에 같은 Page에 대한 Page Update API를 호출한다.
+        with ThreadPoolExecutor(max_workers=self.THREAD_COUNT) as executor:
+            status_codes = list(
+                executor.map(lambda index: self._call_page_update_api_in_thread(token, index), range(self.THREAD_COUNT))
+            )
+
+        # Then: 모든 요청이 성공한다.
+        self.assertEqual(status_codes, [status.HTTP_201_CREATED] * self.THREAD_COUNT)
+        # And: 새 PageHistory의 version_no는 중복과 빈 번호 없이 2부터 발급된다.
+        version_nos = PageHistory.objects.filter(page=self.page, version_type=PageVersionType.UPDATE).values_list(
+            "version_no", flat=True
+        )
+        self.assertEqual(sorted(version_nos), list(range(2, self.THREAD_COUNT + 2)))
+        # And: Page의 last_version_no는 마지막으로 발급한 version_no이다.
+        self.page.refresh_from_db()
+        self.assertEqual(self.page.last_version_no, self.THREAD_COUNT + 1)
+
+
+class TestPageProcessUpdate(PageTestMixin, TestCase):
+    # 잠근 Page row 조회, PageHistory/Page UPDATE 와 savepoint 2번. SQLite 는 lock 을 잡는 UPDATE 가 1번 더 있다.
+    APPROVAL_QUERY_COUNT = 5 + (connection.vendor == "sqlite")
+
+    def setUp(self):
+        super().setUp()
+        self.page = self._make_pages_in_topic(self.topic, 1)[0]
+        self.current_page_history = self._make_page_history_in_page([self.page])[0]
+        self.new_page_history = PageHistory.objects.create(
+            owner=self.user,
+            page=self.page,
+            title="new title",
+            content="new content",
+            version_no=2,
+            version_type=PageVersionType.UPDATE,
+        )
+        self.page.refresh_from_db()
+
+    def test_process_update_should_swap_current_page_history_with_targeted_updates(self):
+        # When: Page 수정을 승인한다.
+        # Then: 잠근 Page row 조회 1번, PageHistory/Page UPDATE 2번만 실행한다.
+        with self.assertNumQueries(self.APPROVAL_QUERY_COUNT):
+            self.page.process_update()
+
+        # And: 새 PageHistory는 승인된 CURRENT, 기존 PageHistory는 PREVIOUS가 된다.
+        self.new_page_history.refresh_from_db()
+        self.current_page_history.refresh_from_db()
+        self.assertEqual(self.new_page_history.version_type, PageVersionType.CURRENT)
+        self.assertTrue(self.new_page_history.is_approved)
+        self.assertEqual(self.current_page_history.version_type, PageVersionType.PREVIOUS)
+        self.assertFalse(self.current_page_history.is_approved)
+        # And: Page의 current_history는 새 PageHistory를 가리킨다.
+        self.assertEqual(self.page.current_history, self.new_page_history)
+        self.assertEqual(Page.objects.get(id=self.page.id).current_history_id, self.new_page_history.id)
+
+    def test_process_update_should_keep_single_current_page_history_on_stale_page_instances(self):
+        # Given: 같은 Page에 수정 버전이 하나 더 있고, 승인 전에 읽어 둔 Page instance 가 둘 있다.
+        newer_page_history = PageHistory.objects.create(
+            owner=self.user,
+            page=self.page,
+            title="newer title",
+            content="newer content",
+            version_no=3,
+            version_type=PageVersionType.UPDATE,
+        )
+        stale_pages = [Page.objects.get(id=self.page.id), Page.objects.get(id=self.page.id)]
+
+        # When: 두 instance 로 차례로 수정을 승인한다.
+        for page in stale_pages:
+            page.process_update()
+
+        # Then: 마지막으로 승인한 버전만 CURRENT 이고 나머지는 PREVIOUS 가 된다.
+        version_types = (
+            PageHistory.objects.filter(page=self.page).order_by("version_no").values_list("version_no", "version_type")
+        )
+        self.assertEqual(
+            list(version_types),
+            [(1, PageVersionType.PREVIOUS), (2, PageVersionType.PREVIOUS), (3, PageVersionType.CURRENT)],
+        )
+        self.assertEqual(Page.objects.get(id=self.page.id).current_history_id, newer_page_history.id)
+
+    def test_benchmark_page_approval_command_should_report_queries_per_approval(self):
+        # When: 벤치마크 command를 실행한다.
+        out = StringIO()
+        call_command("benchmark_page_approval", "--pages", "3", "--threads", "1", stdout=out)
+
+        # Then: 승인당 query 수를 출력하고, 벤치마크용 데이터는 남기지 않는다.
+        self.assertIn("approvals: 3, threads: 1", out.getvalue())
+        self.assertIn(f"queries/approval: {self.APPROVAL_QUERY_COUNT:.2f}", out.getvalue())
+        self.assertFalse(Note.objects.filter(title="benchmark note").exists())
+
+
+DELTA_STORAGE = {"MODE": "delta", "SNAPSHOT_INTERVAL": 3}
+FULL_STORAGE = {"MODE": "full", "SNAPSHOT_INTERVAL": 3}
+
+
+class TestPageDelta(SimpleTestCase):
+    def test_apply_delta_should_restore_target_from_base(self):
+        # Given: 줄이 바뀌고, 추가되고, 지워진 두 본문이 주어진다.
+        base = "첫 줄\n둘째 줄\n셋째 줄\n넷째 줄"
+        target = "첫 줄\n바뀐 둘째 줄\n셋째 줄\n새 줄\n"
+
+        # When: delta 를 만들어 base 에 적용한다.
+        restored = apply_delta(base, make_delta(base, target))
+
+        # Then: target 이 그대로 복원된다.
+        self.assertEqual(restored, target)
+
+
+class TestPageHistoryDeltaStorage(PageTestMixin, TestCase):
+    VERSION_COUNT = 7
+
+    def setUp(self):
+        super().setUp()
+        self.page = self._make_pages_in_topic(self.topic, 1)[0]
+        self.contents = {
+            version_no: "".join(f"{version_no if line_no == version_no else 0} 번째 줄 본문\n" for line_no in range(20))
+            for version_no in range(1, self.VERSION_COUNT + 1)
+        }
+
+    def _make_page_histories(self, approve):
+        for version_no, content in self.contents.items():
+            PageHistory.objects.create(
+                owner=self.user,
+                page=self.page,
+                title=f"title {version_no}",
+                content=content,
+                version_no=version_no,
+                version_type=PageVersionType.CURRENT if version_no == 1 else PageVersionType.UPDATE,
+            )
+            if version_no > 1 and approve:
+                self.page.refresh_from_db()
+                self.page.process_update()
+        if not approve:
+            PageHistory.objects.filter(page=self.page).exclude(version_no=self.VERSION_COUNT).update(
+                version_type=PageVersionType.PREVIOUS
+            )
+            PageHistory.objects.filter(page=self.page, version_no=self.VERSION_COUNT).update(
+                version_type=PageVersionType.CURRENT
+            )
+
+    def _assert_page_detail_returns_every_version(self):
+        for version_no, content in self.contents.items():
+            response = self._call_page_detail_api(self.page.id, version_no)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data["content"], content)
+
+    def _delta_depths(self):
+        return list(
+            PageHistory.objects.filter(page=self.page).order_by("version_no").values_list("delta_depth", flat=True)
+        )
+
+    @override_settings(CTRLF_PAGE_HISTORY_STORAGE=DELTA_STORAGE)
+    def test_process_update_should_store_previous_version_as_delta_with_periodic_snapshot(self):
+        # When: delta 저장 방식에서 Page 수정을 여러 번 승인한다.
+        self._make_page_histories(approve=True)
+
+        # Then: PREVIOUS 버전은 delta 로, SNAPSHOT_INTERVAL 마다 전체 본문으로 저장되고 CURRENT 는 전체 본문이다.
+        self.assertEqual(self._delta_depths(), [0, 1, 2, 0, 1, 2, 0])
+        current_history = PageHistory.objects.get(page=self.page, version_type=PageVersionType.CURRENT)
+        self.assertEqual(current_history.content, self.contents[self.VERSION_COUNT])
+        # And: 모든 version_no 의 Page Detail 은 원래 본문을 돌려준다.
+        self._assert_page_detail_returns_every_version()
+
+    @override_settings(CTRLF_PAGE_HISTORY_STORAGE=DELTA_STORAGE)
+    def test_get_content_should_read_only_versions_since_snapshot(self):
+        # Given: delta 저장 방식으로 수정 이력이 쌓여 있다.
+        self._make_page_histories(approve=True)
+        page_history = PageHistory.objects.select_related("body").get(page=self.page, version_no=6)
+
+        # When & Then: 본문 복원은 snapshot 부터 해당 버전까지를 한 번의 query 로 읽는다.
+        with self.assertNumQueries(1):
+            content = page_history.get_content()
+        self.assertEqual(content, self.contents[6])
+
+    def test_compact_page_history_command_should_convert_existing_history(self):
+        # Given: 전체 본문으로 저장된 수정 이력이 있다.
+        self._make_page_histories(approve=False)
+        self.assertEqual(self._delta_depths(), [0] * self.VERSION_COUNT)
+
+        # When: delta 저장 방식으로 변환 command 를 실행한다.
+        out = StringIO()
+        with override_settings(CTRLF_PAGE_HISTORY_STORAGE=DELTA_STORAGE):
+            call_command("compact_page_history", "--chunk-size", "1", stdout=out)
+
+        # Then: PREVIOUS 버전이 delta 로 바뀌고 모든 버전의 본문은 그대로 조회된다.
+        self.assertIn("4개의 PageHistory 를 delta 저장 방식으로 바꿨습니다.", out.getvalue())
+        self.assertEqual(self._delta_depths(), [0, 1, 2, 0, 1, 2, 0])
+        self._assert_page_detail_returns_every_version()
+
+        # When: 다시 full 저장 방식으로 변환한다.
+        with override_settings(CTRLF_PAGE_HISTORY_STORAGE=FULL_STORAGE):
+            call_command("compact_page_history", stdout=StringIO())
+
+        # Then: 모든 버전이 원래 전체 본문으로 돌아온다.
+        self.assertEqual(
+            list(
+                PageHistory.objects.filter(page=self.page)
+                .order_by("version_no")
+                .values_list("body__content", flat=True)
+            ),
+            list(self.contents.values()),
+        )
+        self.assertEqual(self._delta_depths(), [0] * self.VERSION_COUNT)
+
+    def test_compact_page_history_command_should_fail_on_delta_without_previous_version(self):
+        # Given: delta 로 저장된 버전의 직전 버전이 사라졌다.
+        with override_settings(CTRLF_PAGE_HISTORY_STORAGE=DELTA_STORAGE):
+            self._make_page_histories(approve=True)
+        PageHistory.objects.filter(page=self.page, version_no=1).delete()
+
+        # When & Then: 본문을 복원할 수 없다는 CommandError 로 실패한다.
+        with self.assertRaisesMessage(CommandError, f"page {self.page.id} 의 version 2 은 delta 인데"):
+            call_command("compact_page_history", stdout=StringIO())
+
+
+class TestPageBody(PageTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.page = self._make_pages_in_topic(self.topic, 1)[0]
+        self.page_history = self._make_page_history_in_page([self.page])[0]
+
+    def test_page_update_with_same_content_should_share_page_body(self):
+        # Given: 로그인 해서 토큰을 발급받는다.
+        token = _login(self.user_data)
+
+        # When: 본문은 그대로 두고 title 만 바꾸는 Page 수정 API 를 호출한다.
+        response = self._call_page_update_api(
+            {"new_title": "new title", "new_content": self.page_history.content, "reason": "title 수정"},
+            self.page.id,
+            token,
+        )
+
+        # Then: 새 PageHistory 는 기존 본문을 함께 가리키고 본문은 한 번만 저장된다.
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        new_page_history = PageHistory.objects.get(page=self.page, version_no=2)
+        self.assertTrue(new_page_history.has_same_content(self.page_history))
+        self.assertEqual(PageBody.objects.count(), 1)
+        # And: 본문이 다르면 다른 PageBody 에 저장된다.
+        self._call_page_update_api(
+            {"new_title": "new title", "new_content": "new content", "reason": "본문 수정"}, self.page.id, token
+        )
+        self.assertFalse(PageHistory.objects.get(page=self.page, version_no=3).has_same_content(self.page_history))
+        self.assertEqual(PageBody.objects.count(), 2)
+
+    def test_cleanup_orphaned_page_bodies_should_delete_only_old_unreferenced_bodies(self):
+        # Given: 가리키는 PageHistory 가 없는 오래된 본문과 방금 저장한 본문이 있다.
+        old_body, new_body = PageBody.for_content("old orphan"), PageBody.for_content("new orphan")
+        PageBody.store([old_body, new_body])
+        PageBody.objects.filter(hash__in=[old_body.hash, self.page_history.body_id]).update(
+            created_at=timezone.now() - timedelta(days=2)
+        )
+
+        # When: 고아 본문 정리 task 를 실행한다.
+        deleted_count = cleanup_orphaned_page_bodies()
+
+        # Then: 하루 넘게 아무도 가리키지 않은 본문만 지운다.
+        self.assertEqual(deleted_count, 1)
+        self.assertCountEqual(
+            PageBody.objects.values_list("hash", flat=True), [new_body.hash, self.page_history.body_id]
+        )
+
+
 class TestPageDelete(PageTestMixin, TestCase):
     def setUp(self):
         super().setUp()
@@ -785,3 +1137,135 @@ class TestPageDelete(PageTestMixin, TestCase):
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
         # And: Page는 삭제되지 않아야 한다.
         self.assertIsNotNone(Page.objects.filter(id=self.page.id).first())
+
+    def test_page_delete_should_run_fixed_number_of_queries(self):
+        # Given: 로그인 해서 토큰을 발급받는다.
+        token = _login(self.user_data)
+
+        # When: Page 삭제 API를 호출한다.
+        # Then: Page와 Page History는 한 번만 조회하고, 정해진 횟수의 query만 실행한다.
+        with self.assertNumQueries(7):
+            response = self._call_page_delete_api({"reason": "reason for delete page"}, self.page.id, token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(Issue.objects.get().related_model_id, self.page_history.id)
+
+
+@override_settings(CTRLF_RESPONSE_CACHE={"ENABLED": True, "ALIAS": "default", "TTL": 600})
+class TestPageResponseCache(PageTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.page = self._make_pages_in_topic(self.topic, 1)[0]
+        self.page_history = self._make_page_history_in_page([self.page])[0]
+
+    def test_page_detail_should_be_cached_until_note_generation_changes(self):
+        # Given: Page Detail 을 한 번 조회해 cache 에 저장한다.
+        response = self._call_page_detail_api(self.page.id, 1)
+        self.assertEqual(response[CACHE_STATUS_HEADER], "MISS")
+
+        # When: 같은 Page Detail 을 다시 조회한다.
+        # Then: generation 조회 query 한 번으로 cache 된 응답을 돌려준다.
+        with self.assertNumQueries(1):
+            response = self._call_page_detail_api(self.page.id, 1)
+        self.assertEqual(response[CACHE_STATUS_HEADER], "HIT")
+        self.assertEqual(response.data["content"], "test page content 1")
+
+        # When: Page 수정을 요청하고 승인한다.
+        token = _login(self.user_data)
+        request_body = {"new_title": "new page title", "new_content": "new page content", "reason": "reason"}
+        self._call_page_update_api(request_body, self.page.id, token)
+        self._call_issue_approve_api(Issue.objects.get(action=CtrlfActionType.UPDATE).id, token)
+
+        # Then: Note generation 이 바뀌어 Page 목록과 Page Detail 을 다시 만든다.
+        response = self._call_page_list_api(self.topic.id)
+        self.assertEqual(response[CACHE_STATUS_HEADER], "MISS")
+        self.assertEqual(response.data[0]["version_no"], 2)
+        response = self._call_page_detail_api(self.page.id, 1)
+        self.assertEqual(response[CACHE_STATUS_HEADER], "MISS")
+        self.assertEqual(response.data["version_type"], PageVersionType.PREVIOUS)
+        # And: hit/miss 수를 command 로 확인할 수 있다.
+        out = StringIO()
+        call_command("response_cache_stats", "--reset", stdout=out)
+        self.assertEqual(out.getvalue().strip(), "hits: 1, misses: 3, hit ratio: 25.0%")
+        self.assertEqual(response_cache.stats(), {"hits": 0, "misses": 0})
+
+    def test_page_detail_should_not_cache_not_found_response(self):
+        # When: 없는 버전을 두 번 조회한다.
+        for _ in range(2):
+            response = self._call_page_detail_api(self.page.id, 2)
+
+            # Then: 없는 버전은 cache 를 거치지 않고 404 를 리턴한다.
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response_cache.stats(), {"hits": 0, "misses": 0})
+
+
+class TestPageConditionalGet(PageTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.page = self._make_pages_in_topic(self.topic, 1)[0]
+        self.page_history = self._make_page_history_in_page([self.page])[0]
+
+    def _call_page_detail_api_with_headers(self, version_no, **headers):
+        return self.client.get(
+            reverse("pages:page_detail_update_delete", kwargs={"page_id": self.page.id}),
+            {"version_no": version_no},
+            **headers,
+        )
+
+    def test_page_detail_should_return_304_without_loading_content(self):
+        # Given: Page Detail 을 조회해 ETag 를 받는다.
+        response = self._call_page_detail_api(self.page.id, 1)
+        self.assertEqual(response["Cache-Control"], REVALIDATE_CACHE_CONTROL)
+
+        # When: 받은 ETag 로 다시 조회한다.
+        # Then: validator 조회 query 한 번으로 304 를 리턴한다.
+        with self.assertNumQueries(1):
+            not_modified = self._call_page_detail_api_with_headers(1, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified["ETag"], response["ETag"])
+        self.assertEqual(not_modified.content, b"")
+
+    def test_page_detail_should_not_return_stale_304_by_last_modified_on_pending_version(self):
+        # Given: 수정 요청한 버전을 조회한다.
+        token = _login(self.user_data)
+        request_body = {"new_title": "new page title", "new_content": "new page content", "reason": "reason"}
+        self._call_page_update_api(request_body, self.page.id, token)
+        response = self._call_page_detail_api(self.page.id, 2)
+        # And: updated_at 을 바꾸지 않는 이슈 삭제로 응답의 issue_id 가 바뀐다.
+        issue = Issue.objects.get(action=CtrlfActionType.UPDATE)
+        self.assertEqual(response.data["issue_id"], issue.id)
+        self.client.delete(
+            reverse("actions:issue_delete"),
+            json.dumps({"issue_id": issue.id}),
+            content_type="application/json",
+            **_get_header(token),
+        )
+
+        # When: If-Modified-Since 만 보내 다시 조회한다.
+        if_modified_since = http_date(timezone.now().timestamp() + 60)
+        response = self._call_page_detail_api_with_headers(2, HTTP_IF_MODIFIED_SINCE=if_modified_since)
+
+        # Then: Last-Modified 가 없으므로 304 대신 바뀐 응답을 리턴한다.
+        self.assertNotIn("Last-Modified", response)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["issue_id"])
+
+    def test_page_detail_should_change_etag_and_become_immutable_after_newer_version_is_approved(self):
+        # Given: 1 버전의 ETag 를 받는다.
+        etag = self._call_page_detail_api(self.page.id, 1)["ETag"]
+
+        # When: Page 수정을 요청하고 승인한다.
+        token = _login(self.user_data)
+        request_body = {"new_title": "new page title", "new_content": "new page content", "reason": "reason"}
+        self._call_page_update_api(request_body, self.page.id, token)
+        self._call_issue_approve_api(Issue.objects.get(action=CtrlfActionType.UPDATE).id, token)
+
+        # Then: 이전 ETag 로 조회하면 PREVIOUS 가 된 1 버전을 다시 내려준다.
+        response = self._call_page_detail_api_with_headers(1, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(response.data["version_type"], PageVersionType.PREVIOUS)
+        # And: 더 바뀌지 않는 PREVIOUS 버전은 immutable 로 캐시하게 하고 Last-Modified 로도 304 를 리턴한다.
+        self.assertEqual(response["Cache-Control"], IMMUTABLE_CACHE_CONTROL)
+        not_modified = self._call_page_detail_api_with_headers(1, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,92 @@
+import datetime
+import json
+import uuid
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from common.parsers import ORJSONParser
+from common.renderers import ORJSONRenderer
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+
+class TestORJSONRenderer(SimpleTestCase):
+    def test_render_should_return_same_json_as_stdlib_renderer(self):
+        # Given: 한글, datetime, Decimal 등 stdlib encoder 가 따로 처리하는 값이 주어진다.
+        data = {
+            "title": "장고 배포 가이드",
+            "content": "첫 줄\u2028둘째 줄\u2029",
+            "created_at": datetime.datetime(2021, 7, 1, 9, 30, 15, 123456, tzinfo=timezone.utc),
+            "local_created_at": datetime.datetime(
+                2021, 7, 1, 18, 30, 15, tzinfo=datetime.timezone(datetime.timedelta(hours=9))
+            ),
+            "date": datetime.date(2021, 7, 1),
+            "time": datetime.time(9, 30, 15, 123456),
+            "price": Decimal("12.50"),
+            "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "lazy": gettext_lazy("페이지"),
+            "version_counts": {1: "v1", 2: "v2"},
+            "ids": (1, 2, 3),
+        }
+
+        # When & Then: stdlib JSONRenderer 와 같은 byte 를 만든다.
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_render_should_write_floats_in_orjson_format_that_parse_to_same_values(self):
+        # Given: 검색 score 처럼 float 값이 주어진다.
+        data = {"scores": [1e-05, 1e16, 0.1, 2.5, 12.345678]}
+
+        # When: orjson 과 stdlib 으로 각각 그리면,
+        rendered = ORJSONRenderer().render(data)
+
+        # Then: 지수 표기는 다르지만 같은 값으로 읽힌다.
+        self.assertEqual(rendered, b'{"scores":[0.00001,1e16,0.1,2.5,12.345678]}')
+        self.assertEqual(JSONRenderer().render(data), b'{"scores":[1e-05,1e+16,0.1,2.5,12.345678]}')
+        self.assertEqual(json.loads(rendered), json.loads(JSONRenderer().render(data)))
+
+    def test_render_should_write_non_finite_floats_as_null(self):
+        # Given: stdlib JSONRenderer 가 ValueError 를 내는 NaN 과 Infinity 가 주어진다.
+        data = {"nan": float("nan"), "inf": float("inf"), "-inf": float("-inf")}
+        with self.assertRaises(ValueError):
+            JSONRenderer().render(data)
+
+        # When & Then: null 로 쓴다.
+        self.assertEqual(ORJSONRenderer().render(data), b'{"nan":null,"inf":null,"-inf":null}')
+
+    def test_render_should_use_stdlib_renderer_when_indent_is_requested(self):
+        # When: indent 를 요청한다.
+        rendered = ORJSONRenderer().render({"title": "장고"}, "application/json; indent=4")
+
+        # Then: stdlib 처럼 들여쓴 JSON 을 만든다.
+        self.assertEqual(rendered, '{\n    "title": "장고"\n}'.encode())
+
+
+class TestORJSONParser(SimpleTestCase):
+    def test_parse_should_return_same_data_as_stdlib_parser(self):
+        # Given: 한글 request body 가 주어진다.
+        body = '{"title": "장고 배포 가이드", "reason": "오타 수정", "ids": [1, 2.5, null, true]}'.encode()
+
+        # When & Then: stdlib JSONParser 와 같은 값을 돌려준다.
+        self.assertEqual(ORJSONParser().parse(BytesIO(body)), JSONParser().parse(BytesIO(body)))
+
+    def test_parse_should_raise_parse_error_on_invalid_json_and_nan(self):
+        # When & Then: 잘못된 JSON 과 NaN 은 ParseError 를 던진다.
+        for body in (b'{"title": ', b'{"score": NaN}'):
+            with self.assertRaises(ParseError):
+                ORJSONParser().parse(BytesIO(body))
+
+    def test_benchmark_json_command_should_compare_stdlib_and_orjson(self):
+        # When: 벤치마크 command 를 실행한다.
+        out = StringIO()
+        call_command("benchmark_json", "--repeat", "2", "--content-kb", "1", stdout=out)
+
+        # Then: Issue List 와 Page Detail 의 직렬화/파싱 시간을 출력한다.
+        lines = out.getvalue().splitlines()
+        self.assertTrue(lines[0].startswith("issue list: "))
+        self.assertTrue(lines[1].startswith("page detail: "))
+        self.assertIn("render stdlib: ", lines[1])
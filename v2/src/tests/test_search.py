@@ -0,0 +1,398 @@
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from ctrlf_auth.models import CtrlfUser
+from ctrlfbe.models import (
+    CtrlfActionType,
+    CtrlfContentType,
+    CtrlfIssueStatus,
+    Issue,
+    Note,
+    Page,
+    PageHistory,
+    PageVersionType,
+    Topic,
+)
+from ctrlfbe.search.database import DatabaseSearchBackend
+from ctrlfbe.search.documents import get_search_index, make_document, make_key
+from ctrlfbe.search.index import SearchIndex
+from ctrlfbe.search.segment import Tombstones
+from ctrlfbe.search.tokenizer import tokenize
+from ctrlfbe.tasks import update_search_index
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+
+from .test_mixin import _get_header, _login
+
+
+class TestTokenizer(SimpleTestCase):
+    def test_tokenize_should_split_hangul_into_bigrams_and_keep_ascii_words(self):
+        # When: 한글과 영문이 섞인 문장을 token 으로 나누면,
+        tokens = tokenize("장고 배포하기 ＡＰＩ")
+
+        # Then: 한글은 2글자 n-gram, 영문은 소문자 단어 하나가 된다.
+        self.assertEqual(tokens, ["장고", "배포", "포하", "하기", "api"])
+
+
+class TestSearchIndex(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        self.search_index = SearchIndex(self.directory, max_segments=3)
+
+    def _page(self, page_id, title, content="", note_id=1, topic_id=1):
+        return make_document(CtrlfContentType.PAGE, page_id, title, content, note_id, topic_id)
+
+    def _search_ids(self, query, search_index=None, limit=10):
+        return [hit.key & 0xFFFFFFFF for hit in (search_index or self.search_index).search(query, limit)]
+
+    def test_search_should_rank_documents_with_bm25_and_match_all_tokens(self):
+        # Given: 제목과 내용에 검색어가 들어간 정도가 다른 Page 들을 색인한다.
+        self.search_index.rebuild(
+            [
+                self._page(1, "파이썬 입문", "변수와 함수"),
+                self._page(2, "자료구조", "파이썬 리스트 파이썬 딕셔너리"),
+                self._page(3, "장고 배포", "파이썬 웹 프레임워크 장고 배포 방법"),
+                self._page(4, "자바 입문", "클래스와 객체"),
+            ]
+        )
+
+        # When: "파이썬" 으로 검색하면,
+        # Then: 제목에 검색어가 있는 문서가 먼저 나오고, 검색어가 없는 문서는 나오지 않는다.
+        self.assertEqual(self._search_ids("파이썬"), [1, 2, 3])
+        # And: 여러 단어로 검색하면 모든 단어를 포함한 문서만 나온다.
+        self.assertEqual(self._search_ids("파이썬 장고"), [3])
+        self.assertEqual(self._search_ids("없는단어"), [])
+
+    def test_search_should_return_hits_after_cursor(self):
+        # Given: 같은 점수를 받는 Page 5개를 색인한다.
+        self.search_index.rebuild([self._page(page_id, "검색") for page_id in range(1, 6)])
+
+        # When: limit 2 로 첫 page 를 조회하고 마지막 hit 뒤를 이어서 조회하면,
+        first_hits = self.search_index.search("검색", 2)
+        next_hits = self.search_index.search("검색", 2, (first_hits[-1].score, first_hits[-1].key))
+
+        # Then: 점수가 같으면 key 순서로 이어서 나온다.
+        self.assertEqual([hit.key & 0xFFFFFFFF for hit in first_hits + next_hits], [1, 2, 3, 4])
+
+    def test_add_segment_should_replace_document_and_be_visible_to_other_workers(self):
+        # Given: 다른 worker 가 같은 디렉터리의 색인을 한 번 읽어 둔다.
+        self.search_index.rebuild([self._page(1, "예전 제목"), self._page(2, "예전 문서")])
+        other_worker_index = SearchIndex(self.directory)
+        self.assertEqual(self._search_ids("예전", other_worker_index), [1, 2])
+
+        # When: Page 1 을 새 내용으로 다시 색인하면,
+        self.search_index.add_segment([self._page(1, "새로운 제목")])
+
+        # Then: 다른 worker 에서도 이전 내용은 검색되지 않고 새 내용이 검색된다.
+        self.assertEqual(self._search_ids("예전", other_worker_index), [2])
+        self.assertEqual(self._search_ids("새로운", other_worker_index), [1])
+
+    def test_note_tombstone_should_hide_all_documents_of_note(self):
+        # Given: Note 1 과 Note 2 아래의 문서를 색인한다.
+        self.search_index.rebuild(
+            [
+                make_document(CtrlfContentType.NOTE, 1, "장고 노트", note_id=1),
+                make_document(CtrlfContentType.TOPIC, 10, "장고 토픽", note_id=1, topic_id=10),
+                self._page(100, "장고 페이지", note_id=1, topic_id=10),
+                self._page(200, "장고 다른 페이지", note_id=2, topic_id=20),
+            ]
+        )
+
+        # When: Note 1 이 삭제되어 Note 단위 tombstone 을 추가하면,
+        self.search_index.add_segment([], Tombstones(note_ids=[1]))
+
+        # Then: Note 1 아래의 Note, Topic, Page 가 모두 검색되지 않는다.
+        self.assertEqual(
+            [hit.key for hit in self.search_index.search("장고", 10)], [make_key(CtrlfContentType.PAGE, 200)]
+        )
+
+    def test_add_segment_should_merge_segments_over_max_segments(self):
+        # Given: 기본 segment 하나를 만든다.
+        self.search_index.rebuild([self._page(page_id, f"문서 {page_id}") for page_id in range(1, 4)])
+
+        # When: max_segments 를 넘도록 수정과 삭제를 반복하면,
+        self.search_index.add_segment([self._page(1, "수정된 문서")])
+        self.search_index.add_segment([self._page(4, "추가된 문서")])
+        self.search_index.add_segment([], Tombstones(keys=[make_key(CtrlfContentType.PAGE, 2)]))
+        self.search_index.add_segment([self._page(4, "다시 수정된 문서")])
+
+        # Then: 넘친 segment 들은 병합되어 기본, 병합, 마지막 segment 만 남는다.
+        segments, _ = self.search_index._refresh()
+        self.assertEqual(len(segments), 3)
+        # And: 병합 후에도 마지막 상태로 검색된다.
+        self.assertCountEqual(self._search_ids("문서"), [1, 3, 4])
+        self.assertEqual(self._search_ids("다시"), [4])
+
+
+class TestSearchAPI(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            CTRLF_SEARCH_INDEX={"BACKEND": "index", "DIR": directory.name, "MAX_SEGMENTS": 16}
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = Client()
+        self.user_data = {"email": "test@test.com", "password": "12345"}
+        self.user = CtrlfUser.objects.create_user(**self.user_data)
+        self.note = Note.objects.create(title="장고 노트", is_approved=True)
+        self.note.owners.add(self.user)
+        self.topic = Topic.objects.create(note=self.note, title="장고 배포", is_approved=True)
+        self.topic.owners.add(self.user)
+
+    def _make_page(self, title, content, is_approved=True):
+        page = Page.objects.create(topic=self.topic)
+        page.owners.add(self.user)
+        PageHistory.objects.create(
+            owner=self.user,
+            page=page,
+            title=title,
+            content=content,
+            is_approved=is_approved,
+            version_type=PageVersionType.CURRENT,
+        )
+        return page
+
+    def _call_search_api(self, query, cursor=None):
+        params = {"q": query}
+        if cursor is not None:
+            params["cursor"] = cursor
+        return self.client.get(reverse("search:search"), params)
+
+    def test_search_api_should_return_approved_contents(self):
+        # Given: 승인된 Page 와 승인되지 않은 Page 를 만들고 색인을 만든다.
+        page = self._make_page("도커로 배포하기", "장고 프로젝트를 도커 이미지로 배포")
+        self._make_page("미승인 배포", "장고 배포", is_approved=False)
+        call_command("build_search_index", stdout=StringIO())
+
+        # When: "장고 배포" 로 검색 API 를 호출하면,
+        response = self._call_search_api("장고 배포")
+
+        # Then: 승인된 Topic 과 Page 만 점수 순으로 리턴한다.
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["results"]
+        self.assertEqual(
+            [(result["content_type"], result["content_id"]) for result in results],
+            [(CtrlfContentType.TOPIC, self.topic.id), (CtrlfContentType.PAGE, page.id)],
+        )
+        # And: Page 결과에는 Note, Topic 위치가 함께 내려온다.
+        self.assertEqual(results[1]["title"], "도커로 배포하기")
+        self.assertEqual((results[1]["note_id"], results[1]["topic_id"]), (self.note.id, self.topic.id))
+        self.assertFalse(response.data["has_more"])
+
+    def test_search_api_should_paginate_with_keyset_cursor(self):
+        # Given: 검색어가 들어간 Page 5개를 색인한다.
+        page_ids = [self._make_page(f"리액트 {i}", "리액트 훅").id for i in range(5)]
+        call_command("build_search_index", stdout=StringIO())
+
+        # When: page_size 2 로 next_cursor 를 따라가며 검색 API 를 호출하면,
+        found_ids, cursor = [], None
+        with patch("ctrlfbe.views.SearchResultPagination.page_size", 2):
+            while True:
+                response = self._call_search_api("리액트", cursor)
+                found_ids += [result["content_id"] for result in response.data["results"]]
+                cursor = response.data["next_cursor"]
+                if not response.data["has_more"]:
+                    break
+
+        # Then: 모든 Page 가 중복 없이 한 번씩 조회된다.
+        self.assertEqual(sorted(found_ids), page_ids)
+        self.assertEqual(len(found_ids), len(set(found_ids)))
+        self.assertIsNone(cursor)
+
+    def test_search_api_should_return_400_with_invalid_params(self):
+        # When: 검색어 없이 호출하거나 잘못된 cursor 로 호출하면,
+        # Then: status code 는 400 이다.
+        self.assertEqual(self.client.get(reverse("search:search")).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._call_search_api("장고", "invalid").status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_issue_approve_should_update_search_index_after_commit(self):
+        # Given: 색인된 Page 에 수정 버전과 수정 이슈가 있다.
+        page = self._make_page("예전 제목", "예전 내용")
+        call_command("build_search_index", stdout=StringIO())
+        new_page_history = PageHistory.objects.create(
+            owner=self.user,
+            page=page,
+            title="새로운 제목",
+            content="새로운 내용",
+            version_no=2,
+            version_type=PageVersionType.UPDATE,
+        )
+        issue = Issue.objects.create(
+            owner=self.user,
+            title="새로운 제목",
+            status=CtrlfIssueStatus.REQUESTED,
+            related_model_type=CtrlfContentType.PAGE,
+            related_model_id=new_page_history.id,
+            action=CtrlfActionType.UPDATE,
+        )
+        token = _login(self.user_data)
+
+        # When: 이슈를 승인하면,
+        with patch("ctrlfbe.views.update_search_index.delay") as mock_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(
+                    reverse("actions:issue_approve"), {"issue_id": issue.id}, **_get_header(token)
+                )
+
+        # Then: commit 후 Page 색인 갱신 task 를 예약한다.
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        mock_delay.assert_called_once_with(CtrlfContentType.PAGE, page.id)
+        # And: task 가 실행되면 새 버전으로 검색된다.
+        update_search_index(CtrlfContentType.PAGE, page.id)
+        self.assertEqual(self._call_search_api("예전").data["results"], [])
+        self.assertEqual(self._call_search_api("새로운").data["results"][0]["content_id"], page.id)
+
+    def test_update_search_index_should_hide_children_of_deleted_note(self):
+        # Given: Note 아래 Page 를 색인한다.
+        self._make_page("장고 모델", "ORM")
+        call_command("build_search_index", stdout=StringIO())
+
+        # When: Note 삭제가 승인된 뒤 색인 갱신 task 가 실행되면,
+        self.note.process_delete()
+        update_search_index(CtrlfContentType.NOTE, self.note.id)
+
+        # Then: Note 아래의 컨텐츠는 더 이상 검색되지 않는다.
+        self.assertEqual(self._call_search_api("장고").data["results"], [])
+        self.assertEqual(len(get_search_index()._refresh()[0]), 2)
+
+
+class TestDatabaseSearchBackend(TestCase):
+    def setUp(self):
+        self.user = CtrlfUser.objects.create_user(email="test@test.com", password="12345")
+        self.note = Note.objects.create(title="노트", is_approved=True)
+        self.topic = Topic.objects.create(note=self.note, title="토픽", is_approved=True)
+        self.backend = DatabaseSearchBackend()
+
+    def _make_page(self, title, content, is_approved=True):
+        page = Page.objects.create(topic=self.topic)
+        PageHistory.objects.create(
+            owner=self.user,
+            page=page,
+            title=title,
+            content=content,
+            is_approved=is_approved,
+            version_type=PageVersionType.CURRENT,
+        )
+        return page
+
+    def _search_page_ids(self, query, limit=10, after=None):
+        return [hit.key & 0xFFFFFFFF for hit in self.backend.search(query, limit, after)]
+
+    def test_search_should_match_approved_current_page_history(self):
+        # Given: 승인된 Page, 승인되지 않은 Page, 삭제된 Topic 의 Page 를 만든다.
+        page = self._make_page("도커로 배포하기", "장고 프로젝트를 배포합니다")
+        self._make_page("미승인 배포", "장고 배포", is_approved=False)
+        deleted_topic = Topic.objects.create(note=self.note, title="삭제된 토픽", is_deleted=True)
+        Page.objects.create(topic=deleted_topic)
+
+        # When: 조사가 붙은 단어의 앞부분으로 검색하면,
+        # Then: 승인된 CURRENT PageHistory 의 Page 만 찾는다.
+        self.assertEqual(self._search_page_ids("장고 배포"), [page.id])
+        # And: 색인 크기를 조회할 수 있다.
+        self.assertGreater(self.backend.index_size(), 0)
+
+    def test_search_should_follow_page_history_changes_by_trigger(self):
+        # Given: 색인된 Page 에 수정 버전이 승인된다.
+        page = self._make_page("예전 제목", "예전 내용")
+        PageHistory.objects.create(
+            owner=self.user,
+            page=page,
+            title="새로운 제목",
+            content="새로운 내용",
+            version_no=2,
+            version_type=PageVersionType.UPDATE,
+        )
+        page.refresh_from_db()
+        page.process_update()
+
+        # When: 예전 내용과 새 내용으로 검색하면,
+        # Then: CURRENT 가 된 새 PageHistory 로만 검색된다.
+        self.assertEqual(self._search_page_ids("예전"), [])
+        self.assertEqual(self._search_page_ids("새로운"), [page.id])
+
+    def test_search_should_match_words_split_between_title_and_content(self):
+        # Given: 한 단어는 title 에, 다른 단어는 본문에 있는 Page 와 한 단어만 있는 Page 를 만든다.
+        page = self._make_page("도커 입문", "쿠버네티스로 배포합니다")
+        self._make_page("도커 입문", "컨테이너를 배포합니다")
+
+        # When: 두 단어로 검색하면,
+        # Then: 모든 단어가 title 이나 본문 중 한 곳에 있는 Page 만 찾는다.
+        self.assertEqual(self._search_page_ids("도커 쿠버네티스"), [page.id])
+
+    def test_mysql_search_should_require_each_word_in_title_or_content(self):
+        # When: MySQL 에서 두 단어로 검색할 조건을 만들면,
+        with patch("ctrlfbe.search.database.connection") as mock_connection:
+            mock_connection.vendor = "mysql"
+            match_condition, params = self.backend._match(["도커", "쿠버네티스"])
+
+        # Then: 단어마다 title 이나 본문 중 한 곳에 있어야 하고, score 는 모든 단어로 계산한다.
+        self.assertEqual(match_condition.count(" AND "), 1)
+        self.assertEqual(match_condition.count("MATCH(h.title)"), 2)
+        self.assertEqual(params, ['"도커" "쿠버네티스"'] * 2 + ['"도커"'] * 2 + ['"쿠버네티스"'] * 2)
+
+    def test_search_should_return_hits_after_cursor(self):
+        # Given: 같은 점수를 받는 Page 4개를 만든다.
+        page_ids = [self._make_page("검색", "검색").id for _ in range(4)]
+
+        # When: limit 2 로 첫 page 를 조회하고 마지막 hit 뒤를 이어서 조회하면,
+        first_hits = self.backend.search("검색", 2)
+        next_hits = self.backend.search("검색", 2, (first_hits[-1].score, first_hits[-1].key))
+
+        # Then: 점수가 같으면 Page id 순서로 이어서 나온다.
+        self.assertEqual([hit.key & 0xFFFFFFFF for hit in first_hits + next_hits], page_ids)
+
+    def test_search_api_should_use_database_backend(self):
+        # Given: 검색 backend 를 database 로 설정한다.
+        page = self._make_page("리액트 훅", "useEffect")
+
+        # When: 검색 API 를 호출하면,
+        with override_settings(CTRLF_SEARCH_INDEX={"BACKEND": "database", "DIR": "", "MAX_SEGMENTS": 16}):
+            response = Client().get(reverse("search:search"), {"q": "리액트"})
+
+        # Then: app 색인을 만들지 않아도 DB full-text 색인으로 Page 를 찾는다.
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(result["content_type"], result["content_id"]) for result in response.data["results"]],
+            [(CtrlfContentType.PAGE, page.id)],
+        )
+
+
+class TestBenchmarkSearchCommand(SimpleTestCase):
+    def test_benchmark_search_should_report_latency(self):
+        # When: 작은 합성 corpus 로 benchmark_search command 를 실행하면,
+        out = StringIO()
+        call_command("benchmark_search", docs=200, queries=5, stdout=out)
+
+        # Then: 색인 시간과 검색 latency 를 출력한다.
+        self.assertIn("backend: index, docs: 200", out.getvalue())
+        self.assertIn("p95:", out.getvalue())
+
+
+class TestBenchmarkSearchCommandWithDatabase(TestCase):
+    def test_benchmark_search_should_compare_database_backend_and_clean_up(self):
+        # When: database backend 로 benchmark_search command 를 실행하면,
+        out = StringIO()
+        call_command("benchmark_search", docs=30, queries=5, backend="database", stdout=out)
+
+        # Then: 같은 형식으로 결과를 출력하고, 만든 Page 는 모두 지운다.
+        self.assertIn("backend: database, docs: 30", out.getvalue())
+        self.assertFalse(Page.objects.exists())
+        self.assertFalse(Note.objects.exists())
+
+    def test_benchmark_search_should_refuse_database_backend_on_non_test_database_without_force(self):
+        # Given: test DB 가 아닌 DB 에 연결되어 있다.
+        with patch.dict(connection.settings_dict, {"NAME": "ctrlf"}):
+            # When: --force 없이 database backend 로 benchmark_search command 를 실행하면,
+            # Then: 합성 Page 를 넣지 않고 CommandError 를 낸다.
+            with self.assertRaises(CommandError):
+                call_command("benchmark_search", docs=30, queries=5, backend="database", stdout=StringIO())
+        self.assertFalse(Page.objects.exists())
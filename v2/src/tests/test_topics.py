@@ -1,4 +1,5 @@
 import json
+from unittest import mock
 
 from ctrlf_auth.models import CtrlfUser
 from ctrlfbe.models import (
@@ -10,6 +11,8 @@ from ctrlfbe.models import (
     Topic,
 )
 from ctrlfbe.serializers import IssueCreateSerializer
+from ctrlfbe.tasks import delete_topic_cascade
+from ctrlfbe.views import TopicViewSet
 from django.test import Client, TestCase
 from django.urls import reverse
 from rest_framework import status
@@ -134,6 +137,65 @@ class TestTopicList(TestTopicMixin, TestCase):
         self.assertEqual(response.data["message"], "노트를 찾을 수 없습니다.")
 
 
+class TestTopicListPagination(TestTopicMixin, TestCase):
+    def _call_topic_list_api_with_params(self, note_id, **params):
+        return self.client.get(reverse("notes:topic_list", kwargs={"note_id": note_id}), params)
+
+    def test_topic_list_should_prefetch_owners_in_one_query(self):
+        # Given: Note에 Topic을 10개 생성한다.
+        self._make_topics_in_note(note=self.note, count=10)
+
+        # When: Topic List API를 호출한다.
+        # Then: Note 조회, Topic 조회, owners 조회 3번의 query만 실행한다.
+        with self.assertNumQueries(3):
+            response = self._call_topic_list_api(self.note.id)
+        self.assertEqual(len(response.data), 10)
+
+    def test_topic_list_should_walk_all_topics_with_cursor(self):
+        # Given: Note에 Topic을 65개 생성한다.
+        topic_list = self._make_topics_in_note(note=self.note, count=65)
+
+        # When: 빈 cursor로 Topic List API를 호출하고, next_cursor를 따라 끝까지 호출한다.
+        pages = [self._call_topic_list_api_with_params(self.note.id, cursor="").data]
+        while pages[-1]["has_more"]:
+            pages.append(self._call_topic_list_api_with_params(self.note.id, cursor=pages[-1]["next_cursor"]).data)
+
+        # Then: 30, 30, 5개씩 3 페이지로 나누어 리턴한다.
+        self.assertEqual([len(page["topics"]) for page in pages], [30, 30, 5])
+        self.assertIsNone(pages[-1]["next_cursor"])
+        # And: 모든 Topic을 중복 없이 순서대로 리턴한다.
+        self.assertEqual([topic["id"] for page in pages for topic in page["topics"]], [t.id for t in topic_list])
+        # And: owners 정보가 포함되어야한다.
+        self.assertEqual(pages[0]["topics"][0]["owners"], [self.user.id])
+
+    def test_topic_list_should_stream_ndjson_in_chunks(self):
+        # Given: Note에 Topic을 5개 생성한다.
+        topic_list = self._make_topics_in_note(note=self.note, count=5)
+
+        # When: stream=ndjson으로 Topic List API를 호출한다.
+        with mock.patch.object(TopicViewSet, "stream_chunk_size", 2):
+            response = self._call_topic_list_api_with_params(self.note.id, stream="ndjson")
+            lines = b"".join(response.streaming_content).decode().splitlines()
+
+        # Then: application/x-ndjson으로 스트리밍한다.
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        # And: 한 줄에 Topic 하나씩 모든 Topic을 순서대로 리턴한다.
+        topics = [json.loads(line) for line in lines]
+        self.assertEqual([topic["id"] for topic in topics], [topic.id for topic in topic_list])
+        self.assertEqual(topics[0]["owners"], [self.user.id])
+
+    def test_topic_list_stream_should_return_404_not_found_on_invalid_note_id(self):
+        # Given: 유효하지 않은 Note id가 주어진다.
+        invalid_note_id = 999999
+
+        # When: stream=ndjson으로 Topic List API를 호출한다.
+        response = self._call_topic_list_api_with_params(invalid_note_id, stream="ndjson")
+
+        # Then: status code는 404를 리턴한다.
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
 class TestTopicCreate(TestTopicMixin, TestCase):
     def _create_topic_and_issue_by_calling_topic_create_api(self):
         topic_create_request_body = {
@@ -203,6 +265,26 @@ class TestTopicCreate(TestTopicMixin, TestCase):
         # And: Issue는 생성되지 않는다.
         self.assertEqual(Issue.objects.count(), 0)
 
+    def test_topic_create_should_return_404_not_found_on_deleted_note(self):
+        # Given: 삭제가 승인되어 cascade 삭제를 기다리는 Note가 주어진다.
+        self.note.process_delete()
+        request_body = {
+            "note_id": self.note.id,
+            "title": "test topic title",
+            "reason": "reason for topic create",
+        }
+        # And: 로그인 해서 토큰을 발급받는다.
+        token = _login(self.user_data)
+
+        # When: 인증이 필요한 Topic Create API를 호출한다.
+        response = self._call_topic_create_api(request_body, token)
+
+        # Then: status code는 404을 리턴한다.
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        # And: Topic과 Issue는 생성되지 않는다.
+        self.assertEqual(Topic.objects.count(), 0)
+        self.assertEqual(Issue.objects.count(), 0)
+
     def test_topic_create_should_return_400_bad_request_on_invalid_title(self):
         # Given: 유효하지 않은 Topic title이 주어진다.
         invalid_topic_title = ""
@@ -282,6 +364,22 @@ class TestTopicCreate(TestTopicMixin, TestCase):
         topic = Topic.objects.first()
         self.assertTrue(topic.is_approved)
 
+    def test_should_return_404_not_found_on_approving_issue_about_topic_create_in_deleted_note(self):
+        # Given: Topic Create API를 호출하여 미승인 상태의 Topic와 Topic Create Issue를 생성한다.
+        self._create_topic_and_issue_by_calling_topic_create_api()
+        topic_create_issue_id = Issue.objects.get(action=CtrlfActionType.CREATE).id
+        # And: 그 뒤 Note 삭제가 승인되었다.
+        self.note.process_delete()
+
+        # When: Topic Create Issue에 대한 Issue Approve API를 호출한다.
+        response = self._call_issue_approve_api(topic_create_issue_id, _login(self.user_data))
+
+        # Then: status code는 404을 리턴한다.
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        # And: Topic은 승인되지 않고 Issue도 그대로 남는다.
+        self.assertFalse(Topic.objects.first().is_approved)
+        self.assertEqual(Issue.objects.get(id=topic_create_issue_id).status, CtrlfIssueStatus.REQUESTED)
+
     def test_should_not_change_field_of_is_approved_to_true_on_not_having_permission_to_issue_about_topic_create(self):
         # Given: Topic Create API를 호출하여 미승인 상태의 Topic와 Topic Create Issue를 생성한다.
         self._create_topic_and_issue_by_calling_topic_create_api()
@@ -578,14 +676,26 @@ class TestTopicDelete(TestTopicMixin, TestCase):
         issue_approve_user_token = _login(self.user_data)
 
         # When: Topic Delete Issue에 대한 Issue Approve API를 호출한다.
-        response = self._call_issue_approve_api(valid_issue.id, issue_approve_user_token)
+        with mock.patch("ctrlfbe.views.delete_topic_cascade.delay") as mock_cascade_delay, mock.patch(
+            "ctrlfbe.views.update_search_index.delay"
+        ) as mock_search_index_delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self._call_issue_approve_api(valid_issue.id, issue_approve_user_token)
 
         # Then: status code는 204이다.
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         # And: issue도 삭제되어야 한다
         valid_issue = Issue.objects.first()
         self.assertIsNone(valid_issue)
-        # And: Topic은 None 이어야 한다
+        # And: Topic은 삭제 표시되어 Topic Detail API에서 조회되지 않는다.
+        self.assertTrue(Topic.objects.get(id=self.topic.id).is_deleted)
+        self.assertEqual(self._call_topic_detail_api(self.topic.id).status_code, status.HTTP_404_NOT_FOUND)
+        # And: commit 후 하위 컨텐츠 삭제 task를 예약한다.
+        mock_cascade_delay.assert_called_once_with(self.topic.id)
+        # And: 검색 색인에서도 하위 컨텐츠까지 빠지도록 색인 갱신 task를 예약한다.
+        mock_search_index_delay.assert_called_once_with(CtrlfContentType.TOPIC, self.topic.id)
+        # And: task가 실행되면 Topic은 None 이어야 한다
+        delete_topic_cascade(self.topic.id)
         self.assertIsNone(Topic.objects.filter(id=self.topic.id).first())
 
     def test_should_not_delete_topic_on_not_having_permission_about_delete_topic_issue(self):
@@ -617,3 +727,13 @@ class TestTopicDelete(TestTopicMixin, TestCase):
         # And: Topic은 삭제되지 않아야 한다.
         topic = Topic.objects.filter(id=self.topic.id).first()
         self.assertIsNotNone(topic)
+
+    def test_topic_delete_should_run_fixed_number_of_queries(self):
+        # Given: 로그인 해서 토큰을 발급받는다.
+        token = _login(self.user_data)
+
+        # When: Topic 삭제 API를 호출한다.
+        # Then: Topic은 한 번만 조회하고, 정해진 횟수의 query만 실행한다.
+        with self.assertNumQueries(7):
+            response = self._call_topic_delete_api({"reason": "reason for delete topic"}, self.topic.id, token)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)